@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from signal_bot_3.signals.simple_signal import SimpleSignal
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+
+FEATURE_NAMES = [
+    'direction',
+    'rsi',
+    'ema_spread_atr',
+    'atr_pct',
+    'volume_ratio',
+    'return_5',
+    'return_20',
+    'volatility_20',
+    'htf_ema_spread_atr',
+    'htf_rsi'
+]
+
+def _lagged_log_return(log_close: np.ndarray, bars: np.ndarray, lag: int) -> np.ndarray:
+    """Log return over `lag` bars ending at each bar; NaN without enough history"""
+    start = bars - lag
+    result = np.full(len(bars), np.nan)
+    ok = start >= 0
+    result[ok] = log_close[bars[ok]] - log_close[start[ok]]
+    return result
+
+def _rolling_std(values: np.ndarray, bars: np.ndarray, window: int) -> np.ndarray:
+    """Standard deviation of the `window` values ending at each bar, from cumulative sums"""
+    s1 = np.concatenate([[0.0], np.cumsum(values)])
+    s2 = np.concatenate([[0.0], np.cumsum(values * values)])
+    start = bars + 1 - window
+    result = np.full(len(bars), np.nan)
+    ok = start >= 0
+    
+    total = s1[bars[ok] + 1] - s1[start[ok]]
+    squares = s2[bars[ok] + 1] - s2[start[ok]]
+    result[ok] = np.sqrt(np.maximum(squares / window - (total / window) ** 2, 0.0))
+    return result
+
+class FeatureBuilder:
+    """Direction-aware feature matrix for candidate signals, built from whole indicator columns"""
+    
+    def __init__(self, config: Dict = None):
+        self.config = config or {}
+        self.simple_signal = SimpleSignal(self.config)
+    
+    def higher_timeframe(self, timeframe: str, multi_tf_data: Dict[str, pd.DataFrame]) -> Optional[str]:
+        """Next coarser timeframe available for context"""
+        step = timeframe_to_seconds(timeframe)
+        coarser = [
+            tf for tf, df in multi_tf_data.items()
+            if timeframe_to_seconds(tf) > step and not df.empty
+        ]
+        return min(coarser, key=timeframe_to_seconds) if coarser else None
+    
+    def build(
+        self,
+        df: pd.DataFrame,
+        timeframe: str,
+        bars: np.ndarray,
+        directions: np.ndarray,
+        multi_tf_data: Dict[str, pd.DataFrame] = None,
+        indicators: pd.DataFrame = None
+    ) -> np.ndarray:
+        """One row of FEATURE_NAMES per (bar, direction); missing values are 0"""
+        bars = np.asarray(bars, dtype=np.int64)
+        directions = np.asarray(directions, dtype=np.float64)
+        features = np.zeros((len(bars), len(FEATURE_NAMES)))
+        if not len(bars):
+            return features
+        
+        if indicators is None:
+            indicators = self.simple_signal.compute_indicators(df)
+        
+        close = indicators['close'].to_numpy(dtype=np.float64)
+        rsi = indicators['rsi'].to_numpy(dtype=np.float64)[bars]
+        fast = indicators['ema_fast'].to_numpy(dtype=np.float64)[bars]
+        slow = indicators['ema_slow'].to_numpy(dtype=np.float64)[bars]
+        atr = indicators['atr'].to_numpy(dtype=np.float64)[bars]
+        volume = indicators['volume'].to_numpy(dtype=np.float64)[bars]
+        volume_sma = indicators['volume_sma'].to_numpy(dtype=np.float64)[bars]
+        
+        log_close = np.log(close)
+        log_returns = np.diff(log_close, prepend=log_close[0])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features[:, 0] = directions
+            features[:, 1] = directions * (rsi - 50) / 50
+            features[:, 2] = directions * (fast - slow) / atr
+            features[:, 3] = atr / close[bars] * 100
+            features[:, 4] = np.log(volume / volume_sma)
+            features[:, 5] = directions * _lagged_log_return(log_close, bars, 5) * 100
+            features[:, 6] = directions * _lagged_log_return(log_close, bars, 20) * 100
+            features[:, 7] = _rolling_std(log_returns, bars, 20) * 100
+            
+            context_tf = self.higher_timeframe(timeframe, multi_tf_data or {})
+            if context_tf is not None:
+                features[:, 8:10] = self._context(
+                    indicators['timestamp'].to_numpy(dtype=np.int64)[bars] + timeframe_to_seconds(timeframe),
+                    directions, multi_tf_data[context_tf], context_tf
+                )
+        
+        features[~np.isfinite(features)] = 0.0
+        return features
+    
+    def _context(self, close_times: np.ndarray, directions: np.ndarray, df: pd.DataFrame, timeframe: str) -> np.ndarray:
+        """Trend and RSI of the last coarser candle closed by each entry"""
+        indicators = self.simple_signal.compute_indicators(df)
+        htf_close_times = indicators['timestamp'].to_numpy(dtype=np.int64) + timeframe_to_seconds(timeframe)
+        idx = np.searchsorted(htf_close_times, close_times, side='right') - 1
+        ok = idx >= 0
+        idx = np.maximum(idx, 0)
+        
+        fast = indicators['ema_fast'].to_numpy(dtype=np.float64)[idx]
+        slow = indicators['ema_slow'].to_numpy(dtype=np.float64)[idx]
+        atr = indicators['atr'].to_numpy(dtype=np.float64)[idx]
+        rsi = indicators['rsi'].to_numpy(dtype=np.float64)[idx]
+        
+        context = np.column_stack([
+            directions * (fast - slow) / atr,
+            directions * (rsi - 50) / 50
+        ])
+        context[~ok] = np.nan
+        return context
@@ -0,0 +1,93 @@
+import json
+import os
+import numpy as np
+from typing import Dict, List
+from signal_bot_3.core.logger import logger
+
+def default_model_path() -> str:
+    """Where the signal model is saved and loaded from"""
+    return os.getenv("SIGNAL_MODEL_PATH", "signal_bot_3/adaptive_engine/signal_model.npz")
+
+class LogisticModel:
+    """L2-regularized logistic regression on standardized features"""
+    
+    def __init__(
+        self,
+        feature_names: List[str],
+        weights: np.ndarray = None,
+        bias: float = 0.0,
+        mean: np.ndarray = None,
+        scale: np.ndarray = None,
+        info: Dict = None
+    ):
+        n = len(feature_names)
+        self.feature_names = list(feature_names)
+        self.weights = np.zeros(n) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.mean = np.zeros(n) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = np.ones(n) if scale is None else np.asarray(scale, dtype=np.float64)
+        self.info = info or {}
+    
+    def fit(self, X: np.ndarray, y: np.ndarray, l2: float = 1.0, max_iter: int = 50, tol: float = 1e-8) -> 'LogisticModel':
+        """Newton-Raphson (IRLS) fit; converges in a handful of iterations on small feature sets"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        
+        Z = np.column_stack([np.ones(len(X)), (X - self.mean) / self.scale])
+        theta = np.zeros(Z.shape[1])
+        penalty = np.full(Z.shape[1], l2)
+        penalty[0] = 0.0
+        
+        for _ in range(max_iter):
+            p = 1.0 / (1.0 + np.exp(-Z @ theta))
+            gradient = Z.T @ (p - y) + penalty * theta
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + np.diag(penalty)
+            step = np.linalg.solve(hessian + 1e-9 * np.eye(len(theta)), gradient)
+            theta -= step
+            if np.max(np.abs(step)) < tol:
+                break
+        
+        self.bias = float(theta[0])
+        self.weights = theta[1:]
+        return self
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Win probability of every row"""
+        z = ((np.asarray(X, dtype=np.float64) - self.mean) / self.scale) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-z))
+    
+    def save(self, path: str):
+        """Write the model atomically as a .npz archive"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            weights=self.weights,
+            bias=np.array(self.bias),
+            mean=self.mean,
+            scale=self.scale,
+            feature_names=np.array(self.feature_names),
+            info=np.array(json.dumps(self.info))
+        )
+        os.replace(tmp_path, path)
+        logger.info(f"Saved signal model to {path}")
+    
+    @classmethod
+    def load(cls, path: str) -> 'LogisticModel':
+        """Read a model written by save"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                feature_names=[str(name) for name in data['feature_names']],
+                weights=data['weights'],
+                bias=float(data['bias']),
+                mean=data['mean'],
+                scale=data['scale'],
+                info=json.loads(str(data['info']))
+            )
@@ -0,0 +1,116 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+from signal_bot_3.adaptive_engine.features import FeatureBuilder, FEATURE_NAMES
+from signal_bot_3.adaptive_engine.model import LogisticModel
+from signal_bot_3.backtest.engine import BacktestEngine
+from signal_bot_3.data.persistence import MarketDatabase, create_market_database
+from signal_bot_3.indicators.cache import tag_frame
+from signal_bot_3.core.logger import logger
+
+def roc_auc(y: np.ndarray, scores: np.ndarray) -> float:
+    """Area under the ROC curve from score ranks (Mann-Whitney U)"""
+    positives = int(y.sum())
+    negatives = len(y) - positives
+    if positives == 0 or negatives == 0:
+        return 0.5
+    
+    ranks = pd.Series(scores).rank().to_numpy()
+    return float((ranks[y == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+class ModelTrainer:
+    """Labels every rule entry with its backtested outcome and fits the signal model"""
+    
+    def __init__(self, config: Dict = None, db: MarketDatabase = None):
+        self.config = config or {}
+        self.db = db
+        self.engine = BacktestEngine(self.config)
+        self.features = FeatureBuilder(self.config)
+    
+    def load_history(self, pairs: List[Tuple[str, str]], timeframes: List[str], limit: int = 5000) -> List[Dict[str, pd.DataFrame]]:
+        """Stored candles of every pair as multi-timeframe frames"""
+        db = self.db or create_market_database()
+        history = []
+        for exchange, symbol in pairs:
+            multi_tf_data = {
+                tf: tag_frame(db.get_ohlcv(exchange, symbol, tf, limit), exchange, symbol, tf)
+                for tf in timeframes
+            }
+            if any(not df.empty for df in multi_tf_data.values()):
+                history.append(multi_tf_data)
+        return history
+    
+    def label(self, multi_tf_data: Dict[str, pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Features, win labels and entry timestamps of every entry of one pair"""
+        rows, labels, timestamps = [], [], []
+        costs = self.engine.signal_metrics.commission + self.engine.signal_metrics.slippage
+        
+        for tf, df in multi_tf_data.items():
+            if len(df) < 2:
+                continue
+            
+            # No confidence filter: the model learns which rule entries pay off
+            indicators = self.engine.simple_signal.compute_indicators(df)
+            entries = self.engine.simple_signal.entry_frame(indicators)
+            if entries.empty:
+                continue
+            
+            entry_prices = entries['entry_price'].to_numpy()
+            directions = entries['direction'].to_numpy()
+            exit_prices, _, _ = self.engine.signal_metrics.resolve_exits(
+                entry_bars=entries['bar'].to_numpy(),
+                entry_prices=entry_prices,
+                targets=entries['target_price'].to_numpy(),
+                stops=entries['stop_loss'].to_numpy(),
+                directions=directions.astype(np.int64),
+                high=df['high'].to_numpy(dtype=np.float64),
+                low=df['low'].to_numpy(dtype=np.float64),
+                close=df['close'].to_numpy(dtype=np.float64),
+                open_=df['open'].to_numpy(dtype=np.float64),
+                max_bars=self.engine.max_holding_bars
+            )
+            net = directions * (exit_prices - entry_prices) - (entry_prices + exit_prices) * costs
+            
+            rows.append(self.features.build(df, tf, entries['bar'].to_numpy(), directions, multi_tf_data, indicators))
+            labels.append((net > 0).astype(np.float64))
+            timestamps.append(entries['timestamp'].to_numpy())
+        
+        if not rows:
+            return np.empty((0, len(FEATURE_NAMES))), np.empty(0), np.empty(0, dtype=np.int64)
+        return np.vstack(rows), np.concatenate(labels), np.concatenate(timestamps)
+    
+    def train(self, history: List[Dict[str, pd.DataFrame]], holdout: float = 0.2, l2: float = 1.0) -> LogisticModel:
+        """Fit on the older entries and report quality on the most recent ones"""
+        parts = [self.label(multi_tf_data) for multi_tf_data in history]
+        X = np.vstack([p[0] for p in parts]) if parts else np.empty((0, len(FEATURE_NAMES)))
+        y = np.concatenate([p[1] for p in parts]) if parts else np.empty(0)
+        timestamps = np.concatenate([p[2] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        
+        if len(y) < 20:
+            raise ValueError(f"Only {len(y)} labeled entries; load more history or loosen the entry rules")
+        
+        # Split by time so the holdout score is out-of-sample
+        order = np.argsort(timestamps, kind='stable')
+        X, y = X[order], y[order]
+        split = int(len(y) * (1 - holdout))
+        
+        model = LogisticModel(FEATURE_NAMES).fit(X[:split], y[:split], l2=l2)
+        p = np.clip(model.predict_proba(X[split:]), 1e-12, 1 - 1e-12)
+        y_test = y[split:]
+        
+        model.info = {
+            'trained_at': int(time.time()),
+            'samples': int(len(y)),
+            'train_samples': split,
+            'win_rate': float(y.mean()),
+            'holdout_accuracy': float(np.mean((p >= 0.5) == (y_test == 1))) if len(y_test) else 0.0,
+            'holdout_log_loss': float(-np.mean(y_test * np.log(p) + (1 - y_test) * np.log(1 - p))) if len(y_test) else 0.0,
+            'holdout_auc': roc_auc(y_test, p)
+        }
+        
+        logger.info(
+            f"Trained signal model on {split} entries: holdout AUC {model.info['holdout_auc']:.3f}, "
+            f"accuracy {model.info['holdout_accuracy']:.3f} (base win rate {model.info['win_rate']:.3f})"
+        )
+        return model
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from signal_bot_3.signals.simple_signal import SimpleSignal
+from signal_bot_3.signals.signal_engine import AdaptiveSignalEngine
+from signal_bot_3.risk_manager.reward_calculator import RewardCalculator
+from signal_bot_3.risk_manager.position_sizer import PositionSizer
+from signal_bot_3.risk_manager.portfolio_risk import PortfolioRiskManager
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+from signal_bot_3.metrics.per_signal import PerSignalMetrics
+from signal_bot_3.metrics.performance import PerformanceMetrics
+from signal_bot_3.metrics.portfolio import PortfolioAccounting
+from signal_bot_3.core.logger import logger
+
+class BacktestEngine:
+    """Walk-forward backtester that evaluates every bar of each timeframe"""
+    
+    def __init__(self, config: Dict = None):
+        self.config = config or {}
+        self.simple_signal = SimpleSignal(self.config)
+        self.adaptive = AdaptiveSignalEngine(self.config)
+        self.min_confirmation_score = self.config.get('min_confirmation_score', 0.6)
+        self.max_holding_bars = self.config.get('max_holding_bars', 100)
+        self.initial_capital = self.config.get('initial_capital', 10000)
+        self.rr_calc = RewardCalculator(min_risk_reward=self.config.get('risk_reward_min', 1.5))
+        self.pos_sizer = PositionSizer(max_risk_per_trade=self.config.get('max_risk_per_trade', 0.02))
+        self.signal_metrics = PerSignalMetrics(
+            commission=self.config.get('commission', 0.001),
+            slippage=self.config.get('slippage', 0.0005),
+            tie_break=self.config.get('exit_tie_break', 'target')
+        )
+        self.perf_metrics = PerformanceMetrics(initial_capital=self.initial_capital)
+        self.portfolio = PortfolioAccounting(initial_capital=self.initial_capital)
+    
+    def find_signals(
+        self,
+        df: pd.DataFrame,
+        timeframe: str,
+        multi_tf_data: Optional[Dict[str, pd.DataFrame]] = None
+    ) -> List[Dict]:
+        """Compute indicators once and collect the signals of every bar"""
+        if df.empty or len(df) < 2:
+            return []
+        
+        indicators = self.simple_signal.compute_indicators(df)
+        entries = self.simple_signal.entry_frame(indicators)
+        entries = entries[entries['confidence'] >= self.min_confirmation_score]
+        
+        # In adaptive mode every entry is scored by a single model call
+        probabilities = self.adaptive.score(self.adaptive.features.build(
+            df, timeframe, entries['bar'].to_numpy(), entries['direction'].to_numpy(), multi_tf_data, indicators
+        )) if self.adaptive.adaptive_mode and not entries.empty else None
+        
+        if probabilities is None:
+            entries = entries.assign(probability=entries['confidence'])
+        else:
+            entries = entries.assign(probability=probabilities)
+            entries = entries[entries['probability'] >= self.adaptive.min_probability]
+        
+        signals = []
+        for row in entries.itertuples(index=False):
+            signals.append({
+                'signal_type': row.signal_type,
+                'entry_price': float(row.entry_price),
+                'timestamp': int(row.timestamp),
+                'confidence': float(row.confidence),
+                'probability': float(row.probability),
+                'stop_loss': float(row.stop_loss),
+                'target_price': float(row.target_price),
+                'timeframe': timeframe,
+                'bar': int(row.bar),
+                'indicators': {
+                    'rsi': float(row.rsi),
+                    'ema_fast': float(row.ema_fast),
+                    'ema_slow': float(row.ema_slow),
+                    'volume': float(row.volume),
+                    'atr': float(row.atr)
+                }
+            })
+        
+        logger.info(f"Walk-forward scan of {len(df)} {timeframe} bars: {len(signals)} signals")
+        return signals
+    
+    def simulate(
+        self,
+        signals: List[Dict],
+        multi_tf_data: Dict[str, pd.DataFrame],
+        account_balance: Optional[float] = None
+    ) -> List[Dict]:
+        """Size and exit signals in entry order against their own timeframe"""
+        if account_balance is None:
+            account_balance = self.initial_capital
+        
+        by_timeframe = {}
+        for signal in signals:
+            by_timeframe.setdefault(signal['timeframe'], []).append(signal)
+        
+        exits = {}
+        for tf, tf_signals in by_timeframe.items():
+            df = multi_tf_data.get(tf)
+            if df is None or df.empty:
+                continue
+            
+            exit_prices, exit_bars, exit_reasons = self.signal_metrics.resolve_exits(
+                entry_bars=np.array([s['bar'] for s in tf_signals]),
+                entry_prices=np.array([s['entry_price'] for s in tf_signals]),
+                targets=np.array([s['target_price'] for s in tf_signals]),
+                stops=np.array([s['stop_loss'] for s in tf_signals]),
+                directions=np.array([1 if s['signal_type'] == 'LONG' else -1 for s in tf_signals]),
+                high=df['high'].to_numpy(dtype=np.float64),
+                low=df['low'].to_numpy(dtype=np.float64),
+                close=df['close'].to_numpy(dtype=np.float64),
+                open_=df['open'].to_numpy(dtype=np.float64),
+                max_bars=self.max_holding_bars
+            )
+            timestamps = df['timestamp'].to_numpy()
+            
+            for signal, price, bar, reason in zip(tf_signals, exit_prices, exit_bars, exit_reasons):
+                exits[id(signal)] = (float(price), int(bar), int(timestamps[bar]), str(reason))
+        
+        # Positions are entered at the close of their signal bar; their PnL is
+        # realized, and their risk released, at the close of the exit bar
+        risk = PortfolioRiskManager.from_config(self.config)
+        pending_pnl = {}
+        
+        def entry_time(signal: Dict) -> int:
+            return signal['timestamp'] + timeframe_to_seconds(signal['timeframe'])
+        
+        trades = []
+        for signal in sorted(signals, key=entry_time):
+            if id(signal) not in exits or not self.rr_calc.is_valid_signal(signal):
+                continue
+            
+            for position in risk.release_until(entry_time(signal)):
+                account_balance += pending_pnl.pop(position.id)
+            
+            position_size = self.pos_sizer.calculate_position_size(signal, account_balance)
+            position_size = risk.admit(signal, position_size, account_balance)
+            if not position_size:
+                continue
+            
+            signal['position_size'] = position_size
+            exit_price, exit_bar, exit_timestamp, exit_reason = exits[id(signal)]
+            
+            trade_result = self.signal_metrics.calculate_trade_result(signal, exit_price)
+            trade_result['exit_timestamp'] = exit_timestamp
+            trade_result['exit_reason'] = exit_reason
+            trade_result['bars_held'] = exit_bar - signal['bar']
+            trades.append(trade_result)
+            
+            position = risk.open(signal, position_size, exit_timestamp + timeframe_to_seconds(signal['timeframe']))
+            pending_pnl[position.id] = trade_result['net_pnl']
+        
+        logger.info(f"Portfolio risk: {risk.rejected} signals rejected, {risk.scaled} scaled down")
+        return trades
+    
+    def run(self, multi_tf_data: Dict[str, pd.DataFrame]) -> Dict:
+        """Run the full walk-forward backtest over every timeframe"""
+        signals = []
+        for tf, df in multi_tf_data.items():
+            signals.extend(self.find_signals(df, tf, multi_tf_data))
+        
+        trades = self.simulate(signals, multi_tf_data)
+        metrics = self.perf_metrics.calculate_metrics(trades)
+        
+        return {
+            'signals': signals,
+            'trades': trades,
+            'metrics': metrics,
+            'portfolio': self.portfolio.evaluate(trades, multi_tf_data)
+        }
@@ -0,0 +1,297 @@
+import itertools
+import logging
+import random
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+from signal_bot_3.backtest.engine import BacktestEngine
+from signal_bot_3.indicators.cache import tag_frame
+from signal_bot_3.core.logger import logger
+
+DEFAULT_SPACE = {
+    'rsi_period': [7, 14, 21],
+    'rsi_oversold': [25, 30, 35, 40],
+    'rsi_overbought': [60, 65, 70, 75],
+    'ema_fast': [5, 9, 12],
+    'ema_slow': [21, 26, 50],
+    'max_risk_per_trade': [0.01, 0.02],
+    'atr_multiplier': [1.5, 2.0, 2.5]
+}
+
+# Combinations sharing these values reuse the same indicator columns
+INDICATOR_PARAMS = ('rsi_period', 'ema_fast', 'ema_slow')
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def grid_combinations(space: Dict[str, List]) -> List[Dict]:
+    """Every combination of the parameter lists"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+def random_combinations(space: Dict[str, List], n: int, seed: int = 42) -> List[Dict]:
+    """Up to n distinct combinations drawn uniformly from the grid"""
+    names = list(space)
+    total = int(np.prod([len(space[name]) for name in names]))
+    rng = random.Random(seed)
+    
+    combos = []
+    for index in rng.sample(range(total), min(n, total)):
+        combo = {}
+        for name in reversed(names):
+            index, position = divmod(index, len(space[name]))
+            combo[name] = space[name][position]
+        combos.append({name: combo[name] for name in names})
+    return combos
+
+def walk_forward_splits(
+    start: int,
+    end: int,
+    n_splits: int = 3,
+    train_ratio: float = 0.7
+) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Rolling (train, test) timestamp windows; test windows follow their train window"""
+    span = end - start
+    test_len = span * (1 - train_ratio) / n_splits
+    train_len = span * train_ratio
+    
+    splits = []
+    for i in range(n_splits):
+        train_start = start + i * test_len
+        train_end = train_start + train_len
+        test_end = end if i == n_splits - 1 else train_end + test_len
+        splits.append(((int(train_start), int(train_end)), (int(train_end), int(test_end))))
+    return splits
+
+class SharedOHLCV:
+    """OHLCV frames copied once into shared memory for worker processes"""
+    
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.spec: Dict[str, Tuple[str, int, Dict]] = {}
+        
+        for tf, df in frames.items():
+            n = len(df)
+            block = shared_memory.SharedMemory(create=True, size=max(1, n * 8 * (1 + len(PRICE_COLUMNS))))
+            timestamps, values = self._views(block, n)
+            timestamps[:] = df['timestamp'].to_numpy(dtype=np.int64)
+            values[:] = df[PRICE_COLUMNS].to_numpy(dtype=np.float64).T
+            
+            self.blocks[tf] = block
+            self.spec[tf] = (block.name, n, dict(df.attrs))
+    
+    @staticmethod
+    def _views(block: shared_memory.SharedMemory, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamp and price arrays laid over a block"""
+        timestamps = np.ndarray((n,), dtype=np.int64, buffer=block.buf)
+        values = np.ndarray((len(PRICE_COLUMNS), n), dtype=np.float64, buffer=block.buf, offset=n * 8)
+        return timestamps, values
+    
+    @classmethod
+    def attach(cls, spec: Dict[str, Tuple[str, int, Dict]]) -> Tuple[Dict[str, pd.DataFrame], List]:
+        """Rebuild zero-copy frames from a spec; keep the returned blocks alive while in use"""
+        frames, blocks = {}, []
+        for tf, (name, n, attrs) in spec.items():
+            try:
+                block = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            
+            timestamps, values = cls._views(block, n)
+            df = pd.DataFrame(
+                {'timestamp': timestamps, **{col: values[i] for i, col in enumerate(PRICE_COLUMNS)}},
+                copy=False
+            )
+            df.attrs.update(attrs)
+            if 'symbol' not in attrs:
+                # Tag it so workers cache indicators across combinations
+                tag_frame(df, 'shared', name, tf)
+            frames[tf] = df
+        return frames, blocks
+    
+    def close(self):
+        """Free the shared blocks"""
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+_worker_frames: Dict[str, pd.DataFrame] = {}
+_worker_blocks: List = []
+_worker_splits: Dict[str, List] = {}
+_worker_config: Dict = {}
+
+def _init_worker(spec: Dict, splits: Dict[str, List], base_config: Dict):
+    """Attach shared OHLCV once per worker process"""
+    global _worker_frames, _worker_blocks, _worker_splits, _worker_config
+    _worker_frames, _worker_blocks = SharedOHLCV.attach(spec)
+    _worker_splits = splits
+    _worker_config = base_config
+    
+    # Per-trade INFO logs would dominate the run time
+    logger.setLevel(logging.WARNING)
+
+def _fold_metrics(engine: BacktestEngine, signals: List[Dict], fold: int, part: int) -> Dict:
+    """Metrics of the signals entered inside one fold's train (0) or test (1) window"""
+    in_window = []
+    for signal in signals:
+        start, end = _worker_splits[signal['timeframe']][fold][part]
+        if start <= signal['timestamp'] < end:
+            in_window.append(dict(signal))
+    
+    trades = engine.simulate(in_window, _worker_frames)
+    return engine.perf_metrics.calculate_metrics(trades)
+
+def _scores(metrics: Dict, prefix: str) -> Dict:
+    """Score columns of one fold window"""
+    return {
+        f'{prefix}_sharpe': float(metrics.get('sharpe_ratio', 0.0)),
+        f'{prefix}_sortino': float(metrics.get('sortino_ratio', 0.0)),
+        f'{prefix}_max_drawdown': float(metrics.get('max_drawdown', 0.0)),
+        f'{prefix}_profit_factor': float(metrics.get('profit_factor', 0.0)),
+        f'{prefix}_return_pct': float(metrics.get('return_pct', 0.0)),
+        f'{prefix}_trades': int(metrics.get('total_trades', 0))
+    }
+
+def evaluate_combinations(combos: List[Dict]) -> List[Dict]:
+    """Per-fold train and test scores of parameter sets in a worker process"""
+    rows = []
+    for combo in combos:
+        engine = BacktestEngine({**_worker_config, **combo})
+        
+        # Signals are found once over the full history so indicators are warmed up
+        # at every fold boundary; folds only select which entries they trade
+        signals = []
+        for tf, df in _worker_frames.items():
+            signals.extend(engine.find_signals(df, tf))
+        
+        folds = range(len(next(iter(_worker_splits.values()))))
+        rows.append({
+            'params': combo,
+            'folds': [
+                {
+                    **_scores(_fold_metrics(engine, signals, fold, 0), 'train'),
+                    **_scores(_fold_metrics(engine, signals, fold, 1), 'test')
+                }
+                for fold in folds
+            ]
+        })
+    return rows
+
+def combination_table(rows: List[Dict], select_by: str = 'sharpe') -> pd.DataFrame:
+    """One row per parameter set with fold-averaged train and test scores, best train score first"""
+    records = []
+    for row in rows:
+        folds = pd.DataFrame(row['folds'])
+        scores = folds.mean().to_dict()
+        for column in folds.columns:
+            if column.endswith('_trades'):
+                scores[column] = int(folds[column].sum())
+        records.append({**row['params'], **scores, 'folds': row['folds']})
+    
+    if not records:
+        return pd.DataFrame()
+    
+    # Stable sort: ties keep the combination order, independent of task completion order
+    table = pd.DataFrame(records)
+    return table.sort_values(f'train_{select_by}', ascending=False, kind='stable').reset_index(drop=True)
+
+def select_per_fold(table: pd.DataFrame, select_by: str = 'sharpe') -> pd.DataFrame:
+    """Best parameter set of every fold by its train score, with its score on the following test window"""
+    if table.empty:
+        return pd.DataFrame()
+    
+    params = [column for column in table.columns if column != 'folds' and not column.startswith(('train_', 'test_'))]
+    selected = []
+    for fold in range(len(table['folds'].iloc[0])):
+        scores = [folds[fold][f'train_{select_by}'] for folds in table['folds']]
+        best = table.iloc[int(np.argmax(scores))]
+        selected.append({'fold': fold + 1, **best[params].to_dict(), **best['folds'][fold]})
+    return pd.DataFrame(selected)
+
+class ParameterOptimizer:
+    """Grid or random search over signal and risk parameters with walk-forward validation"""
+    
+    def __init__(
+        self,
+        base_config: Dict = None,
+        n_splits: int = 3,
+        train_ratio: float = 0.7,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 32
+    ):
+        self.base_config = base_config or {}
+        self.n_splits = n_splits
+        self.train_ratio = train_ratio
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+    
+    def _chunks(self, combos: List[Dict]) -> List[List[Dict]]:
+        """Batch combinations so each task shares indicator periods"""
+        groups = {}
+        for combo in combos:
+            key = tuple(combo.get(name) for name in INDICATOR_PARAMS)
+            groups.setdefault(key, []).append(combo)
+        
+        return [
+            group[i:i + self.chunk_size]
+            for group in groups.values()
+            for i in range(0, len(group), self.chunk_size)
+        ]
+    
+    def optimize(
+        self,
+        multi_tf_data: Dict[str, pd.DataFrame],
+        space: Dict[str, List] = None,
+        n_random: Optional[int] = None,
+        seed: int = 42,
+        select_by: str = 'sharpe',
+        progress: Optional[Callable[[int], None]] = None
+    ) -> pd.DataFrame:
+        """Walk-forward search: every combination scored on each train and test window; see select_per_fold"""
+        space = space or DEFAULT_SPACE
+        combos = random_combinations(space, n_random, seed) if n_random else grid_combinations(space)
+        combos = [c for c in combos if c.get('ema_fast', 0) < c.get('ema_slow', 1)]
+        
+        frames = {tf: df for tf, df in multi_tf_data.items() if not df.empty}
+        if not combos or not frames:
+            return pd.DataFrame()
+        
+        # Each timeframe is split over its own history, since a fixed candle limit
+        # covers a much shorter period on 5m than on 4h
+        splits = {
+            tf: walk_forward_splits(
+                int(df['timestamp'].iloc[0]), int(df['timestamp'].iloc[-1]) + 1,
+                self.n_splits, self.train_ratio
+            )
+            for tf, df in frames.items()
+        }
+        
+        started = time.monotonic()
+        shared = SharedOHLCV(frames)
+        rows = []
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(shared.spec, splits, self.base_config)
+            ) as pool:
+                futures = [pool.submit(evaluate_combinations, chunk) for chunk in self._chunks(combos)]
+                for future in as_completed(futures):
+                    chunk_rows = future.result()
+                    rows.extend(chunk_rows)
+                    if progress:
+                        progress(len(chunk_rows))
+        finally:
+            shared.close()
+        
+        order = {tuple(combo.values()): i for i, combo in enumerate(combos)}
+        rows.sort(key=lambda row: order[tuple(row['params'].values())])
+        table = combination_table(rows, select_by)
+        
+        logger.info(f"Evaluated {len(rows)} parameter sets in {time.monotonic() - started:.1f}s")
+        return table
@@ -0,0 +1,129 @@
+import asyncio
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from signal_bot_3.backtest.engine import BacktestEngine
+from signal_bot_3.config.loader import load_config, enabled_pairs
+from signal_bot_3.data.async_ohlcv_collector import AsyncOHLCVCollector
+from signal_bot_3.core.logger import logger
+
+SCAN_COLUMNS = [
+    'rank', 'exchange', 'symbol', 'signals', 'total_trades', 'win_rate', 'total_pnl',
+    'return_pct', 'sharpe_ratio', 'max_drawdown', 'profit_factor', 'error'
+]
+
+def engine_config(config: Dict) -> Dict:
+    """Flatten the config sections that BacktestEngine reads"""
+    return {
+        **config.get('signal_engine', {}),
+        **config.get('backtesting', {}),
+        **config.get('risk_management', {})
+    }
+
+def run_pair_backtest(
+    exchange: str,
+    symbol: str,
+    multi_tf_data: Dict[str, pd.DataFrame],
+    config: Dict
+) -> Dict:
+    """Backtest one pair; module level so worker processes can unpickle it"""
+    row = {'exchange': exchange, 'symbol': symbol}
+    
+    try:
+        result = BacktestEngine(config).run(multi_tf_data)
+        metrics = result['metrics']
+        
+        row.update({
+            'signals': len(result['signals']),
+            'total_trades': metrics.get('total_trades', 0),
+            'win_rate': metrics.get('win_rate', 0.0),
+            'total_pnl': metrics.get('total_pnl', 0.0),
+            'return_pct': metrics.get('return_pct', 0.0),
+            'sharpe_ratio': metrics.get('sharpe_ratio', 0.0),
+            'max_drawdown': metrics.get('max_drawdown', 0.0),
+            'profit_factor': metrics.get('profit_factor', 0.0)
+        })
+    
+    except Exception as e:
+        row['error'] = str(e)
+    
+    return row
+
+class MarketScanner:
+    """Backtests every enabled exchange/symbol pair and ranks the results"""
+    
+    def __init__(
+        self,
+        config: Dict = None,
+        timeframes: List[str] = None,
+        limit: int = 500,
+        max_workers: Optional[int] = None,
+        collector_factory: Callable[[str], AsyncOHLCVCollector] = AsyncOHLCVCollector
+    ):
+        self.config = config or load_config()
+        self.timeframes = timeframes or list(self.config.get('timeframes', {}).values()) or ['5m', '15m', '1h', '4h']
+        self.limit = limit
+        self.max_workers = max_workers
+        self.collector_factory = collector_factory
+        self.engine_config = engine_config(self.config)
+    
+    def pairs(self) -> List[Tuple[str, str]]:
+        """Enabled (exchange, symbol) pairs from config"""
+        return enabled_pairs(self.config)
+    
+    async def scan(
+        self,
+        pairs: List[Tuple[str, str]] = None,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> pd.DataFrame:
+        """Fetch and backtest all pairs concurrently, returning a ranked table"""
+        pairs = pairs or self.pairs()
+        if not pairs:
+            return pd.DataFrame(columns=SCAN_COLUMNS)
+        
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        collectors = {exchange: self.collector_factory(exchange) for exchange in dict.fromkeys(e for e, _ in pairs)}
+        
+        async def scan_pair(pool: ProcessPoolExecutor, exchange: str, symbol: str) -> Dict:
+            # Each pair is backtested as soon as its own candles arrive,
+            # so CPU work overlaps with the downloads of slower pairs
+            try:
+                frames = await collectors[exchange].fetch_many(
+                    [(symbol, tf) for tf in self.timeframes],
+                    self.limit
+                )
+            except Exception as e:
+                logger.error(f"Scan fetch failed for {symbol} on {exchange}: {e}")
+                row = {'exchange': exchange, 'symbol': symbol, 'error': str(e)}
+            else:
+                multi_tf_data = {tf: frames[(symbol, tf)] for tf in self.timeframes}
+                row = await loop.run_in_executor(
+                    pool, run_pair_backtest, exchange, symbol, multi_tf_data, self.engine_config
+                )
+            
+            if progress:
+                progress(row)
+            return row
+        
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                rows = await asyncio.gather(*(scan_pair(pool, exchange, symbol) for exchange, symbol in pairs))
+        finally:
+            for collector in collectors.values():
+                await collector.close()
+        
+        table = self.rank(rows)
+        logger.info(f"Scanned {len(pairs)} pairs in {time.monotonic() - started:.1f}s")
+        return table
+    
+    @staticmethod
+    def rank(rows: List[Dict]) -> pd.DataFrame:
+        """Order results by return, then Sharpe ratio; failed pairs go last"""
+        table = pd.DataFrame(rows).reindex(columns=SCAN_COLUMNS[1:])
+        table = table.sort_values(
+            ['return_pct', 'sharpe_ratio'], ascending=False, na_position='last'
+        ).reset_index(drop=True)
+        table.insert(0, 'rank', range(1, len(table) + 1))
+        return table
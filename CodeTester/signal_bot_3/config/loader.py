@@ -0,0 +1,22 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / 'config.json'
+
+def load_config(path: str = None) -> Dict:
+    """Load bot configuration from JSON"""
+    if path is None:
+        path = os.getenv("CONFIG_PATH", str(DEFAULT_CONFIG_PATH))
+    
+    with open(path) as f:
+        return json.load(f)
+
+def enabled_pairs(config: Dict) -> List[Tuple[str, str]]:
+    """List (exchange, symbol) pairs of every enabled exchange"""
+    pairs = []
+    for exchange, settings in config.get('exchanges', {}).items():
+        if settings.get('enabled', False):
+            pairs.extend((exchange, symbol) for symbol in settings.get('symbols', []))
+    return pairs
@@ -1,11 +1,68 @@
 import asyncio
+from typing import Dict, List
 from signal_bot_3.telegram.telegram_bot import TelegramBot
+from signal_bot_3.config.loader import load_config, enabled_pairs
+from signal_bot_3.data.async_ohlcv_collector import AsyncOHLCVCollector
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+from signal_bot_3.backtest.scanner import MarketScanner
+from signal_bot_3.core.scheduler import Scheduler
 from signal_bot_3.core.logger import logger
 
 class BotController:
-    def __init__(self):
+    def __init__(self, config: Dict = None):
+        self.config = config or load_config()
         self.telegram_bot = TelegramBot()
+        self.scheduler = Scheduler()
         self.running = False
+        self.last_scan = None
+        self._schedule_tasks()
+    
+    def _schedule_tasks(self):
+        """Sync each timeframe just after its candles close and scan pairs periodically"""
+        settings = self.config.get('scheduler', {})
+        timeframes = list(self.config.get('timeframes', {}).values()) or ['5m', '15m', '1h', '4h']
+        
+        for tf in timeframes:
+            self.scheduler.add_task(
+                lambda tf=tf: self.sync_ohlcv(tf),
+                timeframe_to_seconds(tf),
+                name=f"sync-{tf}",
+                align=True,
+                offset=settings.get('sync_offset', 2),
+                jitter=settings.get('sync_jitter', 1.0)
+            )
+        
+        scan_interval = settings.get('scan_interval', 3600)
+        if scan_interval:
+            self.scheduler.add_task(
+                self.scan,
+                scan_interval,
+                name="scan",
+                align=True,
+                offset=settings.get('scan_offset', 30),
+                jitter=settings.get('sync_jitter', 1.0)
+            )
+    
+    async def sync_ohlcv(self, timeframe: str, limit: int = 10):
+        """Fetch the latest candles of one timeframe for every enabled pair"""
+        requests: Dict[str, List] = {}
+        for exchange, symbol in enabled_pairs(self.config):
+            requests.setdefault(exchange, []).append((symbol, timeframe))
+        
+        async def sync_exchange(exchange: str):
+            async with AsyncOHLCVCollector(exchange) as collector:
+                await collector.fetch_many(requests[exchange], limit)
+        
+        await asyncio.gather(*(sync_exchange(exchange) for exchange in requests))
+        logger.info(f"Synced {timeframe} candles of {sum(len(r) for r in requests.values())} pairs")
+    
+    async def scan(self):
+        """Backtest and rank every enabled pair"""
+        table = await MarketScanner(self.config).scan()
+        self.last_scan = table
+        if not table.empty:
+            top = table.iloc[0]
+            logger.info(f"Scheduled scan: best pair {top['exchange']} {top['symbol']} ({top['return_pct']:.2f}%)")
     
     async def start(self):
         """Start bot controller"""
@@ -13,15 +70,21 @@ class BotController:
         self.running = True
         
         try:
-            await asyncio.to_thread(self.telegram_bot.run)
+            # The scheduler keeps syncing and scanning even if the Telegram bot exits
+            await asyncio.gather(asyncio.to_thread(self.telegram_bot.run), self.scheduler.run())
         except KeyboardInterrupt:
             logger.info("Shutdown requested...")
             await self.stop()
         except Exception as e:
             logger.error(f"Bot controller error: {e}")
             await self.stop()
+        finally:
+            await self.scheduler.shutdown()
     
     async def stop(self):
         """Stop bot controller"""
         self.running = False
+        self.scheduler.stop()
+        for name, stats in self.scheduler.stats().items():
+            logger.info(f"Task {name}: {stats['runs']} runs, {stats['skipped']} skipped, {stats['failures']} failed, avg {stats['avg_seconds']:.2f}s")
         logger.info("Bot Controller stopped")
@@ -0,0 +1,309 @@
+import asyncio
+import time
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+from signal_bot_3.config.loader import load_config, enabled_pairs
+from signal_bot_3.data.async_ohlcv_collector import AsyncOHLCVCollector
+from signal_bot_3.data.async_persistence import AsyncMarketDatabase
+from signal_bot_3.data.bar_aggregator import TradeAggregator
+from signal_bot_3.data.batch_writer import OHLCVBatchWriter
+from signal_bot_3.data.candle_window import CandleWindow
+from signal_bot_3.data.persistence import MarketDatabase, create_market_database
+from signal_bot_3.data.timeframes import candle_open, timeframe_to_seconds
+from signal_bot_3.data.ws_collector import WebSocketPool
+from signal_bot_3.data.ws_decoder import KlineEvent
+from signal_bot_3.indicators.streaming import StreamingIndicators
+from signal_bot_3.signals.signal_engine import SignalEngine
+from signal_bot_3.multi_timeframe.timeframe_sync import TimeframeSync
+from signal_bot_3.risk_manager.reward_calculator import RewardCalculator
+from signal_bot_3.risk_manager.position_sizer import PositionSizer
+from signal_bot_3.risk_manager.portfolio_risk import PortfolioRiskManager
+from signal_bot_3.correlation_analyzer.rolling_correlation import RollingCorrelation
+from signal_bot_3.core.logger import logger
+
+class LivePipeline:
+    """Runs the signal pipeline on every closed WebSocket kline"""
+    
+    def __init__(self, config: Dict = None, db: MarketDatabase = None, window_size: int = 500):
+        self.config = config or load_config()
+        self.timeframes = list(self.config.get('timeframes', {}).values()) or ['5m', '15m', '1h', '4h']
+        self.window_size = window_size
+        self.db = db or create_market_database()
+        self.store = AsyncMarketDatabase(self.db)
+        self.writer = OHLCVBatchWriter(self.db)
+        
+        # Sub-minute bars built from the trade stream rank below the kline timeframes
+        self.bar_config = self.config.get('trade_bars', {})
+        self.bar_timeframes = list(self.bar_config.get('timeframes', [])) if self.bar_config.get('enabled') else []
+        self.signal_timeframes = self.bar_timeframes + self.timeframes
+        
+        engine_config = self.engine_config = self.config.get('signal_engine', {})
+        self.signal_engine = SignalEngine(engine_config)
+        self.tf_sync = TimeframeSync(self.signal_timeframes)
+        self.rr_calc = RewardCalculator(min_risk_reward=engine_config.get('risk_reward_min', 1.5))
+        
+        risk_config = {**engine_config, **self.config.get('risk_management', {})}
+        self.pos_sizer = PositionSizer(max_risk_per_trade=risk_config.get('max_risk_per_trade', 0.02))
+        # Closes of one exchange feed the correlation window so venues do not interleave;
+        # symbols not listed there count as uncorrelated
+        pairs = enabled_pairs(self.config)
+        self.correlation_exchange = risk_config.get('correlation_exchange') or (pairs[0][0] if pairs else None)
+        self.correlation_timeframe = risk_config.get('correlation_timeframe', '1h')
+        self.correlation = RollingCorrelation(window=risk_config.get('correlation_window', 100))
+        self.risk = PortfolioRiskManager.from_config(risk_config, correlation=self.correlation)
+        self.account_balance = self.config.get('backtesting', {}).get('initial_capital', 10000)
+        self.max_holding_bars = engine_config.get('max_holding_bars', 100)
+        
+        self.windows: Dict[Tuple[str, str, str], CandleWindow] = {}
+        self.indicators: Dict[Tuple[str, str, str], StreamingIndicators] = {}
+        # Signal of the newest closed candle of every timeframe, per (exchange, symbol)
+        self._signals: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        self.pools: Dict[str, WebSocketPool] = {}
+        self.aggregators: Dict[Tuple[str, str], TradeAggregator] = {}
+        self._kline_streams: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+        self._last_signal_ts: Dict[Tuple[str, str], int] = {}
+        self.running = False
+    
+    def streams(self) -> List[Tuple[str, str, str]]:
+        """List (exchange, symbol, timeframe) streams from config"""
+        return [
+            (exchange, symbol, tf)
+            for exchange, symbol in enabled_pairs(self.config)
+            for tf in self.timeframes
+        ]
+    
+    async def warm_up(self):
+        """Seed every candle window with REST history"""
+        requests = {}
+        for exchange, symbol, tf in self.streams():
+            requests.setdefault(exchange, []).append((symbol, tf))
+        
+        async def sync_exchange(exchange: str) -> Dict:
+            async with AsyncOHLCVCollector(exchange, store=self.store) as collector:
+                return await collector.fetch_many(requests[exchange], limit=self.window_size)
+        
+        results = await asyncio.gather(*(sync_exchange(exchange) for exchange in requests))
+        
+        for exchange, frames in zip(requests, results):
+            for (symbol, tf), df in frames.items():
+                # The current candle is still forming; its closed kline arrives later
+                if not df.empty:
+                    df = df[df['timestamp'] < candle_open(int(time.time()), tf)]
+                window = CandleWindow(self.window_size, exchange, symbol, tf)
+                window.extend(df)
+                self.windows[(exchange, symbol, tf)] = window
+                self.indicators[(exchange, symbol, tf)] = StreamingIndicators.from_frame(window.to_frame(), self.engine_config)
+                self.refresh_signal(exchange, symbol, tf)
+        
+        self.correlation.seed({
+            symbol: window.to_frame() for (exchange, symbol, tf), window in self.windows.items()
+            if exchange == self.correlation_exchange and tf == self.correlation_timeframe
+        })
+        logger.info(f"Live pipeline warmed up {len(self.windows)} streams")
+    
+    async def on_kline(self, exchange: str, symbol: str, timeframe: str, events: List[KlineEvent]):
+        """Handle a batch of kline events and evaluate signals when a candle closes"""
+        for event in events:
+            if event.closed:
+                await self.on_candle(exchange, symbol, timeframe, event.to_candle())
+    
+    async def on_bar(self, exchange: str, symbol: str, label: str, candle: Dict):
+        """Handle a bar closed by a trade aggregator"""
+        if label in self.bar_timeframes:
+            await self.on_candle(exchange, symbol, label, candle)
+        else:
+            # Tick and volume bars have no fixed duration, so they are stored but not traded
+            self.writer.submit_candle(exchange, symbol, label, candle)
+    
+    async def on_candle(self, exchange: str, symbol: str, timeframe: str, candle: Dict):
+        """Store a closed candle and evaluate signals of its symbol"""
+        self.apply_candle(exchange, symbol, timeframe, candle)
+        self.writer.submit_candle(exchange, symbol, timeframe, candle)
+        
+        signal = self.evaluate(exchange, symbol, timeframe)
+        if signal:
+            await self.store.insert_signal(signal)
+    
+    def apply_candle(self, exchange: str, symbol: str, timeframe: str, candle: Dict):
+        """Update the window, correlation and open-risk state with a closed candle"""
+        self.append_candle(exchange, symbol, timeframe, candle)
+        
+        if exchange == self.correlation_exchange and timeframe == self.correlation_timeframe:
+            self.correlation.update(symbol, candle['timestamp'], candle['close'])
+        
+        # Signals stop counting against portfolio limits once they resolve or expire;
+        # only candles of a position's own stream that open after its entry can resolve it
+        self.risk.check_exits(symbol, candle['high'], candle['low'], timeframe, candle['timestamp'], exchange)
+        self.risk.release_until(candle['timestamp'] + timeframe_to_seconds(timeframe))
+    
+    async def backfill(self, exchange: str, streams: List[str]):
+        """Merge candles that closed while a connection was down into their windows"""
+        now = int(time.time())
+        missing = []
+        for stream in streams:
+            key = self._kline_streams.get((exchange, stream))
+            window = self.windows.get(key) if key else None
+            if window is None or window.last_timestamp is None:
+                continue
+            
+            timeframe = key[2]
+            step = timeframe_to_seconds(timeframe)
+            last_closed = candle_open(now, timeframe) - step
+            if window.last_timestamp < last_closed:
+                missing.append((key, window.last_timestamp + step, last_closed))
+        
+        if not missing:
+            return
+        
+        async with AsyncOHLCVCollector(exchange, store=self.store) as collector:
+            frames = await asyncio.gather(*(
+                collector.fetch_between(symbol, tf, start, end)
+                for (_, symbol, tf), start, end in missing
+            ))
+        
+        # Replayed without evaluation: the signals of those bars are already stale
+        for ((_, symbol, tf), start, end), df in zip(missing, frames):
+            for candle in df.to_dict('records'):
+                self.apply_candle(exchange, symbol, tf, candle)
+            self.refresh_signal(exchange, symbol, tf)
+            
+            expected = (end - start) // timeframe_to_seconds(tf) + 1
+            logger.info(f"Backfilled {len(df)}/{expected} missed {tf} candles of {symbol} on {exchange}")
+    
+    def append_candle(self, exchange: str, symbol: str, timeframe: str, candle: Dict):
+        """Add a closed candle to its rolling window and advance its indicator state"""
+        key = (exchange, symbol, timeframe)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = CandleWindow(self.window_size, exchange, symbol, timeframe)
+        
+        state = self.indicators.get(key)
+        if not window.update(candle):
+            return
+        
+        if state is None or state.timestamp is None or candle['timestamp'] > state.timestamp:
+            state = self.indicators.setdefault(key, StreamingIndicators(self.engine_config))
+            state.update(candle['timestamp'], candle['high'], candle['low'], candle['close'], candle['volume'])
+        else:
+            # A revised newest candle cannot be taken back out of the running averages
+            self.indicators[key] = StreamingIndicators.from_frame(window.to_frame(), self.engine_config)
+    
+    def frames(self, exchange: str, symbol: str) -> Dict:
+        """Window frames of every signal timeframe of one symbol"""
+        return {
+            tf: self.windows[(exchange, symbol, tf)].to_frame()
+            for tf in self.signal_timeframes
+            if (exchange, symbol, tf) in self.windows
+        }
+    
+    def refresh_signal(self, exchange: str, symbol: str, timeframe: str):
+        """Re-evaluate the newest closed candle of one stream from its indicator state"""
+        signals = self._signals.setdefault((exchange, symbol), {})
+        state = self.indicators.get((exchange, symbol, timeframe))
+        if state is None:
+            return
+        
+        signal = self.signal_engine.generate_signal_from_state(state, timeframe, partial(self.frames, exchange, symbol))
+        if signal:
+            signals[timeframe] = signal
+        else:
+            signals.pop(timeframe, None)
+    
+    def evaluate(self, exchange: str, symbol: str, timeframe: str) -> Optional[Dict]:
+        """Re-evaluate the timeframe that just closed and sync it with the others of its symbol"""
+        self.refresh_signal(exchange, symbol, timeframe)
+        
+        # Copies: the cached signals stay as generated while synced ones are annotated
+        signals = self._signals[(exchange, symbol)]
+        synced = self.tf_sync.sync_signals({tf: dict(signal) for tf, signal in signals.items()})
+        
+        if not synced or not self.rr_calc.is_valid_signal(synced):
+            return None
+        
+        key = (exchange, symbol)
+        if self._last_signal_ts.get(key) == synced['timestamp']:
+            return None
+        self._last_signal_ts[key] = synced['timestamp']
+        
+        synced['exchange'] = exchange
+        synced['symbol'] = symbol
+        
+        position_size = self.pos_sizer.calculate_position_size(synced, self.account_balance)
+        position_size = self.risk.admit(synced, position_size, self.account_balance)
+        if not position_size:
+            return None
+        
+        synced['position_size'] = position_size
+        step = timeframe_to_seconds(synced['timeframe'])
+        self.risk.open(synced, position_size, synced['timestamp'] + (self.max_holding_bars + 1) * step)
+        return synced
+    
+    async def run(self):
+        """Warm up and consume kline streams until stopped"""
+        self.running = True
+        self.writer.start()
+        await self.warm_up()
+        
+        for exchange, symbol, tf in self.streams():
+            if exchange not in self.pools:
+                self.pools[exchange] = self._pool(exchange)
+            
+            stream = self.pools[exchange].adapter.kline_stream(symbol, tf)
+            self._kline_streams[(exchange, stream)] = (exchange, symbol, tf)
+            await self.pools[exchange].subscribe({stream: partial(self.on_kline, exchange, symbol, tf)})
+        
+        if self.bar_config.get('enabled'):
+            await self.subscribe_trades()
+        
+        logger.info(f"Live pipeline listening on {len(self.streams())} kline streams")
+        await asyncio.gather(
+            *(pool.run() for pool in self.pools.values()),
+            *([self._flush_bars()] if self.aggregators else [])
+        )
+    
+    def _pool(self, exchange: str) -> WebSocketPool:
+        """Connection pool of an exchange that backfills missed candles on every (re)connect"""
+        return WebSocketPool(
+            exchange,
+            config=self.config.get('websocket', {}),
+            on_connect=partial(self.backfill, exchange)
+        )
+    
+    async def subscribe_trades(self):
+        """Build bars from the trade stream of every enabled pair"""
+        volume_sizes = self.bar_config.get('volume', {})
+        
+        for exchange, symbol in enabled_pairs(self.config):
+            aggregator = TradeAggregator(
+                exchange, symbol,
+                timeframes=self.bar_timeframes,
+                tick_sizes=self.bar_config.get('ticks', []),
+                volume_sizes=volume_sizes.get(symbol, []),
+                on_bar=partial(self.on_bar, exchange)
+            )
+            self.aggregators[(exchange, symbol)] = aggregator
+            
+            if exchange not in self.pools:
+                self.pools[exchange] = self._pool(exchange)
+            await self.pools[exchange].subscribe({self.pools[exchange].adapter.trade_stream(symbol): aggregator.on_trades})
+        
+        logger.info(f"Building {', '.join(self.bar_timeframes) or 'tick/volume'} bars from {len(self.aggregators)} trade streams")
+    
+    async def _flush_bars(self):
+        """Close time bars of quiet symbols; the delay leaves room for trades still in flight"""
+        delay = self.bar_config.get('flush_delay', 1.0)
+        while self.running:
+            await asyncio.sleep(1.0)
+            now_ms = int((time.time() - delay) * 1000)
+            for aggregator in self.aggregators.values():
+                await aggregator.flush(now_ms)
+    
+    async def stop(self):
+        """Close all WebSocket connections"""
+        self.running = False
+        for pool in self.pools.values():
+            await pool.close()
+        await asyncio.to_thread(self.writer.close)
+        self.store.log_stats()
+        await asyncio.to_thread(self.store.close)
+        logger.info("Live pipeline stopped")
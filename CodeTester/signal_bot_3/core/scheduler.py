@@ -1,28 +1,195 @@
 import asyncio
-from datetime import datetime
+import heapq
+import itertools
+import math
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 from signal_bot_3.core.logger import logger
 
+class ScheduledTask:
+    """A periodic coroutine with its own cadence, concurrency limit and runtime stats"""
+    
+    __slots__ = (
+        'name', 'coro', 'interval', 'align', 'offset', 'jitter', 'max_concurrency',
+        'next_run', 'base', 'active', 'runs', 'skipped', 'failures',
+        'total_time', 'max_time', 'last_duration', 'last_started'
+    )
+    
+    def __init__(
+        self,
+        name: str,
+        coro: Callable[[], Awaitable],
+        interval: float,
+        align: bool = False,
+        offset: float = 0.0,
+        jitter: float = 0.0,
+        max_concurrency: int = 1
+    ):
+        self.name = name
+        self.coro = coro
+        self.interval = interval
+        self.align = align
+        self.offset = offset
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        
+        self.next_run: Optional[float] = None
+        self.base: Optional[float] = None
+        self.active: Set[asyncio.Task] = set()
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_duration: Optional[float] = None
+        self.last_started: Optional[float] = None
+    
+    def schedule(self, now: float, rng: random.Random, immediate: bool = False) -> float:
+        """Set the next deadline after now"""
+        if immediate:
+            self.base = now
+        elif self.align:
+            # Next epoch multiple of the interval, shifted by the offset (e.g. 2s after a 5m close)
+            self.base = (math.floor((now - self.offset) / self.interval) + 1) * self.interval + self.offset
+        elif self.base is not None and self.base + self.interval > now:
+            # Fixed rate: runs do not drift by their own duration
+            self.base += self.interval
+        else:
+            self.base = now + self.interval
+        
+        self.next_run = self.base + (rng.uniform(0.0, self.jitter) if self.jitter > 0 else 0.0)
+        return self.next_run
+    
+    def stats(self) -> Dict:
+        """Run counters and timings"""
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'running': len(self.active),
+            'skipped': self.skipped,
+            'failures': self.failures,
+            'avg_seconds': self.total_time / self.runs if self.runs else 0.0,
+            'max_seconds': self.max_time,
+            'last_seconds': self.last_duration,
+            'next_run': self.next_run
+        }
+
 class Scheduler:
-    def __init__(self):
-        self.tasks = []
+    """Runs periodic tasks from a heap of deadlines, each on its own timer"""
+    
+    def __init__(self, clock: Callable[[], float] = time.time, seed: Optional[int] = None):
+        self.tasks: List[ScheduledTask] = []
         self.running = False
+        self.clock = clock
+        self._rng = random.Random(seed)
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
     
-    def add_task(self, coro, interval: int):
-        """Add periodic task"""
-        self.tasks.append({'coro': coro, 'interval': interval})
-        logger.info(f"Task scheduled with interval {interval}s")
+    def add_task(
+        self,
+        coro: Callable[[], Awaitable],
+        interval: float,
+        name: Optional[str] = None,
+        align: bool = False,
+        offset: float = 0.0,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        immediate: bool = False
+    ) -> ScheduledTask:
+        """Add periodic task; runs beyond max_concurrency are skipped, not queued"""
+        task = ScheduledTask(
+            name or getattr(coro, '__name__', f"task-{len(self.tasks)}"),
+            coro, interval, align, offset, jitter, max_concurrency
+        )
+        self.tasks.append(task)
+        self._push(task, immediate)
+        
+        logger.info(f"Task {task.name} scheduled every {interval}s{' on candle boundaries' if align else ''}")
+        return task
+    
+    def _push(self, task: ScheduledTask, immediate: bool = False):
+        """Put the task's next deadline on the heap"""
+        deadline = task.schedule(self.clock(), self._rng, immediate)
+        heapq.heappush(self._heap, (deadline, next(self._seq), task))
+        if self._wake is not None:
+            self._wake.set()
+    
+    def _fire(self, task: ScheduledTask):
+        """Start one run unless the task is already at its concurrency limit"""
+        if len(task.active) >= task.max_concurrency:
+            task.skipped += 1
+            logger.warning(f"Task {task.name} still running, skipping this run ({task.skipped} skipped)")
+            return
+        
+        run = asyncio.create_task(self._execute(task), name=f"scheduled-{task.name}")
+        task.active.add(run)
+        run.add_done_callback(task.active.discard)
+    
+    async def _execute(self, task: ScheduledTask):
+        """Run the coroutine and record how long it took"""
+        task.last_started = self.clock()
+        started = time.monotonic()
+        try:
+            await task.coro()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            task.failures += 1
+            logger.error(f"Scheduled task {task.name} failed: {e}")
+        finally:
+            duration = time.monotonic() - started
+            task.runs += 1
+            task.total_time += duration
+            task.max_time = max(task.max_time, duration)
+            task.last_duration = duration
+            
+            if duration > task.interval:
+                logger.warning(f"Task {task.name} took {duration:.1f}s, longer than its {task.interval}s interval")
     
     async def run(self):
         """Run scheduler"""
         self.running = True
-        logger.info("Scheduler started")
+        self._wake = asyncio.Event()
+        logger.info(f"Scheduler started with {len(self.tasks)} tasks")
         
         while self.running:
-            for task in self.tasks:
-                asyncio.create_task(task['coro']())
-                await asyncio.sleep(task['interval'])
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, task = heapq.heappop(self._heap)
+                self._fire(task)
+                self._push(task)
+            
+            timeout = max(0.0, self._heap[0][0] - self.clock()) if self._heap else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
     
     def stop(self):
         """Stop scheduler"""
+        if self.running:
+            logger.info("Scheduler stopped")
         self.running = False
-        logger.info("Scheduler stopped")
+        if self._wake is not None:
+            self._wake.set()
+    
+    async def shutdown(self, timeout: float = 30.0):
+        """Stop scheduling and wait for running tasks, cancelling those that overrun"""
+        self.stop()
+        active = [run for task in self.tasks for run in task.active]
+        if not active:
+            return
+        
+        done, pending = await asyncio.wait(active, timeout=timeout)
+        for run in pending:
+            run.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"Cancelled {len(pending)} scheduled runs at shutdown")
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Per-task runtime stats"""
+        return {task.name: task.stats() for task in self.tasks}
@@ -0,0 +1,187 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+from signal_bot_3.core.logger import logger
+
+class RollingCorrelation:
+    """Rolling log-return correlation of many symbols kept in a ring buffer with running sums"""
+    
+    def __init__(self, window: int = 100, symbols: Iterable[str] = (), capacity: int = 16):
+        self.window = window
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.count = 0
+        
+        symbols = list(symbols)
+        capacity = max(capacity, len(symbols), 1)
+        self._returns = np.zeros((window, capacity))
+        self._sums = np.zeros(capacity)
+        self._products = np.zeros((capacity, capacity))
+        self._last_close = np.full(capacity, np.nan)
+        self._head = 0
+        self._updates = 0
+        
+        self._row_ts: Optional[int] = None
+        self._row: Dict[int, float] = {}
+        self._committed_ts: Optional[int] = None
+        
+        for symbol in symbols:
+            self.add_symbol(symbol)
+    
+    def add_symbol(self, symbol: str) -> int:
+        """Start tracking a symbol; its history begins with zero returns"""
+        if symbol in self.index:
+            return self.index[symbol]
+        
+        n = len(self.symbols)
+        if n == len(self._sums):
+            # Grow by doubling, so adding symbols stays amortized O(n) per symbol
+            size = 2 * n
+            self._returns = np.pad(self._returns, ((0, 0), (0, size - n)))
+            self._sums = np.pad(self._sums, (0, size - n))
+            self._products = np.pad(self._products, ((0, size - n), (0, size - n)))
+            self._last_close = np.pad(self._last_close, (0, size - n), constant_values=np.nan)
+        
+        self.symbols.append(symbol)
+        self.index[symbol] = n
+        return n
+    
+    def update(self, symbol: str, timestamp: int, close: float):
+        """Feed one closed candle; a row is committed once every symbol reported or a newer candle arrives"""
+        i = self.add_symbol(symbol)
+        
+        if self._committed_ts is not None and timestamp <= self._committed_ts:
+            return
+        if self._row_ts is not None and timestamp < self._row_ts:
+            return
+        if self._row_ts is not None and timestamp > self._row_ts:
+            self._commit()
+        
+        self._row_ts = timestamp
+        self._row[i] = close
+        if len(self._row) == len(self.symbols):
+            self._commit()
+    
+    def _commit(self):
+        """Turn the pending closes into a return row and push it"""
+        n = len(self.symbols)
+        closes = self._last_close[:n].copy()
+        for i, close in self._row.items():
+            closes[i] = close
+        
+        # Symbols without a candle, or without a previous close, contribute a zero return
+        returns = np.log(closes / self._last_close[:n])
+        returns[~np.isfinite(returns)] = 0.0
+        
+        self._last_close[:n] = closes
+        self._committed_ts = self._row_ts
+        self._row_ts = None
+        self._row = {}
+        self.push(returns)
+    
+    def push(self, returns: np.ndarray):
+        """Add one aligned return row, dropping the oldest: O(n^2)"""
+        n = len(self.symbols)
+        row = np.zeros(len(self._sums))
+        row[:n] = returns
+        
+        if self.count == self.window:
+            old = self._returns[self._head]
+            self._sums -= old
+            self._products -= np.outer(old, old)
+        else:
+            self.count += 1
+        
+        self._returns[self._head] = row
+        self._sums += row
+        self._products += np.outer(row, row)
+        self._head = (self._head + 1) % self.window
+        
+        # Rebuild the sums from the buffer once per window so rounding error cannot build up
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._sums = self._returns.sum(axis=0)
+            self._products = self._returns.T @ self._returns
+    
+    def seed(self, frames: Dict[str, pd.DataFrame]):
+        """Fill the window from candle history of each symbol, aligned on timestamp"""
+        closes = pd.DataFrame({
+            symbol: df.set_index('timestamp')['close']
+            for symbol, df in frames.items() if not df.empty
+        }).sort_index().ffill()
+        
+        for symbol in closes.columns:
+            self.add_symbol(symbol)
+        
+        for timestamp, row in zip(closes.index[-(self.window + 1):], closes.to_numpy()[-(self.window + 1):]):
+            for symbol, close in zip(closes.columns, row):
+                if not math.isnan(close):
+                    self.update(symbol, int(timestamp), float(close))
+        if self._row:
+            self._commit()
+        
+        logger.info(f"Correlation window seeded with {self.count} rows of {len(self.symbols)} symbols")
+    
+    def _covariance(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Covariance matrix and standard deviations of the tracked symbols"""
+        n = len(self.symbols)
+        mean = self._sums[:n] / self.count
+        covariance = self._products[:n, :n] / self.count - np.outer(mean, mean)
+        return covariance, np.sqrt(np.maximum(np.diag(covariance), 0.0))
+    
+    def matrix(self) -> pd.DataFrame:
+        """Full correlation matrix; symbols without variance correlate 0"""
+        n = len(self.symbols)
+        if self.count < 2:
+            return pd.DataFrame(np.eye(n), index=self.symbols, columns=self.symbols)
+        
+        covariance, std = self._covariance()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = covariance / np.outer(std, std)
+        corr = np.clip(np.nan_to_num(corr), -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+    
+    def correlations(self, symbol: str, others: List[str]) -> np.ndarray:
+        """Correlation of one symbol with several others: O(len(others))"""
+        if symbol not in self.index or self.count < 2:
+            return np.zeros(len(others))
+        
+        i = self.index[symbol]
+        idx = np.array([self.index.get(other, -1) for other in others], dtype=np.int64)
+        known = idx >= 0
+        
+        n = len(self.symbols)
+        mean = self._sums[:n] / self.count
+        cov = self._products[i, :n] / self.count - mean[i] * mean
+        var = np.maximum(np.diag(self._products)[:n] / self.count - mean * mean, 0.0)
+        
+        result = np.zeros(len(others))
+        denominator = np.sqrt(var[i] * var[idx[known]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[known] = np.where(denominator > 0, cov[idx[known]] / denominator, 0.0)
+        result[np.array([other == symbol for other in others], dtype=bool)] = 1.0
+        return np.clip(result, -1.0, 1.0)
+    
+    def correlation(self, a: str, b: str) -> float:
+        """Correlation of two symbols"""
+        return float(self.correlations(a, [b])[0])
+    
+    def book_correlation(
+        self,
+        symbol: str,
+        direction: int,
+        book: List[Tuple[str, int, float]]
+    ) -> float:
+        """Risk-weighted correlation with open (symbol, direction, risk) entries; opposite sides count negatively"""
+        if not book:
+            return 0.0
+        
+        symbols = [entry[0] for entry in book]
+        signs = np.array([direction * entry[1] for entry in book], dtype=np.float64)
+        weights = np.array([entry[2] for entry in book], dtype=np.float64)
+        if weights.sum() <= 0:
+            weights = np.ones(len(book))
+        
+        return float(np.dot(self.correlations(symbol, symbols) * signs, weights) / weights.sum())
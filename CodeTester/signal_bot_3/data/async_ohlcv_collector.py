@@ -0,0 +1,167 @@
+import asyncio
+import time
+import aiohttp
+import ccxt.async_support as ccxt_async
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+from signal_bot_3.config.loader import load_config
+from signal_bot_3.data.ohlcv_collector import OHLCVCollector
+from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.data.async_persistence import AsyncMarketDatabase
+from signal_bot_3.core.logger import logger
+import os
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate_per_minute`"""
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        """Add the tokens earned since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and take them"""
+        # The lock keeps waiters in FIFO order so no request starves
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+def create_session(max_connections: int = 100) -> aiohttp.ClientSession:
+    """Keep-alive HTTP session that several collectors can share (call inside a running loop)"""
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+        enable_cleanup_closed=True
+    )
+    return aiohttp.ClientSession(connector=connector, trust_env=True)
+
+class AsyncOHLCVCollector(OHLCVCollector):
+    """OHLCVCollector on ccxt.async_support with rate limiting and bounded concurrency"""
+    
+    def __init__(
+        self,
+        exchange_name: str = 'binance',
+        rate_limit: Optional[float] = None,
+        max_concurrency: int = 8,
+        session: Optional[aiohttp.ClientSession] = None,
+        exchange=None,
+        db: Optional[MarketDatabase] = None,
+        store: Optional[AsyncMarketDatabase] = None
+    ):
+        self.session = session
+        self._exchange = exchange
+        super().__init__(exchange_name, db=store.db if store is not None else db)
+        
+        # Database calls go to worker threads so they never stall the event loop
+        self._owns_db = store is None and db is None
+        self._owns_store = store is None
+        self.store = store or AsyncMarketDatabase(self.db)
+        
+        if rate_limit is None:
+            rate_limit = self._configured_rate_limit(exchange_name)
+        
+        self.rate_limiter = TokenBucket(rate_limit)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+    
+    @staticmethod
+    def _configured_rate_limit(name: str) -> float:
+        """Requests per minute from config.json, 1200 if not set"""
+        try:
+            return float(load_config()['exchanges'][name]['rate_limit'])
+        except (OSError, KeyError, ValueError):
+            return 1200.0
+    
+    def _init_exchange(self, name: str):
+        """Initialize async exchange connection"""
+        if self._exchange is not None:
+            return self._exchange
+        
+        exchange_class = getattr(ccxt_async, name)
+        
+        api_key = os.getenv(f"{name.upper()}_API_KEY")
+        api_secret = os.getenv(f"{name.upper()}_API_SECRET")
+        
+        # Throttling is done by our token bucket, shared by every request of this collector
+        config = {
+            'enableRateLimit': False,
+            'options': {'defaultType': 'future'}
+        }
+        
+        if api_key and api_secret:
+            config['apiKey'] = api_key
+            config['secret'] = api_secret
+        
+        if self.session is not None:
+            config['session'] = self.session
+        
+        exchange = exchange_class(config)
+        logger.info(f"Initialized async {name} exchange")
+        return exchange
+    
+    async def _db_read(self, method: str, *args):
+        """Run a MarketDatabase query on a read-only connection"""
+        return await self.store.read(method, *args)
+    
+    async def _db_write(self, method: str, *args):
+        """Queue a MarketDatabase write on the writer thread"""
+        return await self.store.write(method, *args)
+    
+    async def _fetch_raw(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: Optional[int],
+        limit: int
+    ) -> List[List]:
+        """Call the exchange OHLCV endpoint (since in milliseconds)"""
+        await self.rate_limiter.acquire()
+        async with self.semaphore:
+            return await self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+    
+    async def fetch_many(
+        self,
+        requests: List[Tuple[str, str]],
+        limit: int = 500,
+        progress: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """Sync every (symbol, timeframe) concurrently"""
+        async def sync(symbol: str, timeframe: str) -> pd.DataFrame:
+            df = await self.sync_ohlcv(symbol, timeframe, limit)
+            if progress:
+                progress(symbol, timeframe)
+            return df
+        
+        results = await asyncio.gather(*(sync(symbol, tf) for symbol, tf in requests))
+        return dict(zip(requests, results))
+    
+    async def close(self):
+        """Release the exchange connection (a shared session, database or store is left open)"""
+        try:
+            await self.exchange.close()
+        except Exception as e:
+            logger.error(f"Error closing {self.exchange_name} exchange: {e}")
+        
+        if self._owns_store:
+            await asyncio.to_thread(self.store.close)
+        if self._owns_db:
+            self.db.close()
+    
+    async def __aenter__(self) -> 'AsyncOHLCVCollector':
+        """Use the collector as an async context manager"""
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the exchange on exit"""
+        await self.close()
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+import weakref
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from signal_bot_3.data.persistence import MarketDatabase, create_market_database
+from signal_bot_3.core.logger import logger
+
+class LatencyStats:
+    """Running latency counters with a window for percentiles"""
+    
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+    
+    def add(self, seconds: float):
+        """Record one operation"""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+    
+    def summary(self) -> Dict:
+        """Averages and percentiles in milliseconds"""
+        recent = np.array(self._recent) if self._recent else np.zeros(1)
+        return {
+            'count': self.count,
+            'avg_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': float(np.percentile(recent, 50)) * 1000,
+            'p95_ms': float(np.percentile(recent, 95)) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+class AsyncMarketDatabase:
+    """Awaitable MarketDatabase: one writer thread plus a pool of read-only connections"""
+    
+    def __init__(self, db: MarketDatabase = None, max_pending: int = 1000, readers: int = 4):
+        self.db = db or create_market_database()
+        self.max_pending = max_pending
+        # Submitted writes, including callers still waiting for a slot; admitted ones hold a slot
+        self.pending_writes = 0
+        self.admitted_writes = 0
+        self.write_latency = LatencyStats()
+        self.read_latency = LatencyStats()
+        
+        self._local = threading.local()
+        self._clones: List[MarketDatabase] = []
+        self._clones_lock = threading.Lock()
+        # asyncio primitives bind to one loop, and run_backtest and scheduler syncs
+        # reach this facade from their own asyncio.run loops in other threads
+        self._slots: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+        
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='db-writer',
+            initializer=self._open_connection, initargs=(False,)
+        )
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix='db-reader',
+            initializer=self._open_connection, initargs=(True,)
+        )
+    
+    def _open_connection(self, read_only: bool):
+        """Give the current worker thread its own connection"""
+        clone = self.db.clone(read_only)
+        self._local.db = clone
+        with self._clones_lock:
+            self._clones.append(clone)
+    
+    def _loop_slots(self) -> asyncio.Semaphore:
+        """Pending-write limit of the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._clones_lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.max_pending)
+        return slots
+    
+    def _call(self, method: str, args: Tuple) -> Any:
+        """Run a MarketDatabase method on this thread's connection"""
+        return getattr(self._local.db, method)(*args)
+    
+    async def write(self, method: str, *args) -> Any:
+        """Run a writing method on the writer thread, waiting while the queue is full"""
+        started = time.monotonic()
+        self.pending_writes += 1
+        try:
+            async with self._loop_slots():
+                self.admitted_writes += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._writer, self._call, method, args)
+                finally:
+                    self.admitted_writes -= 1
+        finally:
+            self.pending_writes -= 1
+            self.write_latency.add(time.monotonic() - started)
+    
+    async def read(self, method: str, *args) -> Any:
+        """Run a query method on one of the read-only connections"""
+        started = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._readers, self._call, method, args)
+        finally:
+            self.read_latency.add(time.monotonic() - started)
+    
+    async def insert_ohlcv(self, exchange: str, symbol: str, timeframe: str, data: pd.DataFrame):
+        """Bulk insert OHLCV data"""
+        await self.write('insert_ohlcv', exchange, symbol, timeframe, data)
+    
+    async def insert_signal(self, signal_data: Dict):
+        """Insert trading signal"""
+        await self.write('insert_signal', signal_data)
+    
+    async def mark_hole(self, exchange: str, symbol: str, timeframe: str, start: int, end: int):
+        """Record a range the exchange has no candles for"""
+        await self.write('mark_hole', exchange, symbol, timeframe, start, end)
+    
+    async def get_ohlcv(self, exchange: str, symbol: str, timeframe: str, limit: int = 1000) -> pd.DataFrame:
+        """Retrieve OHLCV data"""
+        return await self.read('get_ohlcv', exchange, symbol, timeframe, limit)
+    
+    async def get_ohlcv_range(self, exchange: str, symbol: str, timeframe: str, start: int, end: int) -> pd.DataFrame:
+        """Retrieve OHLCV data between two candle timestamps (inclusive)"""
+        return await self.read('get_ohlcv_range', exchange, symbol, timeframe, start, end)
+    
+    async def get_signals(self, status: str = 'active', limit: int = 100) -> List[Dict]:
+        """Retrieve signals"""
+        return await self.read('get_signals', status, limit)
+    
+    def stats(self) -> Dict:
+        """Queue depth and latency of reads and writes"""
+        return {
+            'queue_depth': self.pending_writes,
+            'admitted': self.admitted_writes,
+            'max_pending': self.max_pending,
+            'write': self.write_latency.summary(),
+            'read': self.read_latency.summary()
+        }
+    
+    def log_stats(self):
+        """Log queue depth and latencies"""
+        stats = self.stats()
+        logger.info(
+            f"DB queue depth {stats['queue_depth']} ({stats['admitted']}/{stats['max_pending']} admitted), "
+            f"write p95 {stats['write']['p95_ms']:.1f}ms, read p95 {stats['read']['p95_ms']:.1f}ms"
+        )
+    
+    def close(self):
+        """Finish queued work and close every worker connection"""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        
+        with self._clones_lock:
+            for clone in self._clones:
+                clone.conn.close()
+            self._clones.clear()
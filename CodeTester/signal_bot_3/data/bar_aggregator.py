@@ -0,0 +1,228 @@
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+from signal_bot_3.data.ws_decoder import TradeEvent
+
+class TradeBar:
+    """Candle being built from trades"""
+    
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'trades', 'first_ms', 'last_ms')
+    
+    def __init__(self, timestamp: int, price: float, qty: float, trade_ms: int):
+        self.timestamp = timestamp
+        self.open = price
+        self.high = price
+        self.low = price
+        self.close = price
+        self.volume = qty
+        self.trades = 1
+        self.first_ms = trade_ms
+        self.last_ms = trade_ms
+    
+    def add(self, price: float, qty: float, trade_ms: int):
+        """Fold one trade into the bar"""
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += qty
+        self.trades += 1
+        self.last_ms = trade_ms
+    
+    def to_candle(self) -> Dict:
+        """Candle dict as used by the pipeline and MarketDatabase"""
+        return {
+            'timestamp': self.timestamp,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+            'trades': self.trades
+        }
+
+class BarBuilder:
+    """Base for builders that turn a trade stream into closed bars"""
+    
+    def __init__(self, label: str):
+        self.label = label
+        self.bar: Optional[TradeBar] = None
+        self.closed = 0
+    
+    def add(self, trade_ms: int, price: float, qty: float) -> Optional[TradeBar]:
+        """Add a trade; returns the bar it closed, if any"""
+        raise NotImplementedError
+    
+    def flush(self, now_ms: int) -> Optional[TradeBar]:
+        """Close the forming bar if it is due without waiting for a trade"""
+        return None
+    
+    def _close(self) -> TradeBar:
+        """Hand out the forming bar and start over"""
+        bar, self.bar = self.bar, None
+        self.closed += 1
+        return bar
+
+class TimeBarBuilder(BarBuilder):
+    """Bars on fixed time boundaries, e.g. '10s'; intervals without trades produce no bar"""
+    
+    def __init__(self, timeframe: str):
+        super().__init__(timeframe)
+        self.step_ms = timeframe_to_seconds(timeframe) * 1000
+        self.late = 0
+        # End of the last emitted bar; earlier trades would re-open it
+        self.closed_until_ms = 0
+    
+    def add(self, trade_ms: int, price: float, qty: float) -> Optional[TradeBar]:
+        """Add a trade; returns the bar it closed, if any"""
+        if trade_ms < self.closed_until_ms:
+            # Belongs to a bar that was already emitted
+            self.late += 1
+            return None
+        
+        bar = self.bar
+        if bar is not None and trade_ms < bar.timestamp * 1000 + self.step_ms:
+            bar.add(price, qty, trade_ms)
+            return None
+        
+        closed = self._close() if bar is not None else None
+        open_ms = trade_ms - trade_ms % self.step_ms
+        self.bar = TradeBar(open_ms // 1000, price, qty, trade_ms)
+        return closed
+    
+    def flush(self, now_ms: int) -> Optional[TradeBar]:
+        """Close the forming bar once its interval has passed"""
+        if self.bar is not None and now_ms >= self.bar.timestamp * 1000 + self.step_ms:
+            return self._close()
+        return None
+    
+    def _close(self) -> TradeBar:
+        """Hand out the forming bar and refuse later trades for its interval"""
+        self.closed_until_ms = self.bar.timestamp * 1000 + self.step_ms
+        return super()._close()
+
+class SequencedBarBuilder(BarBuilder):
+    """Base for activity bars, keyed by close time since several can close in one millisecond"""
+    
+    # Bars closing in the same millisecond get consecutive sequence numbers
+    SEQUENCE = 1000
+    
+    def __init__(self, label: str):
+        super().__init__(label)
+        self.last_key = 0
+    
+    def _close(self) -> TradeBar:
+        """Hand out the forming bar stamped with close_ms * SEQUENCE + sequence"""
+        bar = super()._close()
+        self.last_key = max(bar.last_ms * self.SEQUENCE, self.last_key + 1)
+        bar.timestamp = self.last_key
+        return bar
+
+class TickBarBuilder(SequencedBarBuilder):
+    """Bars of a fixed number of trades"""
+    
+    def __init__(self, trades: int):
+        super().__init__(f"{trades}t")
+        self.trades = trades
+    
+    def add(self, trade_ms: int, price: float, qty: float) -> Optional[TradeBar]:
+        """Add a trade; returns the bar it closed, if any"""
+        if self.bar is None:
+            self.bar = TradeBar(trade_ms, price, qty, trade_ms)
+        else:
+            self.bar.add(price, qty, trade_ms)
+        
+        return self._close() if self.bar.trades >= self.trades else None
+
+class VolumeBarBuilder(SequencedBarBuilder):
+    """Bars closing once traded volume reaches a threshold; the last trade is not split"""
+    
+    def __init__(self, volume: float):
+        super().__init__(f"{volume:g}v")
+        self.volume = volume
+    
+    def add(self, trade_ms: int, price: float, qty: float) -> Optional[TradeBar]:
+        """Add a trade; returns the bar it closed, if any"""
+        if self.bar is None:
+            self.bar = TradeBar(trade_ms, price, qty, trade_ms)
+        else:
+            self.bar.add(price, qty, trade_ms)
+        
+        return self._close() if self.bar.volume >= self.volume else None
+
+BarCallback = Callable[[str, str, Dict], Awaitable]
+
+class TradeAggregator:
+    """Builds time, tick and volume bars of one symbol from its raw trade events"""
+    
+    def __init__(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframes: List[str] = (),
+        tick_sizes: List[int] = (),
+        volume_sizes: List[float] = (),
+        on_bar: BarCallback = None
+    ):
+        # Time bars are stamped with their open time in seconds like exchange klines;
+        # tick and volume bars can close several times a millisecond, so theirs is
+        # a unique, increasing close-time key (see SequencedBarBuilder)
+        self.exchange = exchange
+        self.symbol = symbol
+        self.on_bar = on_bar
+        self.builders: List[BarBuilder] = (
+            [TimeBarBuilder(tf) for tf in timeframes] +
+            [TickBarBuilder(n) for n in tick_sizes] +
+            [VolumeBarBuilder(v) for v in volume_sizes]
+        )
+        self.trades = 0
+    
+    @property
+    def time_builders(self) -> List[TimeBarBuilder]:
+        """Builders of clock-based bars"""
+        return [b for b in self.builders if isinstance(b, TimeBarBuilder)]
+    
+    def add_trade(self, trade_ms: int, price: float, qty: float) -> List[Tuple[str, TradeBar]]:
+        """Feed one trade to every builder; returns (label, bar) of the bars it closed"""
+        self.trades += 1
+        closed = []
+        for builder in self.builders:
+            bar = builder.add(trade_ms, price, qty)
+            if bar is not None:
+                closed.append((builder.label, bar))
+        return closed
+    
+    async def on_trades(self, events: List[TradeEvent]):
+        """WebSocket callback for a batch of '@trade' events"""
+        closed = []
+        for event in events:
+            closed.extend(self.add_trade(event.time_ms, event.price, event.qty))
+        
+        await self._emit(closed)
+    
+    async def flush(self, now_ms: int = None):
+        """Emit time bars whose interval ended without a trade to close them"""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        closed = []
+        for builder in self.builders:
+            bar = builder.flush(now_ms)
+            if bar is not None:
+                closed.append((builder.label, bar))
+        
+        await self._emit(closed)
+    
+    async def _emit(self, closed: List[Tuple[str, TradeBar]]):
+        """Pass closed bars to the callback"""
+        if self.on_bar is None:
+            return
+        for label, bar in closed:
+            await self.on_bar(self.symbol, label, bar.to_candle())
+    
+    def stats(self) -> Dict:
+        """Trade and bar counters"""
+        return {
+            'trades': self.trades,
+            'bars': {builder.label: builder.closed for builder in self.builders},
+            'late': sum(b.late for b in self.time_builders)
+        }
@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.core.logger import logger
+
+_STOP = object()
+
+class OHLCVBatchWriter:
+    """Background thread that coalesces candle writes of many streams into few commits"""
+    
+    def __init__(self, db: MarketDatabase, max_batch: int = 5000, max_delay: float = 0.5):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.written = 0
+        self.batches = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> 'OHLCVBatchWriter':
+        """Start the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='ohlcv-writer', daemon=True)
+            self._thread.start()
+        return self
+    
+    def submit(self, exchange: str, symbol: str, timeframe: str, data: pd.DataFrame):
+        """Queue a frame of candles; it is converted on the writer thread"""
+        if not data.empty:
+            self._queue.put((exchange, symbol, timeframe, data))
+    
+    def submit_candle(self, exchange: str, symbol: str, timeframe: str, candle: Dict):
+        """Queue one closed candle without building a DataFrame"""
+        self._queue.put(self.db.candle_record(exchange, symbol, timeframe, candle))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is committed"""
+        if self._thread is None:
+            return self._queue.empty()
+        
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Commit what is pending and stop the thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def stats(self) -> Dict:
+        """Return write counters"""
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'queued': self._queue.qsize()
+        }
+    
+    def _commit(self, conn, pending: List[Tuple]):
+        """Write one batch in a single transaction"""
+        records = []
+        for item in pending:
+            if isinstance(item[3], pd.DataFrame):
+                records.extend(self.db.ohlcv_records(*item))
+            else:
+                records.append(item)
+        
+        try:
+            self.db.write_ohlcv_records(conn, records)
+            self.written += len(records)
+            self.batches += 1
+        except Exception as e:
+            logger.error(f"Error writing OHLCV batch of {len(records)} candles: {e}")
+            conn.rollback()
+    
+    def _run(self):
+        """Collect queued frames until the size or time threshold, then commit"""
+        # Connections belong to the thread that writes with them
+        conn = self.db.connect()
+        pending = []
+        pending_rows = 0
+        deadline = None
+        
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                
+                if isinstance(item, tuple):
+                    pending.append(item)
+                    pending_rows += len(item[3]) if isinstance(item[3], pd.DataFrame) else 1
+                    if deadline is None:
+                        deadline = time.monotonic() + self.max_delay
+                    
+                    if pending_rows < self.max_batch and time.monotonic() < deadline:
+                        continue
+                
+                if pending:
+                    self._commit(conn, pending)
+                    pending = []
+                    pending_rows = 0
+                    deadline = None
+                
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is _STOP:
+                    break
+        
+        finally:
+            conn.close()
+            logger.info(f"OHLCV writer stopped after {self.written} candles in {self.batches} batches")
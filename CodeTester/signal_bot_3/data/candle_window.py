@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from signal_bot_3.data.columnar_store import COLUMN_DTYPES
+from signal_bot_3.indicators.cache import tag_frame
+
+class CandleWindow:
+    """Fixed-capacity OHLCV window of one stream on preallocated column arrays"""
+    
+    def __init__(self, capacity: int = 500, exchange: str = None, symbol: str = None, timeframe: str = None):
+        self.capacity = capacity
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.forming = False
+        
+        # Twice the capacity so the live rows are always one contiguous slice;
+        # they are moved back to the front only once per `capacity` appends
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()
+        }
+        self._start = 0
+        self._end = 0
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column arrays; fixed by the capacity"""
+        return sum(column.nbytes for column in self._columns.values())
+    
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Open time of the newest candle, or None when empty"""
+        if self._end == self._start:
+            return None
+        return int(self._columns['timestamp'][self._end - 1])
+    
+    def append(
+        self,
+        timestamp: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        closed: bool = True
+    ) -> bool:
+        """Add a candle, or overwrite the newest one in place if it has the same open time"""
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            return False
+        
+        if last is None or timestamp > last:
+            if self._end == len(self._columns['timestamp']):
+                self._compact()
+            self._end += 1
+            if self._end - self._start > self.capacity:
+                self._start += 1
+        
+        i = self._end - 1
+        columns = self._columns
+        columns['timestamp'][i] = timestamp
+        columns['open'][i] = open
+        columns['high'][i] = high
+        columns['low'][i] = low
+        columns['close'][i] = close
+        columns['volume'][i] = volume
+        self.forming = not closed
+        return True
+    
+    def update(self, candle: Dict, closed: bool = True) -> bool:
+        """append() from a candle dict"""
+        return self.append(
+            candle['timestamp'], candle['open'], candle['high'],
+            candle['low'], candle['close'], candle['volume'], closed
+        )
+    
+    def extend(self, df: pd.DataFrame) -> int:
+        """Replace the contents with the newest closed candles of a frame"""
+        df = df.iloc[-self.capacity:]
+        n = len(df)
+        for name, column in self._columns.items():
+            column[:n] = df[name].to_numpy(dtype=column.dtype)
+        
+        self._start = 0
+        self._end = n
+        self.forming = False
+        return n
+    
+    def _compact(self):
+        """Move the live rows to the front of the arrays"""
+        n = self._end - self._start
+        for column in self._columns.values():
+            column[:n] = column[self._start:self._end]
+        self._start = 0
+        self._end = n
+    
+    def column(self, name: str) -> np.ndarray:
+        """View of one column; valid until the next append"""
+        return self._columns[name][self._start:self._end]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Zero-copy DataFrame view of the window; valid until the next append"""
+        df = pd.DataFrame(
+            {name: self.column(name) for name in self._columns},
+            copy=False
+        )
+        # Every update of a forming candle would be a new cache entry, so
+        # only windows ending in a closed candle use the indicator cache
+        if self.symbol is not None and not self.forming:
+            tag_frame(df, self.exchange, self.symbol, self.timeframe)
+        return df
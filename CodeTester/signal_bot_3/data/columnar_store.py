@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.core.logger import logger
+
+COLUMN_DTYPES = {
+    'timestamp': np.dtype(np.int64),
+    'open': np.dtype(np.float64),
+    'high': np.dtype(np.float64),
+    'low': np.dtype(np.float64),
+    'close': np.dtype(np.float64),
+    'volume': np.dtype(np.float64)
+}
+
+class ColumnarMarketDatabase(MarketDatabase):
+    """MarketDatabase keeping OHLCV in append-only, memory-mapped column files"""
+    
+    # One writer per stream across clone() instances and threads; the column
+    # files and meta.json are updated with an unsynchronized read-modify-write
+    _series_locks: Dict[Path, threading.Lock] = {}
+    _series_locks_guard = threading.Lock()
+    
+    def __init__(self, db_path: str = None, store_path: str = None):
+        if store_path is None:
+            store_path = os.getenv("OHLCV_STORE_PATH", "signal_bot_3/data/ohlcv_store")
+        
+        self.store_path = Path(store_path)
+        self._maps: Dict[Path, Tuple[Tuple[int, int], Dict[str, np.ndarray]]] = {}
+        super().__init__(db_path)
+    
+    def clone(self, read_only: bool = False) -> 'ColumnarMarketDatabase':
+        """Same store on a new connection with its own memory maps"""
+        db = super().clone(read_only)
+        db._maps = {}
+        return db
+    
+    def _series_dir(self, exchange: str, symbol: str, timeframe: str) -> Path:
+        """Directory holding the column files of one stream"""
+        safe_symbol = symbol.replace('/', '_').replace(':', '_')
+        return self.store_path / exchange / safe_symbol / timeframe
+    
+    def _series_lock(self, series_dir: Path) -> threading.Lock:
+        """Write lock of one stream, shared by every instance in the process"""
+        key = series_dir.resolve()
+        with self._series_locks_guard:
+            lock = self._series_locks.get(key)
+            if lock is None:
+                lock = self._series_locks[key] = threading.Lock()
+        return lock
+    
+    def _read_meta(self, series_dir: Path) -> Dict:
+        """Committed row count, timestamp bounds and write version of a stream"""
+        try:
+            with open(series_dir / 'meta.json') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {'rows': 0, 'first': None, 'last': None}
+        meta.setdefault('version', 0)
+        return meta
+    
+    def _write_meta(self, series_dir: Path, meta: Dict, rows: int, first: int, last: int):
+        """Commit the row count; rows past it in the column files are ignored"""
+        # The version tells other instances' cached maps apart from a rewrite with the same row count
+        meta = {'rows': rows, 'first': int(first), 'last': int(last), 'version': meta['version'] + 1}
+        
+        tmp_path = series_dir / 'meta.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, series_dir / 'meta.json')
+        self._maps.pop(series_dir, None)
+    
+    def _columns(self, series_dir: Path, meta: Dict = None) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of the committed rows of every column"""
+        meta = meta or self._read_meta(series_dir)
+        rows = meta['rows']
+        version = (rows, meta['version'])
+        
+        cached = self._maps.get(series_dir)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        if rows == 0:
+            columns = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        else:
+            columns = {
+                name: np.memmap(series_dir / f"{name}.bin", dtype=dtype, mode='r', shape=(rows,))
+                for name, dtype in COLUMN_DTYPES.items()
+            }
+        
+        self._maps[series_dir] = (version, columns)
+        return columns
+    
+    def _append(self, series_dir: Path, rows: int, new: Dict[str, np.ndarray]):
+        """Append rows after the committed ones, dropping bytes of an interrupted write"""
+        for name, dtype in COLUMN_DTYPES.items():
+            with open(series_dir / f"{name}.bin", 'ab') as f:
+                f.truncate(rows * dtype.itemsize)
+                f.write(new[name].tobytes())
+    
+    def _revise_last(self, series_dir: Path, rows: int, last: Dict[str, np.ndarray]):
+        """Overwrite the newest committed row in place; frames mapping it see the revision"""
+        for name, dtype in COLUMN_DTYPES.items():
+            with open(series_dir / f"{name}.bin", 'r+b') as f:
+                f.seek((rows - 1) * dtype.itemsize)
+                f.write(last[name].tobytes())
+    
+    def _rewrite(self, series_dir: Path, merged: Dict[str, np.ndarray]):
+        """Replace every column file; frames already handed out keep reading the old files"""
+        for name in COLUMN_DTYPES:
+            tmp_path = series_dir / f"{name}.bin.tmp"
+            merged[name].tofile(tmp_path)
+            os.replace(tmp_path, series_dir / f"{name}.bin")
+    
+    def insert_ohlcv(self, exchange: str, symbol: str, timeframe: str, data: pd.DataFrame):
+        """Store candles, appending in the common case of newer timestamps"""
+        if data.empty:
+            return
+        
+        try:
+            series_dir = self._series_dir(exchange, symbol, timeframe)
+            series_dir.mkdir(parents=True, exist_ok=True)
+            
+            new = {name: data[name].to_numpy(dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+            
+            # Sort and keep the last copy of duplicated timestamps, like INSERT OR REPLACE
+            order = np.argsort(new['timestamp'], kind='stable')
+            new = {name: values[order] for name, values in new.items()}
+            timestamps = new['timestamp']
+            keep = np.append(timestamps[1:] != timestamps[:-1], True)
+            new = {name: values[keep] for name, values in new.items()}
+            timestamps = new['timestamp']
+            
+            with self._series_lock(series_dir):
+                meta = self._read_meta(series_dir)
+                stored = self._columns(series_dir, meta)
+                stored_ts = stored['timestamp']
+                rows = len(stored_ts)
+                
+                tail = timestamps > stored_ts[-1] if rows else np.ones(len(timestamps), dtype=bool)
+                positions = np.searchsorted(stored_ts, timestamps)
+                exists = ~tail & (stored_ts[np.minimum(positions, rows - 1)] == timestamps) if rows else ~tail
+                
+                changed = np.zeros(len(timestamps), dtype=bool)
+                if exists.any():
+                    for name in COLUMN_DTYPES:
+                        changed[exists] |= stored[name][positions[exists]] != new[name][exists]
+                
+                # Every sync refetches the newest stored candle, so revising it must stay cheap
+                revised_last = changed & (positions == rows - 1)
+                
+                if (~tail & ~exists).any() or (changed & ~revised_last).any():
+                    # A refilled gap or an older revised candle: merge and rewrite
+                    # rather than edit rows in the middle of files that live frames map
+                    merged = {name: np.concatenate([stored[name], new[name]]) for name in COLUMN_DTYPES}
+                    order = np.argsort(merged['timestamp'], kind='stable')
+                    merged = {name: values[order] for name, values in merged.items()}
+                    keep = np.append(merged['timestamp'][:-1] != merged['timestamp'][1:], True)
+                    merged = {name: values[keep] for name, values in merged.items()}
+                    
+                    self._rewrite(series_dir, merged)
+                    self._write_meta(
+                        series_dir, meta, len(merged['timestamp']), merged['timestamp'][0], merged['timestamp'][-1]
+                    )
+                
+                elif revised_last.any() or tail.any():
+                    if revised_last.any():
+                        self._revise_last(series_dir, rows, {name: new[name][revised_last] for name in COLUMN_DTYPES})
+                    if tail.any():
+                        self._append(series_dir, rows, {name: new[name][tail] for name in COLUMN_DTYPES})
+                    first = stored_ts[0] if rows else timestamps[0]
+                    self._write_meta(series_dir, meta, rows + int(tail.sum()), first, timestamps[-1])
+            
+            logger.debug(f"Inserted {len(timestamps)} OHLCV records for {symbol} on {exchange}")
+        
+        except Exception as e:
+            logger.error(f"Error inserting OHLCV data: {e}")
+    
+    def write_ohlcv_records(self, conn, records: List[Tuple]):
+        """Write candle tuples of many streams; column files need no transaction"""
+        streams = {}
+        for record in records:
+            streams.setdefault(record[:3], []).append(record[3:])
+        
+        for (exchange, symbol, timeframe), rows in streams.items():
+            self.insert_ohlcv(exchange, symbol, timeframe, pd.DataFrame(rows, columns=list(COLUMN_DTYPES)))
+    
+    def get_ohlcv_arrays(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Zero-copy column slices for candles in [start, end]"""
+        columns = self._columns(self._series_dir(exchange, symbol, timeframe))
+        timestamps = columns['timestamp']
+        
+        i = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        j = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        
+        return {name: column[i:j] for name, column in columns.items()}
+    
+    def _frame(self, arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Wrap column slices in a DataFrame without copying them"""
+        return pd.DataFrame(arrays, columns=list(COLUMN_DTYPES), copy=False)
+    
+    def get_ohlcv(self, exchange: str, symbol: str, timeframe: str, limit: int = 1000) -> pd.DataFrame:
+        """Retrieve the last `limit` candles"""
+        arrays = self.get_ohlcv_arrays(exchange, symbol, timeframe)
+        return self._frame({name: values[-limit:] for name, values in arrays.items()})
+    
+    def get_ohlcv_range(self, exchange: str, symbol: str, timeframe: str, start: int, end: int) -> pd.DataFrame:
+        """Retrieve OHLCV data between two candle timestamps (inclusive)"""
+        return self._frame(self.get_ohlcv_arrays(exchange, symbol, timeframe, start, end))
+    
+    def get_timestamp_bounds(self, exchange: str, symbol: str, timeframe: str) -> Tuple[Optional[int], Optional[int]]:
+        """Return the first and last stored candle timestamps"""
+        meta = self._read_meta(self._series_dir(exchange, symbol, timeframe))
+        return meta['first'], meta['last']
+    
+    def find_gaps(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        step: int,
+        start: int,
+        end: int
+    ) -> List[Tuple[int, int]]:
+        """Find missing candle ranges between stored candles in [start, end]"""
+        timestamps = self.get_ohlcv_arrays(exchange, symbol, timeframe, start, end)['timestamp']
+        jumps = np.flatnonzero(np.diff(timestamps) > step)
+        
+        gaps = zip((timestamps[jumps] + step).tolist(), (timestamps[jumps + 1] - step).tolist())
+        return self.without_holes(exchange, symbol, timeframe, list(gaps))
+    
+    def close(self):
+        """Drop memory maps and close the SQLite connection"""
+        self._maps.clear()
+        super().close()
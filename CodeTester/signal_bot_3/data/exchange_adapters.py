@@ -0,0 +1,101 @@
+import json
+from typing import Callable, Dict, List, Optional
+from signal_bot_3.data.ws_decoder import BinanceDecoder, BybitDecoder, StreamDecoder, bybit_interval
+
+class ExchangeAdapter:
+    """Stream naming, subscription payloads, heartbeats and decoding of one exchange's WebSocket API"""
+    
+    name = ''
+    ws_url = ''
+    max_streams = 200
+    subscribe_batch_size = 50
+    # Seconds between application-level pings; None when protocol pings are enough
+    ping_interval: Optional[float] = None
+    
+    def __init__(self, ws_url: str = None, loads: Callable = None):
+        if ws_url:
+            self.ws_url = ws_url
+        self.loads = loads
+    
+    def market_id(self, symbol: str) -> str:
+        """Exchange market id of a ccxt symbol ('BTC/USDT' -> 'BTCUSDT')"""
+        return symbol.split(':')[0].replace('/', '').upper()
+    
+    def trade_stream(self, symbol: str) -> str:
+        """Stream name for a symbol's trades"""
+        raise NotImplementedError
+    
+    def kline_stream(self, symbol: str, interval: str) -> str:
+        """Stream name for a symbol's klines"""
+        raise NotImplementedError
+    
+    def subscribe_message(self, streams: List[str], request_id: int) -> str:
+        """Subscription request for a batch of streams"""
+        raise NotImplementedError
+    
+    def ping_message(self) -> Optional[str]:
+        """Application-level ping, if the exchange needs one"""
+        return None
+    
+    def decoder(self) -> StreamDecoder:
+        """New decoder for one connection"""
+        raise NotImplementedError
+
+class BinanceAdapter(ExchangeAdapter):
+    """Binance spot combined streams; the server pings and websockets answers"""
+    
+    name = 'binance'
+    ws_url = 'wss://stream.binance.com:9443/stream'
+    
+    def trade_stream(self, symbol: str) -> str:
+        """Stream name for a symbol's trades"""
+        return f"{self.market_id(symbol).lower()}@trade"
+    
+    def kline_stream(self, symbol: str, interval: str) -> str:
+        """Stream name for a symbol's klines"""
+        return f"{self.market_id(symbol).lower()}@kline_{interval}"
+    
+    def subscribe_message(self, streams: List[str], request_id: int) -> str:
+        """Subscription request for a batch of streams"""
+        return json.dumps({"method": "SUBSCRIBE", "params": streams, "id": request_id})
+    
+    def decoder(self) -> StreamDecoder:
+        """New decoder for one connection"""
+        return BinanceDecoder(self.loads)
+
+class BybitAdapter(ExchangeAdapter):
+    """Bybit v5 public spot streams, matching the spot symbols fetched over REST; idle connections drop without a ping every 20 seconds"""
+    
+    name = 'bybit'
+    ws_url = 'wss://stream.bybit.com/v5/public/spot'
+    subscribe_batch_size = 10
+    ping_interval = 20.0
+    
+    def trade_stream(self, symbol: str) -> str:
+        """Stream name for a symbol's trades"""
+        return f"publicTrade.{self.market_id(symbol)}"
+    
+    def kline_stream(self, symbol: str, interval: str) -> str:
+        """Stream name for a symbol's klines"""
+        return f"kline.{bybit_interval(interval)}.{self.market_id(symbol)}"
+    
+    def subscribe_message(self, streams: List[str], request_id: int) -> str:
+        """Subscription request for a batch of streams"""
+        return json.dumps({"op": "subscribe", "args": streams, "req_id": str(request_id)})
+    
+    def ping_message(self) -> Optional[str]:
+        """Application-level ping, if the exchange needs one"""
+        return json.dumps({"op": "ping"})
+    
+    def decoder(self) -> StreamDecoder:
+        """New decoder for one connection"""
+        return BybitDecoder(self.loads)
+
+ADAPTERS: Dict[str, type] = {
+    'binance': BinanceAdapter,
+    'bybit': BybitAdapter
+}
+
+def get_adapter(exchange: str, ws_url: str = None) -> ExchangeAdapter:
+    """Adapter of an exchange, falling back to Binance for unknown names"""
+    return ADAPTERS.get(exchange, BinanceAdapter)(ws_url)
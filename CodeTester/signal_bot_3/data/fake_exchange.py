@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+import numpy as np
+import websockets
+from typing import Dict, List, Optional, Set
+from signal_bot_3.data.timeframes import timeframe_to_seconds, candle_open
+
+class FakeExchange:
+    """Offline stand-in for a ccxt.async_support exchange with deterministic candles"""
+    
+    def __init__(
+        self,
+        name: str = 'fake',
+        latency: float = 0.0,
+        max_limit: int = 1000,
+        missing: Optional[Set[int]] = None,
+        seed: int = 7
+    ):
+        self.id = name
+        self.latency = latency
+        self.max_limit = max_limit
+        self.missing = missing or set()
+        self.seed = seed
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+    
+    def _noise(self, symbol: str, timestamps: np.ndarray, salt: float) -> np.ndarray:
+        """Repeatable pseudo-random values in [0, 1) for each timestamp"""
+        offset = (sum(map(ord, symbol)) + self.seed) * 0.618 + salt
+        x = np.sin(timestamps * 1e-3 + offset) * 43758.5453
+        return x - np.floor(x)
+    
+    def _close(self, symbol: str, timestamps: np.ndarray) -> np.ndarray:
+        """Close price as a pure function of the candle open time"""
+        base = 100.0 + sum(map(ord, symbol)) % 900
+        trend = 0.05 * np.sin(timestamps / 86400.0) + 0.02 * np.sin(timestamps / 7919.0)
+        return base * (1.0 + trend + 0.004 * (self._noise(symbol, timestamps, 0.0) - 0.5))
+    
+    def candles(self, symbol: str, timeframe: str, start: int, count: int) -> List[List]:
+        """Build `count` candles from `start` (seconds) in ccxt row format"""
+        step = timeframe_to_seconds(timeframe)
+        timestamps = (start + step * np.arange(count)).astype(np.float64)
+        
+        close = self._close(symbol, timestamps)
+        open_ = self._close(symbol, timestamps - step)
+        spread = 0.002 * self._noise(symbol, timestamps, 1.0)
+        high = np.maximum(open_, close) * (1.0 + spread)
+        low = np.minimum(open_, close) * (1.0 - spread)
+        volume = 100.0 + 900.0 * self._noise(symbol, timestamps, 2.0)
+        
+        return [
+            [int(ts) * 1000, float(o), float(h), float(l), float(c), float(v)]
+            for ts, o, h, l, c, v in zip(timestamps, open_, high, low, close, volume)
+            if int(ts) not in self.missing
+        ]
+    
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = '1m',
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+        params: Optional[dict] = None
+    ) -> List[List]:
+        """Return candles like ccxt: oldest first, since in milliseconds, up to the forming one"""
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            
+            step = timeframe_to_seconds(timeframe)
+            now = candle_open(int(time.time()), timeframe)
+            limit = min(limit or 500, self.max_limit)
+            
+            if since is None:
+                start = now - (limit - 1) * step
+            else:
+                start = candle_open(-(-since // 1000), timeframe)
+                if start * 1000 < since:
+                    start += step
+            
+            count = min(limit, max(0, (now - start) // step + 1))
+            return self.candles(symbol, timeframe, start, count)
+        
+        finally:
+            self.in_flight -= 1
+    
+    async def close(self):
+        """Mark the exchange closed"""
+        self.closed = True
+
+class FakeStreamServer:
+    """Local WebSocket server speaking the Binance or Bybit stream protocol for tests"""
+    
+    def __init__(self, exchange: str = 'binance', host: str = '127.0.0.1', port: int = 0):
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self.server = None
+        self.subscriptions: Dict[object, Set[str]] = {}
+        self.requests: List[Dict] = []
+        self.pings = 0
+    
+    @property
+    def url(self) -> str:
+        """ws:// address to point a collector at"""
+        return f"ws://{self.host}:{self.port}"
+    
+    async def start(self) -> 'FakeStreamServer':
+        """Listen on the port, picking a free one if it is 0"""
+        self.server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+    
+    async def close(self):
+        """Drop every connection and stop listening"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+    
+    async def _handle(self, ws):
+        """Answer subscriptions and pings of one connection like the real exchange"""
+        self.subscriptions[ws] = set()
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                self.requests.append(request)
+                
+                if request.get('method') == 'SUBSCRIBE':
+                    self.subscriptions[ws].update(request['params'])
+                    await ws.send(json.dumps({'result': None, 'id': request['id']}))
+                elif request.get('op') == 'subscribe':
+                    self.subscriptions[ws].update(request['args'])
+                    await ws.send(json.dumps({
+                        'success': True, 'ret_msg': '', 'conn_id': 'fake',
+                        'req_id': request.get('req_id', ''), 'op': 'subscribe'
+                    }))
+                elif request.get('op') == 'ping':
+                    self.pings += 1
+                    await ws.send(json.dumps({'success': True, 'ret_msg': 'pong', 'conn_id': 'fake', 'op': 'ping'}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.subscriptions.pop(ws, None)
+    
+    async def _publish(self, stream: str, frame: str) -> int:
+        """Send a frame to every connection subscribed to the stream"""
+        sent = 0
+        for ws, streams in list(self.subscriptions.items()):
+            if stream in streams:
+                await ws.send(frame)
+                sent += 1
+        return sent
+    
+    async def publish_trade(self, symbol: str, price: float, qty: float, time_ms: int, buyer_maker: bool = False, trade_id: int = 0) -> int:
+        """Send one trade of a ccxt symbol in the exchange's native format"""
+        market = symbol.replace('/', '').upper()
+        if self.exchange == 'bybit':
+            stream = f"publicTrade.{market}"
+            frame = {
+                'topic': stream, 'type': 'snapshot', 'ts': time_ms,
+                'data': [{
+                    'T': time_ms, 's': market, 'S': 'Sell' if buyer_maker else 'Buy',
+                    'v': str(qty), 'p': str(price), 'L': 'PlusTick', 'i': str(trade_id), 'BT': False
+                }]
+            }
+        else:
+            stream = f"{market.lower()}@trade"
+            frame = {
+                'stream': stream,
+                'data': {
+                    'e': 'trade', 'E': time_ms, 's': market, 't': trade_id,
+                    'p': str(price), 'q': str(qty), 'T': time_ms, 'm': buyer_maker, 'M': True
+                }
+            }
+        return await self._publish(stream, json.dumps(frame))
+    
+    async def publish_kline(self, symbol: str, timeframe: str, candle: List, closed: bool = True) -> int:
+        """Send one kline update from a ccxt row [ms, open, high, low, close, volume]"""
+        market = symbol.replace('/', '').upper()
+        open_ms, o, h, l, c, v = candle
+        close_ms = open_ms + timeframe_to_seconds(timeframe) * 1000 - 1
+        
+        if self.exchange == 'bybit':
+            minutes = timeframe_to_seconds(timeframe) // 60
+            interval = {1440: 'D', 10080: 'W'}.get(minutes, str(minutes))
+            stream = f"kline.{interval}.{market}"
+            frame = {
+                'topic': stream, 'type': 'snapshot', 'ts': close_ms,
+                'data': [{
+                    'start': open_ms, 'end': close_ms, 'interval': interval,
+                    'open': str(o), 'close': str(c), 'high': str(h), 'low': str(l),
+                    'volume': str(v), 'turnover': str(v * c), 'confirm': closed, 'timestamp': close_ms
+                }]
+            }
+        else:
+            stream = f"{market.lower()}@kline_{timeframe}"
+            frame = {
+                'stream': stream,
+                'data': {
+                    'e': 'kline', 'E': close_ms, 's': market,
+                    'k': {
+                        't': open_ms, 'T': close_ms, 's': market, 'i': timeframe,
+                        'o': str(o), 'c': str(c), 'h': str(h), 'l': str(l), 'v': str(v),
+                        'n': 1, 'x': closed
+                    }
+                }
+            }
+        return await self._publish(stream, json.dumps(frame))
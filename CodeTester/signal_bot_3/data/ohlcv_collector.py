@@ -1,17 +1,21 @@
 import ccxt
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import asyncio
+import time
 from datetime import datetime
 from signal_bot_3.core.logger import logger
-from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.data.persistence import MarketDatabase, create_market_database
+from signal_bot_3.data.timeframes import timeframe_to_seconds, candle_open
+from signal_bot_3.indicators.cache import tag_frame
 import os
 
 class OHLCVCollector:
-    def __init__(self, exchange_name: str = 'binance'):
+    def __init__(self, exchange_name: str = 'binance', db: Optional[MarketDatabase] = None):
         self.exchange_name = exchange_name
         self.exchange = self._init_exchange(exchange_name)
-        self.db = MarketDatabase()
+        self.db = db if db is not None else create_market_database()
+        self.page_limit = 1000
     
     def _init_exchange(self, name: str):
         """Initialize exchange connection"""
@@ -33,6 +37,48 @@ class OHLCVCollector:
         logger.info(f"Initialized {name} exchange")
         return exchange
     
+    async def _db_read(self, method: str, *args):
+        """Run a MarketDatabase query"""
+        return getattr(self.db, method)(*args)
+    
+    async def _db_write(self, method: str, *args):
+        """Run a MarketDatabase write"""
+        return getattr(self.db, method)(*args)
+    
+    async def _fetch_raw(
+        self, 
+        symbol: str, 
+        timeframe: str, 
+        since: Optional[int], 
+        limit: int
+    ) -> List[List]:
+        """Call the exchange OHLCV endpoint (since in milliseconds)"""
+        return await asyncio.to_thread(
+            self.exchange.fetch_ohlcv,
+            symbol,
+            timeframe,
+            since=since,
+            limit=limit
+        )
+    
+    async def _fetch_frame(
+        self, 
+        symbol: str, 
+        timeframe: str, 
+        since: Optional[int], 
+        limit: int
+    ) -> pd.DataFrame:
+        """Fetch one page of candles as a DataFrame with second timestamps"""
+        ohlcv = await self._fetch_raw(symbol, timeframe, since, limit)
+        
+        df = pd.DataFrame(
+            ohlcv,
+            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        )
+        
+        df['timestamp'] = df['timestamp'].astype(int) // 1000
+        return df
+    
     async def fetch_ohlcv(
         self, 
         symbol: str, 
@@ -44,26 +90,14 @@ class OHLCVCollector:
         try:
             logger.info(f"Fetching {timeframe} OHLCV for {symbol} from {self.exchange_name}")
             
-            ohlcv = await asyncio.to_thread(
-                self.exchange.fetch_ohlcv,
-                symbol,
-                timeframe,
-                since=since,
-                limit=limit
-            )
+            df = await self._fetch_frame(symbol, timeframe, since, limit)
+            tag_frame(df, self.exchange_name, symbol, timeframe)
             
-            df = pd.DataFrame(
-                ohlcv,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            )
-            
-            df['timestamp'] = df['timestamp'].astype(int) // 1000
-            
-            self.db.insert_ohlcv(self.exchange_name, symbol, timeframe, df)
+            await self._db_write('insert_ohlcv', self.exchange_name, symbol, timeframe, df)
             
             logger.info(f"Fetched {len(df)} candles for {symbol}")
             return df
-            
+        
         except Exception as e:
             logger.error(f"Error fetching OHLCV for {symbol}: {e}")
             return pd.DataFrame()
@@ -86,6 +120,121 @@ class OHLCVCollector:
             for tf, result in zip(timeframes, results)
         }
     
+    async def fetch_range(
+        self, 
+        symbol: str, 
+        timeframe: str, 
+        start: int, 
+        end: int
+    ) -> int:
+        """Fetch and store every candle in [start, end] with since pagination"""
+        step = timeframe_to_seconds(timeframe)
+        since = start
+        fetched = 0
+        
+        while since <= end:
+            df = await self._fetch_frame(symbol, timeframe, since * 1000, self.page_limit)
+            df = df[df['timestamp'] <= end]
+            
+            if df.empty:
+                # Nothing listed in the rest of the range (e.g. before the pair existed);
+                # the forming candle is left out in case the exchange has not opened it yet
+                hole_end = min(end, candle_open(int(time.time()), timeframe) - step)
+                if hole_end >= since:
+                    await self._db_write('mark_hole', self.exchange_name, symbol, timeframe, since, hole_end)
+                break
+            
+            await self._db_write('insert_ohlcv', self.exchange_name, symbol, timeframe, df)
+            fetched += len(df)
+            
+            timestamps = df['timestamp'].to_numpy()
+            if timestamps[0] > since:
+                # Exchanges answer from the first candle they have, so the skipped span is empty
+                await self._db_write('mark_hole', self.exchange_name, symbol, timeframe, since, int(timestamps[0]) - step)
+            for hole_start, hole_end in zip(timestamps[:-1] + step, timestamps[1:] - step):
+                if hole_end >= hole_start:
+                    await self._db_write('mark_hole', self.exchange_name, symbol, timeframe, int(hole_start), int(hole_end))
+            
+            next_since = int(timestamps[-1]) + step
+            if next_since <= since:
+                break
+            since = next_since
+        
+        logger.debug(f"Fetched {fetched} {timeframe} candles for {symbol} in [{start}, {end}]")
+        return fetched
+    
+    async def fetch_between(self, symbol: str, timeframe: str, start: int, end: int) -> pd.DataFrame:
+        """Fetch, store and return exactly the candles in [start, end]"""
+        await self.fetch_range(symbol, timeframe, start, end)
+        df = await self._db_read('get_ohlcv_range', self.exchange_name, symbol, timeframe, start, end)
+        return tag_frame(df, self.exchange_name, symbol, timeframe)
+    
+    def _coalesce(self, ranges: List[Tuple[int, int]], step: int) -> List[Tuple[int, int]]:
+        """Merge missing ranges that fit in one page request"""
+        merged = []
+        for gap_start, gap_end in sorted(ranges):
+            if merged and gap_end - merged[-1][0] < self.page_limit * step:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], gap_end))
+            else:
+                merged.append((gap_start, gap_end))
+        return merged
+    
+    async def sync_ohlcv(
+        self, 
+        symbol: str, 
+        timeframe: str = '1h', 
+        limit: int = 500
+    ) -> pd.DataFrame:
+        """Return the last `limit` candles, fetching only what the database lacks"""
+        try:
+            step = timeframe_to_seconds(timeframe)
+            end = candle_open(int(time.time()), timeframe)
+            start = end - (limit - 1) * step
+            
+            first, last = await self._db_read('get_timestamp_bounds', self.exchange_name, symbol, timeframe)
+            
+            missing = []
+            if last is None or last < start or first > end:
+                missing.extend(await self._db_read('without_holes', self.exchange_name, symbol, timeframe, [(start, end)]))
+            else:
+                if first > start:
+                    missing.extend(await self._db_read(
+                        'without_holes', self.exchange_name, symbol, timeframe, [(start, first - step)]
+                    ))
+                missing.extend(await self._db_read('find_gaps', self.exchange_name, symbol, timeframe, step, start, last))
+                if last <= end:
+                    # The stored last candle may have been saved while still forming
+                    missing.append((last, end))
+            
+            for gap_start, gap_end in self._coalesce(missing, step):
+                await self.fetch_range(symbol, timeframe, gap_start, gap_end)
+            
+            logger.info(f"Synced {timeframe} OHLCV for {symbol}: {len(missing)} missing ranges fetched")
+            
+            df = await self._db_read('get_ohlcv_range', self.exchange_name, symbol, timeframe, start, end)
+            return tag_frame(df, self.exchange_name, symbol, timeframe)
+        
+        except Exception as e:
+            logger.error(f"Error syncing OHLCV for {symbol}: {e}")
+            return pd.DataFrame()
+    
+    async def backfill(self, symbol: str, timeframe: str, since: int) -> int:
+        """Backfill history from `since` (seconds) up to the current candle"""
+        end = candle_open(int(time.time()), timeframe)
+        first, last = await self._db_read('get_timestamp_bounds', self.exchange_name, symbol, timeframe)
+        
+        if first is None or first > since:
+            return await self.fetch_range(symbol, timeframe, since, end)
+        
+        step = timeframe_to_seconds(timeframe)
+        gaps = await self._db_read('find_gaps', self.exchange_name, symbol, timeframe, step, since, last)
+        
+        fetched = 0
+        for gap_start, gap_end in self._coalesce(gaps, step):
+            fetched += await self.fetch_range(symbol, timeframe, gap_start, gap_end)
+        
+        return fetched + await self.fetch_range(symbol, timeframe, last, end)
+    
     def get_cached_data(
         self, 
         symbol: str, 
@@ -93,4 +242,5 @@ class OHLCVCollector:
         limit: int = 500
     ) -> pd.DataFrame:
         """Get cached OHLCV data from database"""
-        return self.db.get_ohlcv(self.exchange_name, symbol, timeframe, limit)
+        df = self.db.get_ohlcv(self.exchange_name, symbol, timeframe, limit)
+        return tag_frame(df, self.exchange_name, symbol, timeframe)
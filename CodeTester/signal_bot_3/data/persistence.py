@@ -1,6 +1,7 @@
+import copy
 import sqlite3
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import os
 from signal_bot_3.core.logger import logger
@@ -15,10 +16,33 @@ class MarketDatabase:
         self.conn = None
         self.initialize()
     
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection tuned for frequent small writes, or a read-only one"""
+        if read_only:
+            uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        
+        if not read_only:
+            # WAL lets readers run while the writer commits; NORMAL sync is durable in WAL mode
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    def clone(self, read_only: bool = False) -> 'MarketDatabase':
+        """Same database on a new connection, for use from another thread"""
+        db = copy.copy(self)
+        db.conn = self.connect(read_only)
+        return db
+    
     def initialize(self):
         """Initialize database and create tables"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = self.connect()
         
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS ohlcv (
@@ -54,37 +78,77 @@ class MarketDatabase:
         ''')
         
         self.conn.execute('''
-            CREATE INDEX IF NOT EXISTS idx_ohlcv_lookup 
-            ON ohlcv(exchange, symbol, timeframe, timestamp)
+            CREATE TABLE IF NOT EXISTS ohlcv_holes (
+                exchange TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                start_ts INTEGER NOT NULL,
+                end_ts INTEGER NOT NULL,
+                PRIMARY KEY (exchange, symbol, timeframe, start_ts)
+            )
         ''')
         
+        # The UNIQUE constraint already indexes these columns; a second copy only slows writes
+        self.conn.execute('DROP INDEX IF EXISTS idx_ohlcv_lookup')
+        
         self.conn.commit()
         logger.info(f"Database initialized at {self.db_path}")
     
+    @staticmethod
+    def ohlcv_records(exchange: str, symbol: str, timeframe: str, data: pd.DataFrame) -> List[Tuple]:
+        """Build insert tuples straight from the NumPy columns of a frame"""
+        n = len(data)
+        return list(zip(
+            [exchange] * n, [symbol] * n, [timeframe] * n,
+            data['timestamp'].to_numpy(dtype='int64').tolist(),
+            data['open'].to_numpy(dtype='float64').tolist(),
+            data['high'].to_numpy(dtype='float64').tolist(),
+            data['low'].to_numpy(dtype='float64').tolist(),
+            data['close'].to_numpy(dtype='float64').tolist(),
+            data['volume'].to_numpy(dtype='float64').tolist()
+        ))
+    
+    @staticmethod
+    def candle_record(exchange: str, symbol: str, timeframe: str, candle: Dict) -> Tuple:
+        """Build the insert tuple of a single candle dict"""
+        return (
+            exchange, symbol, timeframe,
+            int(candle['timestamp']),
+            float(candle['open']),
+            float(candle['high']),
+            float(candle['low']),
+            float(candle['close']),
+            float(candle['volume'])
+        )
+    
+    def upsert_ohlcv(self, conn: sqlite3.Connection, records: List[Tuple]):
+        """Insert or update candle tuples without committing"""
+        conn.executemany('''
+            INSERT INTO ohlcv 
+            (exchange, symbol, timeframe, timestamp, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(exchange, symbol, timeframe, timestamp) DO UPDATE SET
+                open = excluded.open,
+                high = excluded.high,
+                low = excluded.low,
+                close = excluded.close,
+                volume = excluded.volume
+        ''', records)
+    
+    def write_ohlcv_records(self, conn: sqlite3.Connection, records: List[Tuple]):
+        """Write candle tuples of many streams in a single transaction"""
+        self.upsert_ohlcv(conn, records)
+        conn.commit()
+    
     def insert_ohlcv(self, exchange: str, symbol: str, timeframe: str, data: pd.DataFrame):
         """Bulk insert OHLCV data"""
         try:
-            records = []
-            for idx, row in data.iterrows():
-                records.append((
-                    exchange, symbol, timeframe,
-                    int(row['timestamp']),
-                    float(row['open']),
-                    float(row['high']),
-                    float(row['low']),
-                    float(row['close']),
-                    float(row['volume'])
-                ))
-            
-            self.conn.executemany('''
-                INSERT OR REPLACE INTO ohlcv 
-                (exchange, symbol, timeframe, timestamp, open, high, low, close, volume)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', records)
+            records = self.ohlcv_records(exchange, symbol, timeframe, data)
+            self.upsert_ohlcv(self.conn, records)
             
             self.conn.commit()
             logger.debug(f"Inserted {len(records)} OHLCV records for {symbol} on {exchange}")
-            
+        
         except Exception as e:
             logger.error(f"Error inserting OHLCV data: {e}")
             self.conn.rollback()
@@ -102,6 +166,83 @@ class MarketDatabase:
         df = pd.read_sql_query(query, self.conn, params=(exchange, symbol, timeframe, limit))
         return df.sort_values('timestamp')
     
+    def get_ohlcv_range(self, exchange: str, symbol: str, timeframe: str, start: int, end: int) -> pd.DataFrame:
+        """Retrieve OHLCV data between two candle timestamps (inclusive)"""
+        query = '''
+            SELECT timestamp, open, high, low, close, volume
+            FROM ohlcv
+            WHERE exchange = ? AND symbol = ? AND timeframe = ?
+            AND timestamp BETWEEN ? AND ?
+            ORDER BY timestamp
+        '''
+        
+        return pd.read_sql_query(query, self.conn, params=(exchange, symbol, timeframe, start, end))
+    
+    def get_timestamp_bounds(self, exchange: str, symbol: str, timeframe: str) -> Tuple[Optional[int], Optional[int]]:
+        """Return the first and last stored candle timestamps"""
+        cursor = self.conn.execute('''
+            SELECT MIN(timestamp), MAX(timestamp)
+            FROM ohlcv
+            WHERE exchange = ? AND symbol = ? AND timeframe = ?
+        ''', (exchange, symbol, timeframe))
+        
+        first, last = cursor.fetchone()
+        return first, last
+    
+    def get_latest_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        """Return the last stored candle timestamp"""
+        return self.get_timestamp_bounds(exchange, symbol, timeframe)[1]
+    
+    def find_gaps(
+        self, 
+        exchange: str, 
+        symbol: str, 
+        timeframe: str, 
+        step: int, 
+        start: int, 
+        end: int
+    ) -> List[Tuple[int, int]]:
+        """Find missing candle ranges between stored candles in [start, end]"""
+        cursor = self.conn.execute('''
+            SELECT prev_ts + ?, timestamp - ?
+            FROM (
+                SELECT timestamp, LAG(timestamp) OVER (ORDER BY timestamp) AS prev_ts
+                FROM ohlcv
+                WHERE exchange = ? AND symbol = ? AND timeframe = ?
+                AND timestamp BETWEEN ? AND ?
+            )
+            WHERE timestamp - prev_ts > ?
+        ''', (step, step, exchange, symbol, timeframe, start, end, step))
+        
+        return self.without_holes(exchange, symbol, timeframe, cursor.fetchall())
+    
+    def without_holes(
+        self, 
+        exchange: str, 
+        symbol: str, 
+        timeframe: str, 
+        gaps: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """Drop gaps that lie inside ranges recorded with mark_hole"""
+        holes = self.conn.execute('''
+            SELECT start_ts, end_ts FROM ohlcv_holes
+            WHERE exchange = ? AND symbol = ? AND timeframe = ?
+        ''', (exchange, symbol, timeframe)).fetchall()
+        
+        return [
+            (int(gap_start), int(gap_end))
+            for gap_start, gap_end in gaps
+            if not any(h_start <= gap_start and gap_end <= h_end for h_start, h_end in holes)
+        ]
+    
+    def mark_hole(self, exchange: str, symbol: str, timeframe: str, start: int, end: int):
+        """Record a range the exchange has no candles for so it is not refetched"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO ohlcv_holes (exchange, symbol, timeframe, start_ts, end_ts)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (exchange, symbol, timeframe, start, end))
+        self.conn.commit()
+    
     def insert_signal(self, signal_data: Dict):
         """Insert trading signal"""
         try:
@@ -122,7 +263,7 @@ class MarketDatabase:
             
             self.conn.commit()
             logger.info(f"Signal inserted: {signal_data['signal_type']} for {signal_data['symbol']}")
-            
+        
         except Exception as e:
             logger.error(f"Error inserting signal: {e}")
             self.conn.rollback()
@@ -144,3 +285,15 @@ class MarketDatabase:
         if self.conn:
             self.conn.close()
             logger.info("Database connection closed")
+
+def create_market_database(db_path: str = None) -> MarketDatabase:
+    """Open the OHLCV backend selected by OHLCV_BACKEND ('sqlite' or 'columnar')"""
+    backend = os.getenv("OHLCV_BACKEND", "sqlite").lower()
+    
+    if backend == 'columnar':
+        from signal_bot_3.data.columnar_store import ColumnarMarketDatabase
+        return ColumnarMarketDatabase(db_path)
+    
+    if backend != 'sqlite':
+        logger.warning(f"Unknown OHLCV_BACKEND '{backend}', using sqlite")
+    return MarketDatabase(db_path)
@@ -0,0 +1,21 @@
+TIMEFRAME_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400,
+    'w': 604800
+}
+
+def timeframe_to_seconds(timeframe: str) -> int:
+    """Convert a ccxt-style timeframe such as '5m' or '4h' to seconds"""
+    amount, unit = timeframe[:-1], timeframe[-1]
+    
+    if unit not in TIMEFRAME_UNITS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    
+    return int(amount) * TIMEFRAME_UNITS[unit]
+
+def candle_open(timestamp: int, timeframe: str) -> int:
+    """Open time of the candle containing a timestamp (seconds)"""
+    step = timeframe_to_seconds(timeframe)
+    return timestamp - timestamp % step
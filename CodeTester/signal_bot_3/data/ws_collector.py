@@ -1,102 +1,257 @@
 import asyncio
+import random
 import websockets
-import json
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
+from signal_bot_3.data.exchange_adapters import ExchangeAdapter, get_adapter
 from signal_bot_3.core.logger import logger
 import ccxt
 
+_CLOSED = object()
+
+ConnectHook = Callable[[List[str]], Awaitable]
+
 class WebSocketCollector:
-    def __init__(self, exchange_name: str = 'binance'):
+    def __init__(
+        self,
+        exchange_name: str = 'binance',
+        max_streams: int = None,
+        adapter: ExchangeAdapter = None,
+        config: Dict = None,
+        on_connect: Optional[ConnectHook] = None
+    ):
+        self.config = config or {}
         self.exchange_name = exchange_name
-        self.ws_url = self._get_ws_url(exchange_name)
+        self.adapter = adapter or get_adapter(exchange_name)
+        self.ws_url = self.adapter.ws_url
         self.ws = None
         self.running = False
-        self.reconnect_delay = 5
-        self.max_reconnect_attempts = 10
+        self.reconnect_delay = self.config.get('reconnect_delay', 5)
+        self.max_reconnect_delay = self.config.get('max_reconnect_delay', 60)
+        self.max_reconnect_attempts = self.config.get('max_reconnect_attempts', 10)
+        self.ping_interval = self.config.get('ping_interval', 30)
+        self.timeout = self.config.get('timeout', 60)
+        self.on_connect = on_connect
+        self.reconnects = 0
+        self.last_frame = 0.0
+        self.max_streams = max_streams or self.adapter.max_streams
+        self.subscribe_batch_size = self.adapter.subscribe_batch_size
+        self.subscribe_interval = 0.25
+        self.handlers: Dict[str, Callable] = {}
+        self.decoder = self.adapter.decoder()
+        self.max_batch = 500
+        self.queue_size = 10000
+        self._request_id = 0
+    
+    def trade_stream(self, symbol: str) -> str:
+        """Stream name for a symbol's trades"""
+        return self.adapter.trade_stream(symbol)
+    
+    def kline_stream(self, symbol: str, interval: str) -> str:
+        """Stream name for a symbol's klines"""
+        return self.adapter.kline_stream(symbol, interval)
     
-    def _get_ws_url(self, exchange: str) -> str:
-        """Get WebSocket URL for exchange"""
-        urls = {
-            'binance': 'wss://stream.binance.com:9443/ws',
-            'bybit': 'wss://stream.bybit.com/v5/public/linear'
-        }
-        return urls.get(exchange, urls['binance'])
+    @property
+    def free_slots(self) -> int:
+        """Streams this connection can still take"""
+        return self.max_streams - len(self.handlers)
     
     async def connect(self):
         """Connect to WebSocket"""
         try:
-            self.ws = await websockets.connect(self.ws_url)
+            self.ws = await websockets.connect(
+                self.ws_url,
+                ping_interval=self.ping_interval,
+                ping_timeout=self.timeout
+            )
             self.running = True
+            self.last_frame = asyncio.get_running_loop().time()
             logger.info(f"WebSocket connected to {self.exchange_name}")
         except Exception as e:
             logger.error(f"WebSocket connection error: {e}")
             raise
     
-    async def subscribe_trades(self, symbol: str, callback: Callable):
-        """Subscribe to trade stream"""
-        if not self.ws:
-            await self.connect()
+    async def subscribe(self, streams: Dict[str, Callable]):
+        """Register stream callbacks and subscribe if already connected; callbacks get lists of records"""
+        new_streams = [name for name in streams if name not in self.handlers]
         
-        symbol_lower = symbol.lower().replace('/', '')
+        if len(self.handlers) + len(new_streams) > self.max_streams:
+            raise ValueError(
+                f"Connection limit of {self.max_streams} streams exceeded, use WebSocketPool"
+            )
         
-        subscribe_message = {
-            "method": "SUBSCRIBE",
-            "params": [f"{symbol_lower}@trade"],
-            "id": 1
-        }
+        self.handlers.update(streams)
         
-        await self.ws.send(json.dumps(subscribe_message))
-        logger.info(f"Subscribed to trades for {symbol}")
+        if self.ws and new_streams:
+            await self._send_subscribe(new_streams)
+    
+    async def _send_subscribe(self, streams: List[str]):
+        """Send subscription requests in batches of streams"""
+        for i in range(0, len(streams), self.subscribe_batch_size):
+            if i > 0:
+                await asyncio.sleep(self.subscribe_interval)
+            
+            batch = streams[i:i + self.subscribe_batch_size]
+            self._request_id += 1
+            await self.ws.send(self.adapter.subscribe_message(batch, self._request_id))
         
-        await self._listen(callback)
+        logger.info(f"Subscribed to {len(streams)} streams on {self.exchange_name}")
+    
+    async def subscribe_trades(self, symbol: str, callback: Callable):
+        """Subscribe to trade stream"""
+        await self.subscribe({self.trade_stream(symbol): callback})
+        await self.listen()
     
     async def subscribe_kline(self, symbol: str, interval: str, callback: Callable):
         """Subscribe to kline/candlestick stream"""
-        if not self.ws:
-            await self.connect()
+        await self.subscribe({self.kline_stream(symbol, interval): callback})
+        await self.listen()
+    
+    async def listen(self):
+        """Connect, subscribe to every registered stream and dispatch messages"""
+        connected = self.ws is not None
+        if not connected:
+            # A failed first connect retries with backoff like any later one
+            self.running = True
+            try:
+                await self.connect()
+                await self._send_subscribe(list(self.handlers))
+                connected = True
+            except Exception as e:
+                logger.error(f"Initial connection to {self.exchange_name} failed: {e}")
         
-        symbol_lower = symbol.lower().replace('/', '')
+        await self._listen(connected)
+    
+    async def _dispatch(self, frames: List):
+        """Decode a batch of raw frames and hand each stream its records in one call"""
+        for stream, records in self.decoder.decode_batch(frames).items():
+            callback = self.handlers.get(stream)
+            if callback:
+                try:
+                    await callback(records)
+                except Exception as e:
+                    # One failing consumer must not stall the reader of every stream
+                    logger.error(f"Callback for {stream} failed: {e}")
+    
+    async def _receive(self, queue: asyncio.Queue):
+        """Move raw frames off the socket; bytes skip UTF-8 decoding"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                frame = await self.ws.recv(decode=False)
+                self.last_frame = loop.time()
+                await queue.put(frame)
+        finally:
+            await queue.put(_CLOSED)
+    
+    async def _consume(self, queue: asyncio.Queue, before: Optional[Awaitable] = None):
+        """Dispatch everything queued at once, up to max_batch frames per call"""
+        if before is not None:
+            # Frames keep queueing while the hook runs, so none are lost or handled early
+            try:
+                await before
+            except Exception as e:
+                logger.error(f"Connect hook for {self.exchange_name} failed: {e}")
         
-        subscribe_message = {
-            "method": "SUBSCRIBE",
-            "params": [f"{symbol_lower}@kline_{interval}"],
-            "id": 1
-        }
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            closed = batch[-1] is _CLOSED
+            if closed:
+                batch.pop()
+            
+            await self._dispatch(batch)
+            if closed:
+                return
+    
+    async def _watchdog(self):
+        """Send application-level pings and drop a connection that stays silent past the timeout"""
+        loop = asyncio.get_running_loop()
+        message = self.adapter.ping_message()
+        next_ping = loop.time() + (self.adapter.ping_interval or 0)
         
-        await self.ws.send(json.dumps(subscribe_message))
-        logger.info(f"Subscribed to {interval} klines for {symbol}")
+        try:
+            while True:
+                await asyncio.sleep(1.0)
+                now = loop.time()
+                
+                if now - self.last_frame > self.timeout:
+                    # Protocol pongs can keep a connection open whose streams have stopped
+                    logger.warning(f"No data from {self.exchange_name} for {now - self.last_frame:.0f}s, reconnecting")
+                    await self.ws.close()
+                    return
+                
+                if message and now >= next_ping:
+                    await self.ws.send(message)
+                    next_ping = now + self.adapter.ping_interval
+        except websockets.exceptions.ConnectionClosed:
+            # The receive loop sees the same close and reconnects
+            pass
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential delay before a reconnect attempt, jittered so connections do not retry in step"""
+        delay = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+    
+    async def _reconnect(self, attempt: int) -> bool:
+        """Wait out the backoff, then connect and resubscribe every stream"""
+        delay = self._backoff(attempt)
+        logger.warning(
+            f"Reconnecting to {self.exchange_name} in {delay:.1f}s "
+            f"(attempt {attempt}/{self.max_reconnect_attempts})"
+        )
+        await asyncio.sleep(delay)
+        if not self.running:
+            return False
         
-        await self._listen(callback)
+        try:
+            await self.connect()
+            await self._send_subscribe(list(self.handlers))
+            self.reconnects += 1
+            return True
+        except Exception as e:
+            logger.error(f"Reconnection failed: {e}")
+            return False
     
-    async def _listen(self, callback: Callable):
-        """Listen to WebSocket messages"""
+    async def _listen(self, connected: bool = True):
+        """Listen to WebSocket messages, reconnecting with backoff until stopped"""
         reconnect_count = 0
         
-        while self.running and reconnect_count < self.max_reconnect_attempts:
-            try:
-                async for message in self.ws:
-                    data = json.loads(message)
-                    
-                    if 'e' in data:
-                        await callback(data)
-                    
-                    reconnect_count = 0
-                    
-            except websockets.exceptions.ConnectionClosed:
-                logger.warning("WebSocket connection closed, attempting reconnect...")
+        while self.running:
+            while self.running and not connected and reconnect_count < self.max_reconnect_attempts:
                 reconnect_count += 1
-                await asyncio.sleep(self.reconnect_delay)
-                
+                connected = await self._reconnect(reconnect_count)
+            
+            if not connected:
+                break
+            
+            connected = False
+            decoded = self.decoder.decoded
+            queue = asyncio.Queue(self.queue_size)
+            hook = self.on_connect(list(self.handlers)) if self.on_connect else None
+            consumer = asyncio.create_task(self._consume(queue, hook))
+            watchdog = asyncio.create_task(self._watchdog())
+            try:
                 try:
-                    await self.connect()
-                except Exception as e:
-                    logger.error(f"Reconnection failed: {e}")
+                    await self._receive(queue)
+                finally:
+                    watchdog.cancel()
+                    await consumer
+                    # Acks alone do not count: the streams themselves must have delivered
+                    if self.decoder.decoded > decoded:
+                        reconnect_count = 0
+            
+            except websockets.exceptions.ConnectionClosed:
+                if not self.running:
+                    break
+                logger.warning(f"WebSocket connection to {self.exchange_name} closed")
             
             except Exception as e:
                 logger.error(f"WebSocket error: {e}")
                 break
         
-        if reconnect_count >= self.max_reconnect_attempts:
+        if self.running and reconnect_count >= self.max_reconnect_attempts:
             logger.error("Max reconnection attempts reached")
     
     async def close(self):
@@ -105,3 +260,56 @@ class WebSocketCollector:
         if self.ws:
             await self.ws.close()
             logger.info("WebSocket closed")
+
+class WebSocketPool:
+    """Shards stream subscriptions over as few connections as the exchange allows"""
+    
+    def __init__(
+        self,
+        exchange_name: str = 'binance',
+        max_streams_per_connection: int = None,
+        adapter: ExchangeAdapter = None,
+        config: Dict = None,
+        on_connect: Optional[ConnectHook] = None
+    ):
+        self.config = config or {}
+        self.exchange_name = exchange_name
+        self.on_connect = on_connect
+        self.adapter = adapter or get_adapter(exchange_name)
+        self.max_streams_per_connection = max_streams_per_connection or self.adapter.max_streams
+        self.collectors: List[WebSocketCollector] = []
+    
+    async def subscribe(self, streams: Dict[str, Callable]):
+        """Spread stream callbacks over connections, opening new ones when full"""
+        pending = dict(streams)
+        
+        for collector in self.collectors:
+            for name in list(pending):
+                if name in collector.handlers:
+                    await collector.subscribe({name: pending.pop(name)})
+        
+        while pending:
+            collector = next((c for c in self.collectors if c.free_slots > 0), None)
+            if collector is None:
+                collector = WebSocketCollector(
+                    self.exchange_name, self.max_streams_per_connection, self.adapter,
+                    self.config, self.on_connect
+                )
+                self.collectors.append(collector)
+            
+            names = list(pending)[:collector.free_slots]
+            await collector.subscribe({name: pending.pop(name) for name in names})
+        
+        logger.info(
+            f"{self.exchange_name}: {sum(len(c.handlers) for c in self.collectors)} streams "
+            f"on {len(self.collectors)} connections"
+        )
+    
+    async def run(self):
+        """Listen on every connection of the pool"""
+        await asyncio.gather(*(collector.listen() for collector in self.collectors))
+    
+    async def close(self):
+        """Close every connection of the pool"""
+        for collector in self.collectors:
+            await collector.close()
@@ -0,0 +1,263 @@
+import json
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+from signal_bot_3.core.logger import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+Frame = Union[bytes, str]
+
+class TradeEvent:
+    """One '@trade' event"""
+    
+    __slots__ = ('symbol', 'trade_id', 'price', 'qty', 'time_ms', 'buyer_maker')
+    
+    def __init__(self, symbol: str, trade_id: Union[int, str], price: float, qty: float, time_ms: int, buyer_maker: bool):
+        self.symbol = symbol
+        self.trade_id = trade_id
+        self.price = price
+        self.qty = qty
+        self.time_ms = time_ms
+        self.buyer_maker = buyer_maker
+
+class KlineEvent:
+    """One '@kline' update of a forming or closed candle"""
+    
+    __slots__ = ('symbol', 'interval', 'open_ms', 'open', 'high', 'low', 'close', 'volume', 'trades', 'closed')
+    
+    def __init__(
+        self,
+        symbol: str,
+        interval: str,
+        open_ms: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        trades: int,
+        closed: bool
+    ):
+        self.symbol = symbol
+        self.interval = interval
+        self.open_ms = open_ms
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.trades = trades
+        self.closed = closed
+    
+    def to_candle(self) -> Dict:
+        """Candle dict with the open time in seconds"""
+        return {
+            'timestamp': self.open_ms // 1000,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume
+        }
+
+class StreamDecoder:
+    """Decodes exchange stream frames into event records, skipping control frames unparsed"""
+    
+    # Substrings present in every data frame and absent from acks and pongs
+    markers: Tuple[str, ...] = ()
+    
+    def __init__(self, loads: Callable = None):
+        if loads is None:
+            loads = orjson.loads if orjson is not None else json.loads
+        self.loads = loads
+        self.backend = getattr(loads, '__module__', None) or JSON_BACKEND
+        self._str_markers = self.markers
+        self._bytes_markers = tuple(marker.encode() for marker in self.markers)
+        self.decoded = 0
+        self.dropped = 0
+        self.errors = 0
+    
+    def _records(self, message: Dict) -> Iterator[Tuple[str, object]]:
+        """(stream, record) pairs of one parsed data message"""
+        raise NotImplementedError
+    
+    def decode(self, frame: Frame) -> List[Tuple[str, object]]:
+        """(stream, record) pairs of a data frame; empty for acks, pongs and bad frames"""
+        markers = self._bytes_markers if isinstance(frame, bytes) else self._str_markers
+        if not any(marker in frame for marker in markers):
+            self.dropped += 1
+            return []
+        
+        try:
+            records = list(self._records(self.loads(frame)))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.errors += 1
+            logger.error(f"Undecodable WebSocket frame: {e}")
+            return []
+        
+        self.decoded += len(records)
+        return records
+    
+    def decode_batch(self, frames: Iterable[Frame]) -> Dict[str, List]:
+        """Records of many frames grouped by stream, in arrival order"""
+        batches: Dict[str, List] = {}
+        for frame in frames:
+            for stream, record in self.decode(frame):
+                batch = batches.get(stream)
+                if batch is None:
+                    batches[stream] = [record]
+                else:
+                    batch.append(record)
+        return batches
+    
+    def stats(self) -> Dict:
+        """Frame counters"""
+        return {
+            'backend': self.backend,
+            'decoded': self.decoded,
+            'dropped': self.dropped,
+            'errors': self.errors
+        }
+
+class BinanceDecoder(StreamDecoder):
+    """Binance '<symbol>@trade' / '<symbol>@kline_<interval>' frames, raw or combined"""
+    
+    markers = ('"e":', '"stream":')
+    
+    @staticmethod
+    def _route(data: Dict) -> str:
+        """Stream name of a message sent without the combined-stream wrapper"""
+        symbol = data.get('s', '').lower()
+        if data.get('e') == 'kline':
+            return f"{symbol}@kline_{data['k']['i']}"
+        return f"{symbol}@{data.get('e')}"
+    
+    def _records(self, message: Dict) -> Iterator[Tuple[str, object]]:
+        """(stream, record) pairs of one parsed data message"""
+        data = message.get('data', message)
+        stream = message.get('stream') or self._route(data)
+        event = data.get('e')
+        
+        if event == 'trade':
+            yield stream, TradeEvent(
+                data['s'], data['t'], float(data['p']), float(data['q']), data['T'], data['m']
+            )
+        elif event == 'kline':
+            k = data['k']
+            yield stream, KlineEvent(
+                data['s'], k['i'], k['t'],
+                float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v']),
+                k['n'], k['x']
+            )
+        else:
+            # Other event types are passed through as parsed dicts
+            yield stream, data
+
+def bybit_interval(timeframe: str) -> str:
+    """Bybit v5 kline interval of a ccxt timeframe ('5m' -> '5', '4h' -> '240', '1d' -> 'D')"""
+    special = {'1d': 'D', '1w': 'W', '1M': 'M'}
+    if timeframe in special:
+        return special[timeframe]
+    return str(timeframe_to_seconds(timeframe) // 60)
+
+def timeframe_from_bybit(interval: str) -> str:
+    """ccxt timeframe of a Bybit v5 kline interval"""
+    special = {'D': '1d', 'W': '1w', 'M': '1M'}
+    if interval in special:
+        return special[interval]
+    minutes = int(interval)
+    return f"{minutes // 60}h" if minutes % 60 == 0 else f"{minutes}m"
+
+class BybitDecoder(StreamDecoder):
+    """Bybit v5 'publicTrade.<symbol>' / 'kline.<interval>.<symbol>' frames"""
+    
+    markers = ('"topic":',)
+    
+    def __init__(self, loads: Callable = None):
+        super().__init__(loads)
+        self._intervals: Dict[str, str] = {}
+    
+    def _records(self, message: Dict) -> Iterator[Tuple[str, object]]:
+        """(stream, record) pairs of one parsed data message; Bybit batches several per frame"""
+        topic = message['topic']
+        data = message.get('data')
+        
+        if topic.startswith('publicTrade.'):
+            for trade in data:
+                yield topic, TradeEvent(
+                    trade['s'], trade['i'], float(trade['p']), float(trade['v']), trade['T'],
+                    # The taker sold, so the resting buyer was the maker
+                    trade['S'] == 'Sell'
+                )
+        elif topic.startswith('kline.'):
+            symbol = topic.rsplit('.', 1)[1]
+            for k in data:
+                interval = self._intervals.get(k['interval'])
+                if interval is None:
+                    interval = self._intervals[k['interval']] = timeframe_from_bybit(k['interval'])
+                yield topic, KlineEvent(
+                    symbol, interval, k['start'],
+                    float(k['open']), float(k['high']), float(k['low']), float(k['close']), float(k['volume']),
+                    0, k['confirm']
+                )
+        else:
+            yield topic, data
+
+def sample_frames(n: int = 100000, ack_every: int = 1000) -> List[bytes]:
+    """Synthetic Binance combined-stream trade frames with a subscription ack now and then"""
+    frames = []
+    for i in range(n):
+        if ack_every and i % ack_every == 0:
+            frames.append(json.dumps({'result': None, 'id': i}).encode())
+            continue
+        
+        symbol = ('BTCUSDT', 'ETHUSDT', 'BNBUSDT')[i % 3]
+        frames.append(json.dumps({
+            'stream': f"{symbol.lower()}@trade",
+            'data': {
+                'e': 'trade', 'E': 1700000000000 + i, 's': symbol, 't': i,
+                'p': f"{40000 + (i % 500) * 0.01:.2f}", 'q': f"{0.001 * (i % 97 + 1):.5f}",
+                'T': 1700000000000 + i, 'm': i % 2 == 0, 'M': True
+            }
+        }, separators=(',', ':')).encode())
+    return frames
+
+def benchmark(frames: List[Frame], batch_size: int = 500, loads: Callable = None) -> Dict:
+    """Decode frames in batches and measure messages per second on one core"""
+    decoder = BinanceDecoder(loads)
+    started = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        decoder.decode_batch(frames[i:i + batch_size])
+    elapsed = time.perf_counter() - started
+    
+    return {
+        **decoder.stats(),
+        'frames': len(frames),
+        'seconds': elapsed,
+        'messages_per_second': len(frames) / elapsed if elapsed > 0 else 0.0
+    }
+
+if __name__ == "__main__":
+    # Replay a capture (one raw frame per line) or synthetic trades:
+    #   python -m signal_bot_3.data.ws_decoder [frames.jsonl]
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            replay = [line.rstrip(b'\n') for line in f if line.strip()]
+    else:
+        replay = sample_frames()
+    
+    backends = [json.loads] + ([orjson.loads] if orjson is not None else [])
+    for loads in backends:
+        result = benchmark(replay, loads=loads)
+        print(
+            f"{result['frames']} frames in {result['seconds']:.3f}s with {result['backend']}: "
+            f"{result['messages_per_second']:,.0f} msg/s "
+            f"({result['decoded']} decoded, {result['dropped']} dropped, {result['errors']} errors)"
+        )
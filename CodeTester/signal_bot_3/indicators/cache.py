@@ -0,0 +1,136 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from signal_bot_3.core.logger import logger
+
+class IndicatorCache:
+    """LRU cache of indicator arrays shared by the whole signal pipeline"""
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return value
+    
+    def stats(self) -> Dict:
+        """Return hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0.0
+        }
+    
+    def clear(self):
+        """Drop all cached entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+indicator_cache = IndicatorCache(int(os.getenv("INDICATOR_CACHE_SIZE", "256")))
+
+def tag_frame(df: pd.DataFrame, exchange: str, symbol: str, timeframe: str) -> pd.DataFrame:
+    """Attach stream identity to an OHLCV frame so indicators can be cached"""
+    df.attrs['exchange'] = exchange
+    df.attrs['symbol'] = symbol
+    df.attrs['timeframe'] = timeframe
+    return df
+
+def frame_identity(df: pd.DataFrame) -> Optional[Tuple]:
+    """Identify the candles of a tagged frame, or None if it is untagged"""
+    attrs = df.attrs
+    if df.empty or 'symbol' not in attrs:
+        return None
+    
+    # The first timestamp and length matter too: EMA/RMA values depend on
+    # where the history starts, not only on the last candle. REST frames may
+    # end in the forming candle, which keeps its timestamp while it trades,
+    # so its close and volume are part of the identity as well
+    timestamps = df['timestamp']
+    return (
+        attrs.get('exchange'), attrs['symbol'], attrs.get('timeframe'),
+        int(timestamps.iloc[0]), int(timestamps.iloc[-1]), len(df),
+        float(df['close'].iloc[-1]), float(df['volume'].iloc[-1])
+    )
+
+def cached_indicator(
+    df: pd.DataFrame,
+    name: str,
+    params: Tuple,
+    compute: Callable[[], Optional[pd.Series]]
+) -> np.ndarray:
+    """Compute an indicator once per (stream, indicator, params, candles)"""
+    def values() -> np.ndarray:
+        # pandas_ta returns None when the frame is shorter than the period
+        series = compute()
+        if series is None:
+            result = np.full(len(df), np.nan)
+        else:
+            result = series.to_numpy(dtype=np.float64, copy=True)
+        result.flags.writeable = False
+        return result
+    
+    identity = frame_identity(df)
+    if identity is None:
+        return values()
+    
+    exchange, symbol, timeframe, first_ts, last_ts, length, last_close, last_volume = identity
+    key = (exchange, symbol, timeframe, name, params, last_ts, first_ts, length, last_close, last_volume)
+    
+    return indicator_cache.get_or_compute(key, values)
+
+def cached_rsi(df: pd.DataFrame, length: int = 14) -> np.ndarray:
+    """RSI of close prices"""
+    return cached_indicator(df, 'rsi', (length,), lambda: ta.rsi(df['close'], length=length))
+
+def cached_ema(df: pd.DataFrame, length: int) -> np.ndarray:
+    """EMA of close prices"""
+    return cached_indicator(df, 'ema', (length,), lambda: ta.ema(df['close'], length=length))
+
+def cached_atr(df: pd.DataFrame, length: int = 14) -> np.ndarray:
+    """Average true range"""
+    return cached_indicator(
+        df, 'atr', (length,),
+        lambda: ta.atr(df['high'], df['low'], df['close'], length=length)
+    )
+
+def cached_sma(df: pd.DataFrame, column: str, length: int) -> np.ndarray:
+    """Rolling mean of any column"""
+    return cached_indicator(
+        df, 'sma', (column, length),
+        lambda: df[column].rolling(window=length).mean()
+    )
+
+def log_cache_stats():
+    """Log the shared cache counters"""
+    stats = indicator_cache.stats()
+    logger.info(
+        f"Indicator cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.1%}), {stats['entries']} entries"
+    )
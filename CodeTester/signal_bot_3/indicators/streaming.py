@@ -0,0 +1,272 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+class StreamingEMA:
+    """EMA seeded with an SMA of the first ``length`` values, like pandas_ta"""
+    
+    __slots__ = ('length', 'alpha', 'count', 'value', '_seed_sum')
+    
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.count = 0
+        self.value = None
+        self._seed_sum = 0.0
+    
+    def update(self, x: float) -> Optional[float]:
+        """Feed one closed value"""
+        self.count += 1
+        
+        if self.value is None:
+            self._seed_sum += x
+            if self.count == self.length:
+                self.value = self._seed_sum / self.length
+        else:
+            self.value += self.alpha * (x - self.value)
+        
+        return self.value
+    
+    def seed(self, values: np.ndarray) -> 'StreamingEMA':
+        """Initialize state from historical values"""
+        values = np.asarray(values, dtype=np.float64)
+        
+        if len(values) < self.length:
+            for x in values:
+                self.update(float(x))
+            return self
+        
+        series = pd.Series(values[self.length - 1:])
+        series.iloc[0] = values[:self.length].mean()
+        
+        self.count = len(values)
+        self.value = float(series.ewm(alpha=self.alpha, adjust=False).mean().iloc[-1])
+        return self
+
+class StreamingRSI:
+    """Wilder RSI with the same RMA smoothing as pandas_ta"""
+    
+    __slots__ = ('length', 'alpha', 'count', 'value', 'avg_gain', 'avg_loss', 'prev_close')
+    
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.alpha = 1.0 / length
+        self.count = 0
+        self.value = None
+        self.avg_gain = None
+        self.avg_loss = None
+        self.prev_close = None
+    
+    def update(self, close: float) -> Optional[float]:
+        """Feed one closed price"""
+        if self.prev_close is None:
+            self.prev_close = close
+            return None
+        
+        change = close - self.prev_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self.prev_close = close
+        self.count += 1
+        
+        if self.avg_gain is None:
+            self.avg_gain = gain
+            self.avg_loss = loss
+        else:
+            self.avg_gain += self.alpha * (gain - self.avg_gain)
+            self.avg_loss += self.alpha * (loss - self.avg_loss)
+        
+        if self.count >= self.length:
+            total = self.avg_gain + self.avg_loss
+            self.value = 100.0 * self.avg_gain / total if total > 0 else math.nan
+        
+        return self.value
+    
+    def seed(self, closes: np.ndarray) -> 'StreamingRSI':
+        """Initialize state from historical closes"""
+        closes = np.asarray(closes, dtype=np.float64)
+        
+        if len(closes) <= self.length:
+            for x in closes:
+                self.update(float(x))
+            return self
+        
+        change = np.diff(closes)
+        gains = pd.Series(np.where(change > 0, change, 0.0))
+        losses = pd.Series(np.where(change < 0, -change, 0.0))
+        
+        self.avg_gain = float(gains.ewm(alpha=self.alpha, adjust=False).mean().iloc[-1])
+        self.avg_loss = float(losses.ewm(alpha=self.alpha, adjust=False).mean().iloc[-1])
+        self.prev_close = float(closes[-1])
+        self.count = len(change)
+        
+        total = self.avg_gain + self.avg_loss
+        self.value = 100.0 * self.avg_gain / total if total > 0 else math.nan
+        return self
+
+class StreamingATR:
+    """ATR with an SMA seed followed by Wilder smoothing, like pandas_ta"""
+    
+    __slots__ = ('length', 'alpha', 'count', 'value', 'prev_close', '_seed_sum')
+    
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.alpha = 1.0 / length
+        self.count = 0
+        self.value = None
+        self.prev_close = None
+        self._seed_sum = 0.0
+    
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        """Feed one closed candle"""
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(self.prev_close - low))
+        
+        self.prev_close = close
+        self.count += 1
+        
+        if self.value is None:
+            self._seed_sum += true_range
+            if self.count == self.length:
+                self.value = self._seed_sum / self.length
+        else:
+            self.value += self.alpha * (true_range - self.value)
+        
+        return self.value
+    
+    def seed(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> 'StreamingATR':
+        """Initialize state from historical candles"""
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        
+        if len(close) < self.length:
+            for h, l, c in zip(high, low, close):
+                self.update(float(h), float(l), float(c))
+            return self
+        
+        prev_close = close[:-1]
+        true_range = high - low
+        true_range[1:] = np.maximum.reduce([
+            true_range[1:],
+            np.abs(high[1:] - prev_close),
+            np.abs(prev_close - low[1:])
+        ])
+        
+        series = pd.Series(true_range[self.length - 1:])
+        series.iloc[0] = true_range[:self.length].mean()
+        
+        self.count = len(close)
+        self.value = float(series.ewm(alpha=self.alpha, adjust=False).mean().iloc[-1])
+        self.prev_close = float(close[-1])
+        return self
+
+class StreamingSMA:
+    """Rolling mean over a fixed ring buffer"""
+    
+    __slots__ = ('length', 'count', 'value', '_buffer', '_index', '_sum')
+    
+    def __init__(self, length: int = 20):
+        self.length = length
+        self.count = 0
+        self.value = None
+        self._buffer = [0.0] * length
+        self._index = 0
+        self._sum = 0.0
+    
+    def update(self, x: float) -> Optional[float]:
+        """Feed one closed value"""
+        self._sum += x - self._buffer[self._index]
+        self._buffer[self._index] = x
+        self._index += 1
+        self.count += 1
+        
+        if self._index == self.length:
+            # Re-sum once per lap so floating point drift cannot accumulate
+            self._index = 0
+            self._sum = math.fsum(self._buffer)
+        
+        if self.count >= self.length:
+            self.value = self._sum / self.length
+        
+        return self.value
+    
+    def seed(self, values: np.ndarray) -> 'StreamingSMA':
+        """Initialize state from historical values"""
+        for x in np.asarray(values, dtype=np.float64)[-self.length:]:
+            self.update(float(x))
+        self.count = len(values)
+        return self
+
+class StreamingIndicators:
+    """Per-stream indicator state behind SimpleSignal.generate_signal_from_state"""
+    
+    __slots__ = (
+        'rsi', 'ema_fast', 'ema_slow', 'atr', 'volume_sma',
+        'prev_ema_fast', 'prev_ema_slow', 'timestamp', 'close', 'volume'
+    )
+    
+    def __init__(self, config: Dict = None):
+        config = config or {}
+        self.rsi = StreamingRSI(config.get('rsi_period', 14))
+        self.ema_fast = StreamingEMA(config.get('ema_fast', 9))
+        self.ema_slow = StreamingEMA(config.get('ema_slow', 21))
+        self.atr = StreamingATR(config.get('atr_period', 14))
+        self.volume_sma = StreamingSMA(config.get('volume_sma_period', 20))
+        self.prev_ema_fast = None
+        self.prev_ema_slow = None
+        self.timestamp = None
+        self.close = None
+        self.volume = None
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, config: Dict = None) -> 'StreamingIndicators':
+        """Build indicator state from a historical OHLCV frame"""
+        state = cls(config)
+        if df.empty:
+            return state
+        
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        
+        state.ema_fast.seed(close[:-1])
+        state.ema_slow.seed(close[:-1])
+        state.prev_ema_fast = state.ema_fast.value
+        state.prev_ema_slow = state.ema_slow.value
+        state.ema_fast.update(float(close[-1]))
+        state.ema_slow.update(float(close[-1]))
+        
+        state.rsi.seed(close)
+        state.atr.seed(high, low, close)
+        state.volume_sma.seed(volume)
+        
+        state.timestamp = int(df['timestamp'].iloc[-1])
+        state.close = float(close[-1])
+        state.volume = float(volume[-1])
+        return state
+    
+    def update(self, timestamp: int, high: float, low: float, close: float, volume: float):
+        """Advance every indicator by one closed candle"""
+        self.prev_ema_fast = self.ema_fast.value
+        self.prev_ema_slow = self.ema_slow.value
+        
+        self.rsi.update(close)
+        self.ema_fast.update(close)
+        self.ema_slow.update(close)
+        self.atr.update(high, low, close)
+        self.volume_sma.update(volume)
+        
+        self.timestamp = timestamp
+        self.close = close
+        self.volume = volume
+    
+    def is_ready(self) -> bool:
+        """Check that every indicator used for signals has a value"""
+        return None not in (
+            self.rsi.value, self.ema_fast.value, self.ema_slow.value,
+            self.prev_ema_fast, self.prev_ema_slow, self.atr.value
+        )
@@ -1,10 +1,19 @@
-from typing import Dict, List
+import numpy as np
+from typing import Dict, Optional, Tuple
 from signal_bot_3.core.logger import logger
 
+EXIT_REASONS = np.array(['timeout', 'target', 'stop'])
+TIE_BREAK_POLICIES = ('target', 'stop', 'open')
+MAX_SCAN_WIDTH = 4096
+
 class PerSignalMetrics:
-    def __init__(self, commission: float = 0.001, slippage: float = 0.0005):
+    def __init__(self, commission: float = 0.001, slippage: float = 0.0005, tie_break: str = 'target'):
+        if tie_break not in TIE_BREAK_POLICIES:
+            raise ValueError(f"Unknown tie-break policy: {tie_break}")
+        
         self.commission = commission
         self.slippage = slippage
+        self.tie_break = tie_break
     
     def calculate_trade_result(self, signal: Dict, exit_price: float) -> Dict:
         """Calculate PnL and metrics for a single trade"""
@@ -44,19 +53,112 @@ class PerSignalMetrics:
         if df.empty:
             return signal['entry_price']
         
-        target = signal.get('target_price', signal['entry_price'])
-        stop = signal.get('stop_loss', signal['entry_price'])
-        
-        for _, row in df.iterrows():
-            if signal['signal_type'] == 'LONG':
-                if row['high'] >= target:
-                    return target
-                if row['low'] <= stop:
-                    return stop
-            else:
-                if row['low'] <= target:
-                    return target
-                if row['high'] >= stop:
-                    return stop
-        
-        return df['close'].iloc[-1] if not df.empty else signal['entry_price']
+        direction = 1.0 if signal['signal_type'] == 'LONG' else -1.0
+        
+        exit_prices, _, _ = self.resolve_exits(
+            entry_bars=np.array([-1]),
+            entry_prices=np.array([signal['entry_price']], dtype=np.float64),
+            targets=np.array([signal.get('target_price', signal['entry_price'])], dtype=np.float64),
+            stops=np.array([signal.get('stop_loss', signal['entry_price'])], dtype=np.float64),
+            directions=np.array([direction]),
+            high=df['high'].to_numpy(dtype=np.float64),
+            low=df['low'].to_numpy(dtype=np.float64),
+            close=df['close'].to_numpy(dtype=np.float64),
+            open_=df['open'].to_numpy(dtype=np.float64) if 'open' in df else None
+        )
+        
+        return float(exit_prices[0])
+    
+    def resolve_exits(
+        self,
+        entry_bars: np.ndarray,
+        entry_prices: np.ndarray,
+        targets: np.ndarray,
+        stops: np.ndarray,
+        directions: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        open_: Optional[np.ndarray] = None,
+        max_bars: Optional[int] = None,
+        tie_break: Optional[str] = None,
+        chunk_size: int = 32
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Resolve first-touch exit price, bar and reason for a batch of trades"""
+        tie_break = tie_break or self.tie_break
+        if tie_break not in TIE_BREAK_POLICIES:
+            raise ValueError(f"Unknown tie-break policy: {tie_break}")
+        if tie_break == 'open' and open_ is None:
+            raise ValueError("Tie-break policy 'open' requires open prices")
+        
+        entry_bars = np.asarray(entry_bars, dtype=np.int64)
+        entry_prices = np.asarray(entry_prices, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        stops = np.asarray(stops, dtype=np.float64)
+        is_long = np.asarray(directions) > 0
+        
+        n_bars = len(close)
+        start = entry_bars + 1
+        last = np.full(len(entry_bars), n_bars - 1, dtype=np.int64)
+        if max_bars is not None:
+            last = np.minimum(last, entry_bars + max_bars)
+        
+        exit_bars = entry_bars.copy()
+        exit_prices = entry_prices.copy()
+        codes = np.zeros(len(entry_bars), dtype=np.int8)
+        
+        # All unresolved trades are tested together against a window of bars
+        # that doubles in width every pass
+        pending = np.flatnonzero(start <= last)
+        offset = 0
+        width = chunk_size
+        
+        while pending.size:
+            cols = start[pending, None] + offset + np.arange(width)
+            in_window = cols <= last[pending, None]
+            cols = np.minimum(cols, n_bars - 1)
+            
+            bar_high = high[cols]
+            bar_low = low[cols]
+            trade_long = is_long[pending, None]
+            target = targets[pending, None]
+            stop = stops[pending, None]
+            
+            hit_target = np.where(trade_long, bar_high >= target, bar_low <= target) & in_window
+            hit_stop = np.where(trade_long, bar_low <= stop, bar_high >= stop) & in_window
+            hit = hit_target | hit_stop
+            
+            rows = np.flatnonzero(hit.any(axis=1))
+            if rows.size:
+                first = hit[rows].argmax(axis=1)
+                trades = pending[rows]
+                bars = cols[rows, first]
+                took_target = hit_target[rows, first]
+                took_stop = hit_stop[rows, first]
+                
+                both = took_target & took_stop
+                if both.any():
+                    if tie_break == 'stop':
+                        took_target = took_target & ~both
+                    elif tie_break == 'open':
+                        bar_open = open_[bars]
+                        target_closer = np.abs(bar_open - targets[trades]) <= np.abs(bar_open - stops[trades])
+                        took_target = np.where(both, target_closer, took_target)
+                
+                exit_bars[trades] = bars
+                exit_prices[trades] = np.where(took_target, targets[trades], stops[trades])
+                codes[trades] = np.where(took_target, 1, 2)
+            
+            unresolved = np.ones(pending.size, dtype=bool)
+            unresolved[rows] = False
+            exhausted = unresolved & (start[pending] + offset + width > last[pending])
+            
+            timed_out = pending[exhausted]
+            exit_bars[timed_out] = last[timed_out]
+            exit_prices[timed_out] = close[last[timed_out]]
+            
+            pending = pending[unresolved & ~exhausted]
+            offset += width
+            width = min(width * 2, MAX_SCAN_WIDTH)
+        
+        return exit_prices, exit_bars, EXIT_REASONS[codes]
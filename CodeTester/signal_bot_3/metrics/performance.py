@@ -1,59 +1,117 @@
-import pandas as pd
-import numpy as np
+import math
 from typing import List, Dict
 from signal_bot_3.core.logger import logger
 
-class PerformanceMetrics:
+class PerformanceAccumulator:
+    """Online trade statistics: add_trade and snapshot are both O(1)"""
+    
     def __init__(self, initial_capital: float = 10000):
         self.initial_capital = initial_capital
-    
-    def calculate_metrics(self, trades: List[Dict]) -> Dict:
-        """Calculate comprehensive backtest metrics"""
-        if not trades:
-            return {}
-        
-        df = pd.DataFrame(trades)
-        
-        total_trades = len(df)
-        winning_trades = len(df[df['pnl'] > 0])
-        losing_trades = len(df[df['pnl'] < 0])
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+        self.total_pnl = 0.0
+        self.equity = initial_capital
+        self.peak = None
+        self.max_drawdown = 0.0
         
-        win_rate = winning_trades / total_trades if total_trades > 0 else 0
+        # Welford mean/M2 of equity returns and of the negative ones
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        self.downside_count = 0
+        self.downside_mean = 0.0
+        self.downside_m2 = 0.0
+    
+    def add_trade(self, trade: Dict):
+        """Fold one closed trade into the statistics"""
+        pnl = trade['pnl'] if 'pnl' in trade else trade.get('net_pnl', 0.0)
+        self.add_pnl(float(pnl))
+    
+    def add_pnl(self, pnl: float):
+        """Fold one trade result into the statistics"""
+        previous_equity = self.equity
+        self.total_trades += 1
+        self.total_pnl += pnl
+        self.equity += pnl
         
-        total_pnl = df['pnl'].sum()
-        avg_win = df[df['pnl'] > 0]['pnl'].mean() if winning_trades > 0 else 0
-        avg_loss = df[df['pnl'] < 0]['pnl'].mean() if losing_trades > 0 else 0
+        if pnl > 0:
+            self.winning_trades += 1
+            self.win_sum += pnl
+        elif pnl < 0:
+            self.losing_trades += 1
+            self.loss_sum += pnl
         
-        profit_factor = abs(avg_win * winning_trades / (avg_loss * losing_trades)) if losing_trades > 0 and avg_loss != 0 else 0
+        self.peak = self.equity if self.peak is None else max(self.peak, self.equity)
+        self.max_drawdown = min(self.max_drawdown, (self.equity - self.peak) / self.peak)
         
-        df['cumulative_pnl'] = df['pnl'].cumsum()
-        df['equity'] = self.initial_capital + df['cumulative_pnl']
+        # Returns start with the second trade, like pct_change over the equity column
+        if self.total_trades > 1:
+            r = self.equity / previous_equity - 1
+            
+            self.return_count += 1
+            delta = r - self.return_mean
+            self.return_mean += delta / self.return_count
+            self.return_m2 += delta * (r - self.return_mean)
+            
+            if r < 0:
+                self.downside_count += 1
+                delta = r - self.downside_mean
+                self.downside_mean += delta / self.downside_count
+                self.downside_m2 += delta * (r - self.downside_mean)
+    
+    @staticmethod
+    def _std(count: int, m2: float) -> float:
+        """Sample standard deviation, NaN below two values like pandas"""
+        return math.sqrt(m2 / (count - 1)) if count > 1 else math.nan
+    
+    def snapshot(self) -> Dict:
+        """Current metrics, with the same keys as PerformanceMetrics.calculate_metrics"""
+        if self.total_trades == 0:
+            return {}
         
-        peak = df['equity'].expanding().max()
-        drawdown = (df['equity'] - peak) / peak
-        max_drawdown = drawdown.min()
+        avg_win = self.win_sum / self.winning_trades if self.winning_trades > 0 else 0
+        avg_loss = self.loss_sum / self.losing_trades if self.losing_trades > 0 else 0
+        profit_factor = abs(self.win_sum / self.loss_sum) if self.losing_trades > 0 and avg_loss != 0 else 0
         
-        returns = df['equity'].pct_change().dropna()
-        sharpe_ratio = np.sqrt(252) * (returns.mean() / returns.std()) if len(returns) > 0 and returns.std() > 0 else 0
+        return_std = self._std(self.return_count, self.return_m2)
+        sharpe_ratio = math.sqrt(252) * (self.return_mean / return_std) if self.return_count > 0 and return_std > 0 else 0
         
-        downside_returns = returns[returns < 0]
-        sortino_ratio = np.sqrt(252) * (returns.mean() / downside_returns.std()) if len(downside_returns) > 0 and downside_returns.std() > 0 else 0
+        downside_std = self._std(self.downside_count, self.downside_m2)
+        sortino_ratio = math.sqrt(252) * (self.return_mean / downside_std) if self.downside_count > 0 and downside_std > 0 else 0
         
-        metrics = {
-            'total_trades': total_trades,
-            'winning_trades': winning_trades,
-            'losing_trades': losing_trades,
-            'win_rate': win_rate,
-            'total_pnl': total_pnl,
+        return {
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate': self.winning_trades / self.total_trades,
+            'total_pnl': self.total_pnl,
             'avg_win': avg_win,
             'avg_loss': avg_loss,
             'profit_factor': profit_factor,
-            'max_drawdown': max_drawdown,
+            'max_drawdown': self.max_drawdown,
             'sharpe_ratio': sharpe_ratio,
             'sortino_ratio': sortino_ratio,
-            'final_equity': df['equity'].iloc[-1] if len(df) > 0 else self.initial_capital,
-            'return_pct': (df['equity'].iloc[-1] / self.initial_capital - 1) * 100 if len(df) > 0 else 0
+            'final_equity': self.equity,
+            'return_pct': (self.equity / self.initial_capital - 1) * 100
         }
+
+class PerformanceMetrics:
+    def __init__(self, initial_capital: float = 10000):
+        self.initial_capital = initial_capital
+    
+    def calculate_metrics(self, trades: List[Dict]) -> Dict:
+        """Calculate comprehensive backtest metrics"""
+        accumulator = PerformanceAccumulator(self.initial_capital)
+        for trade in trades:
+            accumulator.add_trade(trade)
         
-        logger.info(f"Performance: WinRate={win_rate:.2%}, PnL=${total_pnl:.2f}, Sharpe={sharpe_ratio:.2f}")
+        metrics = accumulator.snapshot()
+        if metrics:
+            logger.info(
+                f"Performance: WinRate={metrics['win_rate']:.2%}, PnL=${metrics['total_pnl']:.2f}, "
+                f"Sharpe={metrics['sharpe_ratio']:.2f}"
+            )
         return metrics
@@ -0,0 +1,126 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+
+SECONDS_PER_YEAR = 365.25 * 86400
+
+class PortfolioAccounting:
+    """Bar-by-bar mark-to-market equity of all positions on a shared timestamp grid"""
+    
+    def __init__(self, initial_capital: float = 10000):
+        self.initial_capital = initial_capital
+    
+    @staticmethod
+    def price_series(multi_tf_data: Dict[str, pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray]:
+        """Close prices keyed by candle close time, taking the finest timeframe where they overlap"""
+        times, closes, steps = [], [], []
+        for tf, df in multi_tf_data.items():
+            if df.empty:
+                continue
+            step = timeframe_to_seconds(tf)
+            times.append(df['timestamp'].to_numpy(dtype=np.int64) + step)
+            closes.append(df['close'].to_numpy(dtype=np.float64))
+            steps.append(np.full(len(df), step, dtype=np.int64))
+        
+        if not times:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        
+        times, closes, steps = np.concatenate(times), np.concatenate(closes), np.concatenate(steps)
+        order = np.lexsort((steps, times))
+        times, closes = times[order], closes[order]
+        
+        first = np.append(True, times[1:] != times[:-1])
+        return times[first], closes[first]
+    
+    def equity_curve(
+        self,
+        trades: List[Dict],
+        prices: Dict[Optional[str], Tuple[np.ndarray, np.ndarray]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Equity on the union of all price times; trades without a symbol use the None prices"""
+        grid = np.unique(np.concatenate([times for times, _ in prices.values()])) if prices else np.empty(0, dtype=np.int64)
+        equity = np.full(len(grid), float(self.initial_capital))
+        if not len(grid):
+            return grid, equity
+        
+        by_symbol: Dict[Optional[str], List[Dict]] = {}
+        for trade in trades:
+            by_symbol.setdefault(trade.get('symbol'), []).append(trade)
+        
+        # Cash moves and position changes are scattered onto the grid, then
+        # accumulated: equity(t) = initial + cash(t) + sum over symbols of q(t) * p(t)
+        cash = np.zeros(len(grid) + 1)
+        for symbol, symbol_trades in by_symbol.items():
+            if symbol not in prices:
+                continue
+            times, closes = prices[symbol]
+            
+            steps = np.array([timeframe_to_seconds(t['timeframe']) if t.get('timeframe') else 0 for t in symbol_trades])
+            entry_times = np.array([t['timestamp'] for t in symbol_trades], dtype=np.int64) + steps
+            exit_times = np.array([t.get('exit_timestamp', t['timestamp']) for t in symbol_trades], dtype=np.int64) + steps
+            directions = np.array([1.0 if t['signal_type'] == 'LONG' else -1.0 for t in symbol_trades])
+            sizes = np.array([t.get('position_size', 1.0) for t in symbol_trades], dtype=np.float64)
+            entry_prices = np.array([t['entry_price'] for t in symbol_trades], dtype=np.float64)
+            exit_prices = np.array([t['exit_price'] for t in symbol_trades], dtype=np.float64)
+            costs = np.array([t.get('costs', 0.0) for t in symbol_trades], dtype=np.float64)
+            
+            # Costs are proportional to traded notional, so split them by price
+            entry_costs = costs * entry_prices / (entry_prices + exit_prices)
+            exit_costs = costs - entry_costs
+            
+            entry_idx = np.searchsorted(grid, entry_times, side='left')
+            exit_idx = np.maximum(np.searchsorted(grid, exit_times, side='left'), entry_idx)
+            quantity = directions * sizes
+            
+            position = np.zeros(len(grid) + 1)
+            np.add.at(position, entry_idx, quantity)
+            np.add.at(position, exit_idx, -quantity)
+            np.add.at(cash, entry_idx, -quantity * entry_prices - entry_costs)
+            np.add.at(cash, exit_idx, quantity * exit_prices - exit_costs)
+            
+            price_idx = np.searchsorted(times, grid, side='right') - 1
+            marks = np.where(price_idx >= 0, closes[np.maximum(price_idx, 0)], 0.0)
+            equity += np.cumsum(position)[:-1] * marks
+        
+        equity += np.cumsum(cash)[:-1]
+        return grid, equity
+    
+    def metrics(self, times: np.ndarray, equity: np.ndarray) -> Dict:
+        """Risk metrics annualized from the actual spacing of the grid"""
+        if len(equity) < 2:
+            return {}
+        
+        dt = np.diff(times).astype(np.float64)
+        returns = np.diff(equity) / equity[:-1]
+        elapsed = dt.sum()
+        
+        # Per-second drift and variance, so uneven bar spacing (e.g. 4h history
+        # followed by 5m bars) is weighted by time instead of by bar count
+        drift = returns.sum() / elapsed
+        variance = np.mean((returns - drift * dt) ** 2 / dt)
+        downside = np.mean(np.minimum(returns, 0.0) ** 2 / dt)
+        
+        annual = math.sqrt(SECONDS_PER_YEAR)
+        peak = np.maximum.accumulate(np.maximum(equity, self.initial_capital))
+        bar_seconds = float(np.median(dt))
+        
+        return {
+            'bars': len(equity),
+            'bar_seconds': bar_seconds,
+            'periods_per_year': SECONDS_PER_YEAR / bar_seconds,
+            'sharpe_ratio': float(drift / math.sqrt(variance) * annual) if variance > 0 else 0.0,
+            'sortino_ratio': float(drift / math.sqrt(downside) * annual) if downside > 0 else 0.0,
+            'annualized_volatility': math.sqrt(variance) * annual,
+            'annualized_return': float((equity[-1] / self.initial_capital) ** (SECONDS_PER_YEAR / elapsed) - 1)
+                if equity[-1] > 0 else -1.0,
+            'max_drawdown': float(np.min(equity / peak - 1)),
+            'final_equity': float(equity[-1]),
+            'return_pct': float((equity[-1] / self.initial_capital - 1) * 100)
+        }
+    
+    def evaluate(self, trades: List[Dict], multi_tf_data: Dict[str, pd.DataFrame]) -> Dict:
+        """Mark-to-market metrics of a single-symbol backtest"""
+        times, equity = self.equity_curve(trades, {None: self.price_series(multi_tf_data)})
+        return self.metrics(times, equity)
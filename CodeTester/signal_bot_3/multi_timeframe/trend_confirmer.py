@@ -1,6 +1,6 @@
 import pandas as pd
-import pandas_ta as ta
 from typing import Dict
+from signal_bot_3.indicators.cache import cached_ema
 from signal_bot_3.core.logger import logger
 
 class TrendConfirmer:
@@ -12,8 +12,9 @@ class TrendConfirmer:
         if df.empty or len(df) < self.ema_period:
             return True
         
-        df = df.copy()
-        df['ema_200'] = ta.ema(df['close'], length=self.ema_period)
+        # Shallow copy: new columns stay off the caller's (possibly shared) candle arrays
+        df = df.copy(deep=False)
+        df['ema_200'] = cached_ema(df, self.ema_period)
         
         last_close = df['close'].iloc[-1]
         ema_200 = df['ema_200'].iloc[-1]
@@ -0,0 +1,215 @@
+import heapq
+import itertools
+from typing import Dict, List, Optional, Set
+from signal_bot_3.correlation_analyzer.rolling_correlation import RollingCorrelation
+from signal_bot_3.core.logger import logger
+
+class OpenPosition:
+    """A position counted against portfolio limits"""
+    
+    __slots__ = (
+        'id', 'exchange', 'symbol', 'timeframe', 'direction', 'size', 'entry_price', 'entry_time',
+        'stop_loss', 'target_price', 'risk', 'exit_time'
+    )
+    
+    def __init__(
+        self,
+        position_id: int,
+        signal: Dict,
+        size: float,
+        risk: float,
+        exit_time: Optional[int]
+    ):
+        self.id = position_id
+        self.exchange = signal.get('exchange')
+        self.symbol = signal.get('symbol')
+        self.timeframe = signal.get('timeframe')
+        self.direction = 1 if signal['signal_type'] == 'LONG' else -1
+        self.size = size
+        self.entry_price = signal['entry_price']
+        # Open time of the signal candle; the position is entered when it closes
+        self.entry_time = signal.get('timestamp')
+        self.stop_loss = signal.get('stop_loss', signal['entry_price'])
+        self.target_price = signal.get('target_price')
+        self.risk = risk
+        self.exit_time = exit_time
+
+class PortfolioRiskManager:
+    """Admits signals against open position count, aggregate risk and per-symbol risk"""
+    
+    def __init__(
+        self,
+        max_open_positions: int = 3,
+        max_portfolio_risk: float = 0.06,
+        max_symbol_risk: Optional[float] = None,
+        min_scale: float = 0.25,
+        correlation: Optional[RollingCorrelation] = None,
+        max_correlation: float = 0.7
+    ):
+        self.max_open_positions = max_open_positions
+        self.max_portfolio_risk = max_portfolio_risk
+        self.max_symbol_risk = max_symbol_risk if max_symbol_risk is not None else max_portfolio_risk
+        self.min_scale = min_scale
+        self.correlation = correlation
+        self.max_correlation = max_correlation
+        
+        self.positions: Dict[int, OpenPosition] = {}
+        self.open_risk = 0.0
+        self.rejected = 0
+        self.scaled = 0
+        
+        # Running sums and indexes keep every check O(1) and every open/close O(log n)
+        self._symbol_risk: Dict[Optional[str], float] = {}
+        self._symbol_net_risk: Dict[Optional[str], float] = {}
+        self._by_symbol: Dict[Optional[str], Set[int]] = {}
+        self._exits: List = []
+        self._ids = itertools.count(1)
+    
+    @classmethod
+    def from_config(cls, config: Dict, correlation: Optional[RollingCorrelation] = None) -> 'PortfolioRiskManager':
+        """Build from a merged signal_engine/risk_management config"""
+        return cls(
+            max_open_positions=config.get('max_open_positions', 3),
+            max_portfolio_risk=config.get('max_portfolio_risk', 0.06),
+            max_symbol_risk=config.get('max_symbol_risk'),
+            correlation=correlation,
+            max_correlation=config.get('max_correlation', 0.7)
+        )
+    
+    @staticmethod
+    def risk_per_unit(signal: Dict) -> float:
+        """Loss per unit if the stop is hit"""
+        stop = signal.get('stop_loss', signal['entry_price'])
+        if signal['signal_type'] == 'LONG':
+            return signal['entry_price'] - stop
+        return stop - signal['entry_price']
+    
+    def admit(self, signal: Dict, position_size: float, account_balance: float) -> float:
+        """Allowed position size for a new signal; 0.0 rejects it"""
+        symbol = signal.get('symbol')
+        risk = position_size * self.risk_per_unit(signal)
+        correlation = self.book_correlation(signal)
+        
+        if len(self.positions) >= self.max_open_positions:
+            reason = f"{len(self.positions)} positions open"
+        elif risk <= 0:
+            reason = "no risk to the stop"
+        elif correlation > self.max_correlation:
+            reason = f"correlation {correlation:.2f} with the open book"
+        else:
+            room = min(
+                self.max_portfolio_risk * account_balance - self.open_risk,
+                self.max_symbol_risk * account_balance - self._symbol_risk.get(symbol, 0.0)
+            )
+            scale = min(1.0, room / risk)
+            
+            if scale >= self.min_scale:
+                if scale < 1.0:
+                    self.scaled += 1
+                    logger.info(f"Position on {symbol} scaled to {scale:.0%} by portfolio risk limits")
+                return position_size * scale
+            reason = f"open risk ${self.open_risk:.2f} leaves ${max(room, 0.0):.2f}"
+        
+        self.rejected += 1
+        logger.info(f"Signal on {symbol} rejected by portfolio risk: {reason}")
+        return 0.0
+    
+    def book_correlation(self, signal: Dict) -> float:
+        """Correlation of a signal with open positions, netted per symbol: O(symbols)"""
+        if self.correlation is None or not self._symbol_net_risk:
+            return 0.0
+        
+        book = [
+            (symbol, 1 if net > 0 else -1, abs(net))
+            for symbol, net in self._symbol_net_risk.items()
+            if symbol != signal.get('symbol') and net != 0
+        ]
+        direction = 1 if signal['signal_type'] == 'LONG' else -1
+        return self.correlation.book_correlation(signal.get('symbol'), direction, book)
+    
+    def open(self, signal: Dict, position_size: float, exit_time: Optional[int] = None) -> OpenPosition:
+        """Start counting a position; with exit_time it is released by release_until"""
+        position = OpenPosition(
+            next(self._ids), signal, position_size,
+            position_size * max(self.risk_per_unit(signal), 0.0), exit_time
+        )
+        
+        self.positions[position.id] = position
+        self._by_symbol.setdefault(position.symbol, set()).add(position.id)
+        self._symbol_risk[position.symbol] = self._symbol_risk.get(position.symbol, 0.0) + position.risk
+        self._symbol_net_risk[position.symbol] = self._symbol_net_risk.get(position.symbol, 0.0) + position.direction * position.risk
+        self.open_risk += position.risk
+        
+        if exit_time is not None:
+            heapq.heappush(self._exits, (exit_time, position.id))
+        return position
+    
+    def close(self, position_id: int) -> Optional[OpenPosition]:
+        """Stop counting a position; its heap entry is skipped when popped"""
+        position = self.positions.pop(position_id, None)
+        if position is None:
+            return None
+        
+        ids = self._by_symbol[position.symbol]
+        ids.discard(position_id)
+        if ids:
+            self._symbol_risk[position.symbol] -= position.risk
+            self._symbol_net_risk[position.symbol] -= position.direction * position.risk
+        else:
+            # Reset instead of subtracting so float error cannot accumulate
+            del self._by_symbol[position.symbol]
+            del self._symbol_risk[position.symbol]
+            del self._symbol_net_risk[position.symbol]
+        
+        self.open_risk = self.open_risk - position.risk if self.positions else 0.0
+        return position
+    
+    def release_until(self, timestamp: int) -> List[OpenPosition]:
+        """Close every position whose exit time is at or before timestamp"""
+        released = []
+        while self._exits and self._exits[0][0] <= timestamp:
+            _, position_id = heapq.heappop(self._exits)
+            position = self.close(position_id)
+            if position is not None:
+                released.append(position)
+        return released
+    
+    def check_exits(
+        self,
+        symbol: str,
+        high: float,
+        low: float,
+        timeframe: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        exchange: Optional[str] = None
+    ) -> List[OpenPosition]:
+        """Close the positions of a symbol whose stop or target a candle of their own stream reached"""
+        hit = []
+        for position_id in list(self._by_symbol.get(symbol, ())):
+            position = self.positions[position_id]
+            # A coarser candle's range could reach a finer position's stop before its entry
+            if timeframe is not None and position.timeframe != timeframe:
+                continue
+            if exchange is not None and position.exchange is not None and position.exchange != exchange:
+                continue
+            if timestamp is not None and position.entry_time is not None and timestamp <= position.entry_time:
+                continue
+            
+            if position.direction == 1:
+                done = low <= position.stop_loss or (position.target_price is not None and high >= position.target_price)
+            else:
+                done = high >= position.stop_loss or (position.target_price is not None and low <= position.target_price)
+            
+            if done:
+                hit.append(self.close(position_id))
+        return hit
+    
+    def stats(self) -> Dict:
+        """Current exposure and admission counters"""
+        return {
+            'open_positions': len(self.positions),
+            'open_risk': self.open_risk,
+            'symbols': len(self._by_symbol),
+            'rejected': self.rejected,
+            'scaled': self.scaled
+        }
@@ -1,6 +1,6 @@
 import pandas as pd
-import pandas_ta as ta
 from typing import Dict
+from signal_bot_3.indicators.cache import cached_atr
 from signal_bot_3.core.logger import logger
 
 class VolatilityAdjuster:
@@ -9,7 +9,11 @@ class VolatilityAdjuster:
     
     def adjust_stops(self, signal: Dict, df: pd.DataFrame) -> Dict:
         """Adjust stop loss and target based on ATR"""
-        atr = ta.atr(df['high'], df['low'], df['close'], length=14).iloc[-1]
+        atr = cached_atr(df, 14)[-1]
+        return self.adjust_stops_with_atr(signal, atr)
+    
+    def adjust_stops_with_atr(self, signal: Dict, atr: float) -> Dict:
+        """Adjust stop loss and target from a known ATR value"""
         entry = signal['entry_price']
         
         if signal['signal_type'] == 'LONG':
@@ -1,32 +1,107 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+from signal_bot_3.indicators.streaming import StreamingIndicators
 from signal_bot_3.signals.simple_signal import SimpleSignal
+from signal_bot_3.adaptive_engine.features import FeatureBuilder
+from signal_bot_3.adaptive_engine.model import LogisticModel, default_model_path
 from signal_bot_3.core.logger import logger
-import random
 
 class AdaptiveSignalEngine:
-    """Placeholder for ML-based signal engine (Phase 3)"""
+    """Rule signals scored by the trained win-probability model in adaptive mode"""
     
     def __init__(self, config: Dict = None):
         self.config = config or {}
         self.adaptive_mode = self.config.get('adaptive_mode', False)
+        self.min_probability = self.config.get('min_probability', 0.0)
+        self.model_path = self.config.get('model_path') or default_model_path()
         self.simple_signal = SimpleSignal(config)
+        self.features = FeatureBuilder(config)
+        self._model: Optional[LogisticModel] = None
+        self._model_loaded = False
     
-    def predict(self, df: pd.DataFrame) -> Optional[Dict]:
+    @property
+    def model(self) -> Optional[LogisticModel]:
+        """Load the model on first use so startup does not wait for it"""
+        if self.adaptive_mode and not self._model_loaded:
+            self._model_loaded = True
+            try:
+                self._model = LogisticModel.load(self.model_path)
+                logger.info(f"Loaded signal model from {self.model_path} ({self._model.info.get('samples', 0)} samples)")
+            except FileNotFoundError:
+                logger.warning(f"No signal model at {self.model_path}; using rule confidence")
+            except Exception as e:
+                logger.error(f"Error loading signal model: {e}")
+        return self._model
+    
+    def score(self, features: np.ndarray) -> Optional[np.ndarray]:
+        """Win probabilities of a feature matrix, or None without a model"""
+        model = self.model
+        if model is None or not len(features):
+            return None
+        return model.predict_proba(features)
+    
+    def predict(self, df: pd.DataFrame, timeframe: str = None) -> Optional[Dict]:
         """Generate signal with probability prediction"""
-        base_signal = self.simple_signal.generate_signal(df)
+        return self.predict_batch({timeframe: df}).get(timeframe)
+    
+    def predict_batch(self, multi_tf_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """Last-bar signals of every timeframe, scored by one model call"""
+        model = self.model
+        signals, rows = {}, []
+        
+        for tf, df in multi_tf_data.items():
+            signal = self.simple_signal.generate_signal(df)
+            if not signal:
+                continue
+            
+            signal['probability'] = signal['confidence']
+            signals[tf] = signal
+            
+            if model is not None and tf is not None:
+                direction = 1.0 if signal['signal_type'] == 'LONG' else -1.0
+                rows.append((tf, self.features.build(df, tf, [len(df) - 1], [direction], multi_tf_data)[0]))
+        
+        if not rows:
+            return signals
+        
+        probabilities = model.predict_proba(np.array([features for _, features in rows]))
+        for (tf, _), probability in zip(rows, probabilities):
+            if not self._apply_probability(signals[tf], tf, probability):
+                del signals[tf]
         
-        if not base_signal:
+        return signals
+    
+    def predict_from_state(
+        self,
+        state: StreamingIndicators,
+        timeframe: str,
+        frames: Callable[[], Dict[str, pd.DataFrame]] = None
+    ) -> Optional[Dict]:
+        """Last-bar signal from incremental state; frames are built only to score a rule signal"""
+        signal = self.simple_signal.generate_signal_from_state(state)
+        if not signal:
             return None
         
-        if self.adaptive_mode:
-            base_signal['probability'] = random.uniform(0.5, 0.9)
-            base_signal['ml_confidence'] = random.uniform(0.4, 0.8)
-            logger.info(f"AdaptiveEngine (stub): probability={base_signal['probability']:.2f}")
-        else:
-            base_signal['probability'] = base_signal['confidence']
+        signal['probability'] = signal['confidence']
+        model = self.model
+        if model is None or frames is None:
+            return signal
         
-        return base_signal
+        multi_tf_data = frames()
+        df = multi_tf_data[timeframe]
+        direction = 1.0 if signal['signal_type'] == 'LONG' else -1.0
+        features = self.features.build(df, timeframe, [len(df) - 1], [direction], multi_tf_data)
+        
+        probability = model.predict_proba(features)[0]
+        return signal if self._apply_probability(signal, timeframe, probability) else None
+    
+    def _apply_probability(self, signal: Dict, timeframe: str, probability: float) -> bool:
+        """Attach the model probability; False when it is below the threshold"""
+        signal['probability'] = float(probability)
+        signal['ml_confidence'] = float(abs(2 * probability - 1))
+        logger.info(f"AdaptiveEngine: {timeframe} {signal['signal_type']} probability={probability:.2f}")
+        return probability >= self.min_probability
 
 class SignalEngine:
     def __init__(self, config: Dict = None):
@@ -41,11 +116,23 @@ class SignalEngine:
         """Generate signals from multiple timeframe data"""
         signals = []
         
-        for timeframe, df in multi_tf_data.items():
-            signal = self.adaptive_engine.predict(df)
-            
-            if signal and signal.get('confidence', 0) >= self.min_confirmation_score:
+        for timeframe, signal in self.adaptive_engine.predict_batch(multi_tf_data).items():
+            if signal.get('confidence', 0) >= self.min_confirmation_score:
                 signal['timeframe'] = timeframe
                 signals.append(signal)
         
         return signals
+    
+    def generate_signal_from_state(
+        self,
+        state: StreamingIndicators,
+        timeframe: str,
+        frames: Callable[[], Dict[str, pd.DataFrame]] = None
+    ) -> Optional[Dict]:
+        """Signal of the candle that just closed on one timeframe, from its indicator state"""
+        signal = self.adaptive_engine.predict_from_state(state, timeframe, frames)
+        if not signal or signal.get('confidence', 0) < self.min_confirmation_score:
+            return None
+        
+        signal['timeframe'] = timeframe
+        return signal
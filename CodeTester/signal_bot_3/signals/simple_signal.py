@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 from typing import Dict, Optional
+from signal_bot_3.indicators.cache import cached_atr, cached_ema, cached_rsi, cached_sma
+from signal_bot_3.indicators.streaming import StreamingIndicators
 from signal_bot_3.core.logger import logger
 
 class SimpleSignal:
@@ -11,62 +13,161 @@ class SimpleSignal:
         self.rsi_overbought = self.config.get('rsi_overbought', 70)
         self.ema_fast = self.config.get('ema_fast', 9)
         self.ema_slow = self.config.get('ema_slow', 21)
+        self.atr_period = self.config.get('atr_period', 14)
+        self.volume_sma_period = self.config.get('volume_sma_period', 20)
+        self.atr_multiplier = self.config.get('atr_multiplier', 2.0)
+    
+    def compute_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add indicator columns for every bar of the frame"""
+        # Shallow copy: new columns stay off the caller's (possibly shared) candle arrays
+        df = df.copy(deep=False)
+        
+        df['rsi'] = cached_rsi(df, self.rsi_period)
+        df['ema_fast'] = cached_ema(df, self.ema_fast)
+        df['ema_slow'] = cached_ema(df, self.ema_slow)
+        df['volume_sma'] = cached_sma(df, 'volume', self.volume_sma_period)
+        df['atr'] = cached_atr(df, self.atr_period)
+        
+        return df
+    
+    def entry_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Evaluate entry conditions as boolean masks over every bar"""
+        rsi = df['rsi'].to_numpy(dtype=np.float64)
+        fast = df['ema_fast'].to_numpy(dtype=np.float64)
+        slow = df['ema_slow'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        atr = df['atr'].to_numpy(dtype=np.float64)
+        
+        prev_fast = np.roll(fast, 1)
+        prev_slow = np.roll(slow, 1)
+        prev_fast[0] = np.nan
+        prev_slow[0] = np.nan
+        
+        long_mask = (rsi < self.rsi_oversold) & (fast > slow) & (prev_fast <= prev_slow)
+        short_mask = (
+            ~long_mask &
+            (rsi > self.rsi_overbought) & (fast < slow) & (prev_fast >= prev_slow)
+        )
+        mask = (long_mask | short_mask) & ~np.isnan(atr)
+        
+        idx = np.flatnonzero(mask)
+        is_long = long_mask[idx]
+        direction = np.where(is_long, 1.0, -1.0)
+        
+        confidence = np.where(
+            is_long,
+            0.6 + (self.rsi_oversold - rsi[idx]) / 100,
+            0.6 + (rsi[idx] - self.rsi_overbought) / 100
+        )
+        
+        entries = pd.DataFrame({
+            'bar': idx,
+            'signal_type': np.where(is_long, 'LONG', 'SHORT'),
+            'direction': direction,
+            'entry_price': close[idx],
+            'timestamp': df['timestamp'].to_numpy()[idx].astype(np.int64),
+            'confidence': np.minimum(confidence, 0.95),
+            'stop_loss': close[idx] - direction * self.atr_multiplier * atr[idx],
+            'target_price': close[idx] + direction * self.atr_multiplier * 1.5 * atr[idx],
+            'rsi': rsi[idx],
+            'ema_fast': fast[idx],
+            'ema_slow': slow[idx],
+            'volume': df['volume'].to_numpy(dtype=np.float64)[idx],
+            'atr': atr[idx]
+        })
+        
+        return entries
     
     def generate_signal(self, df: pd.DataFrame) -> Optional[Dict]:
         """Generate trading signal from OHLCV data"""
         if df.empty or len(df) < max(self.rsi_period, self.ema_slow):
             return None
         
-        df = df.copy()
-        
-        df['rsi'] = ta.rsi(df['close'], length=self.rsi_period)
-        df['ema_fast'] = ta.ema(df['close'], length=self.ema_fast)
-        df['ema_slow'] = ta.ema(df['close'], length=self.ema_slow)
-        df['volume_sma'] = df['volume'].rolling(window=20).mean()
+        df = self.compute_indicators(df)
         
         last = df.iloc[-1]
         prev = df.iloc[-2]
         
+        return self._build_signal(
+            close=float(last['close']),
+            timestamp=int(last['timestamp']),
+            volume=float(last['volume']),
+            rsi=last['rsi'],
+            ema_fast=last['ema_fast'],
+            ema_slow=last['ema_slow'],
+            prev_ema_fast=prev['ema_fast'],
+            prev_ema_slow=prev['ema_slow'],
+            atr=last['atr']
+        )
+    
+    def generate_signal_from_state(self, state: StreamingIndicators) -> Optional[Dict]:
+        """Generate trading signal from incremental indicator state"""
+        if not state.is_ready():
+            return None
+        
+        return self._build_signal(
+            close=state.close,
+            timestamp=state.timestamp,
+            volume=state.volume,
+            rsi=state.rsi.value,
+            ema_fast=state.ema_fast.value,
+            ema_slow=state.ema_slow.value,
+            prev_ema_fast=state.prev_ema_fast,
+            prev_ema_slow=state.prev_ema_slow,
+            atr=state.atr.value
+        )
+    
+    def _build_signal(
+        self,
+        close: float,
+        timestamp: int,
+        volume: float,
+        rsi: float,
+        ema_fast: float,
+        ema_slow: float,
+        prev_ema_fast: float,
+        prev_ema_slow: float,
+        atr: float
+    ) -> Optional[Dict]:
+        """Apply entry rules to the last bar's indicator values"""
         signal_type = None
         confidence = 0.0
         
-        if (last['rsi'] < self.rsi_oversold and 
-            last['ema_fast'] > last['ema_slow'] and
-            prev['ema_fast'] <= prev['ema_slow']):
+        if (rsi < self.rsi_oversold and 
+            ema_fast > ema_slow and
+            prev_ema_fast <= prev_ema_slow):
             signal_type = 'LONG'
-            confidence = 0.6 + (self.rsi_oversold - last['rsi']) / 100
+            confidence = 0.6 + (self.rsi_oversold - rsi) / 100
         
-        elif (last['rsi'] > self.rsi_overbought and 
-              last['ema_fast'] < last['ema_slow'] and
-              prev['ema_fast'] >= prev['ema_slow']):
+        elif (rsi > self.rsi_overbought and 
+              ema_fast < ema_slow and
+              prev_ema_fast >= prev_ema_slow):
             signal_type = 'SHORT'
-            confidence = 0.6 + (last['rsi'] - self.rsi_overbought) / 100
+            confidence = 0.6 + (rsi - self.rsi_overbought) / 100
         
         if signal_type:
-            atr = ta.atr(df['high'], df['low'], df['close'], length=14).iloc[-1]
-            
             signal = {
                 'signal_type': signal_type,
-                'entry_price': float(last['close']),
-                'timestamp': int(last['timestamp']),
+                'entry_price': close,
+                'timestamp': timestamp,
                 'confidence': min(confidence, 0.95),
                 'indicators': {
-                    'rsi': float(last['rsi']),
-                    'ema_fast': float(last['ema_fast']),
-                    'ema_slow': float(last['ema_slow']),
-                    'volume': float(last['volume']),
+                    'rsi': float(rsi),
+                    'ema_fast': float(ema_fast),
+                    'ema_slow': float(ema_slow),
+                    'volume': volume,
                     'atr': float(atr)
                 }
             }
             
             if signal_type == 'LONG':
-                signal['stop_loss'] = float(last['close'] - 2 * atr)
-                signal['target_price'] = float(last['close'] + 3 * atr)
+                signal['stop_loss'] = float(close - self.atr_multiplier * atr)
+                signal['target_price'] = float(close + self.atr_multiplier * 1.5 * atr)
             else:
-                signal['stop_loss'] = float(last['close'] + 2 * atr)
-                signal['target_price'] = float(last['close'] - 3 * atr)
+                signal['stop_loss'] = float(close + self.atr_multiplier * atr)
+                signal['target_price'] = float(close - self.atr_multiplier * 1.5 * atr)
             
-            logger.info(f"Signal generated: {signal_type} at {last['close']}, confidence: {confidence:.2f}")
+            logger.info(f"Signal generated: {signal_type} at {close}, confidence: {confidence:.2f}")
             return signal
         
         return None
@@ -0,0 +1,209 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from signal_bot_3.data.timeframes import candle_open, timeframe_to_seconds
+from signal_bot_3.ui.cli import run_backtest
+from signal_bot_3.core.logger import logger
+
+STAGE_LABELS = {
+    'queued': '⏳ Queued',
+    'download': '📥 Downloading candles',
+    'signals': '🔍 Scanning bars',
+    'simulate': '💹 Simulating trades',
+    'done': '✅ Done',
+    'failed': '❌ Failed'
+}
+
+FINAL_STAGES = ('done', 'failed')
+
+ProgressCallback = Callable[[str, int, int], None]
+
+class BacktestJob:
+    """One backtest run shared by every request with the same key"""
+    
+    __slots__ = ('key', 'future', 'listeners', 'stage', 'done', 'total', 'task')
+    
+    def __init__(self, key: Tuple, future: asyncio.Future):
+        self.key = key
+        self.future = future
+        self.listeners: List[ProgressCallback] = []
+        self.stage = 'queued'
+        self.done = 0
+        self.total = 0
+        self.task: Optional[asyncio.Task] = None
+
+class BacktestJobService:
+    """Runs bot backtests on a bounded pool, sharing identical runs and caching their results"""
+    
+    def __init__(
+        self,
+        max_workers: int = 2,
+        ttl: float = 300.0,
+        max_entries: int = 64,
+        runner: Callable[..., Dict] = run_backtest
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.runner = runner
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backtest-job')
+        self._cache: OrderedDict = OrderedDict()
+        self._jobs: Dict[Tuple, BacktestJob] = {}
+    
+    @staticmethod
+    def cache_key(symbol: str, exchange: str, timeframes: List[str], limit: int, now: Optional[int] = None) -> Tuple:
+        """Request identity plus the last closed candle of the finest timeframe"""
+        now = int(time.time()) if now is None else now
+        finest = min(timeframes, key=timeframe_to_seconds)
+        last_closed = candle_open(now, finest) - timeframe_to_seconds(finest)
+        return (symbol, exchange, tuple(timeframes), limit, last_closed)
+    
+    def _cached(self, key: Tuple) -> Optional[Dict]:
+        """Cached result of a key unless it expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return None
+        return result
+    
+    def _store(self, key: Tuple, result: Dict):
+        """Cache a result; entries share one TTL, so the oldest expire first"""
+        self._cache[key] = (time.monotonic() + self.ttl, result)
+        self._cache.move_to_end(key)
+        
+        now = time.monotonic()
+        while self._cache and (len(self._cache) > self.max_entries or next(iter(self._cache.values()))[0] < now):
+            self._cache.popitem(last=False)
+    
+    async def run(
+        self,
+        symbol: str,
+        exchange: str,
+        timeframes: List[str],
+        limit: int,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        """Result of a backtest, from cache, from an identical run in flight, or from a new run"""
+        key = self.cache_key(symbol, exchange, timeframes, limit)
+        
+        cached = self._cached(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        
+        job = self._jobs.get(key)
+        if job is None:
+            self.misses += 1
+            job = BacktestJob(key, asyncio.get_running_loop().create_future())
+            self._jobs[key] = job
+            job.task = asyncio.create_task(self._execute(job, symbol, exchange, timeframes, limit))
+        else:
+            self.shared += 1
+        
+        if progress:
+            job.listeners.append(progress)
+            progress(job.stage, job.done, job.total)
+        
+        # A cancelled command must not cancel the run other requests are waiting for
+        return await asyncio.shield(job.future)
+    
+    def _notify(self, job: BacktestJob, stage: str, done: int, total: int):
+        """Record progress and pass it to every waiting request"""
+        job.stage, job.done, job.total = stage, done, total
+        for listener in job.listeners:
+            try:
+                listener(stage, done, total)
+            except Exception as e:
+                logger.error(f"Backtest progress callback failed: {e}")
+    
+    async def _execute(self, job: BacktestJob, symbol: str, exchange: str, timeframes: List[str], limit: int):
+        """Run the backtest on the pool and publish its result"""
+        loop = asyncio.get_running_loop()
+        
+        def report(stage: str, done: int, total: int):
+            loop.call_soon_threadsafe(self._notify, job, stage, done, total)
+        
+        try:
+            result = await loop.run_in_executor(self._pool, partial(
+                self.runner,
+                symbol=symbol,
+                exchange=exchange,
+                timeframes=timeframes,
+                limit=limit,
+                progress=report,
+                quiet=True
+            ))
+            self._store(job.key, result)
+            job.future.set_result(result)
+            self._notify(job, 'done', 1, 1)
+        except Exception as e:
+            logger.error(f"Backtest job {symbol} on {exchange} failed: {e}")
+            job.future.set_exception(e)
+            # Every requester may have gone; the error is logged here, not as an unretrieved exception
+            job.future.exception()
+            self._notify(job, 'failed', 0, 0)
+        finally:
+            self._jobs.pop(job.key, None)
+    
+    def stats(self) -> Dict:
+        """Job and cache counters"""
+        return {
+            'running': len(self._jobs),
+            'cached': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared': self.shared
+        }
+    
+    def close(self):
+        """Stop the worker pool after running jobs finish"""
+        self._pool.shutdown(wait=True)
+
+class ProgressMessage:
+    """Edits one chat message with job progress, at most once per interval"""
+    
+    def __init__(self, message, title: str, min_interval: float = 1.0):
+        self.message = message
+        self.title = title
+        self.min_interval = min_interval
+        self._last_text = None
+        self._last_edit = 0.0
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def __call__(self, stage: str, done: int, total: int):
+        """Schedule an edit for a progress update, dropping ones that come too fast"""
+        text = f"{self.title}\n{STAGE_LABELS.get(stage, stage)}"
+        if total > 1:
+            text += f" ({done}/{total})"
+        
+        now = time.monotonic()
+        if text == self._last_text or (now - self._last_edit < self.min_interval and stage not in FINAL_STAGES):
+            return
+        
+        self._last_text = text
+        self._last_edit = now
+        task = asyncio.create_task(self._edit(text))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _edit(self, text: str, **kwargs):
+        """Edit the message, ignoring Telegram's 'not modified' and rate errors"""
+        try:
+            await self.message.edit_text(text, **kwargs)
+        except Exception as e:
+            logger.debug(f"Progress edit skipped: {e}")
+    
+    async def finish(self, text: str, **kwargs):
+        """Replace the progress text with the final report"""
+        self._last_text = text
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._edit(text, **kwargs)
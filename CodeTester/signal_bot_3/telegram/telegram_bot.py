@@ -3,8 +3,8 @@ from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram.constants import ParseMode
 from signal_bot_3.core.logger import logger
-from signal_bot_3.ui.cli import run_backtest
-import asyncio
+from signal_bot_3.telegram.backtest_jobs import BacktestJobService, ProgressMessage
+from signal_bot_3.backtest.scanner import MarketScanner
 
 class TelegramBot:
     def __init__(self):
@@ -12,6 +12,7 @@ class TelegramBot:
         if not self.token:
             logger.warning("TELEGRAM_BOT_TOKEN not set, bot will not start")
         self.app = None
+        self.jobs = BacktestJobService()
     
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
@@ -24,6 +25,7 @@ Welcome to the professional crypto trading signal bot!
 /start - Show this message
 /help - Get help
 /run_backtest - Run backtest with default settings
+/scan - Backtest and rank all configured pairs
 /status - Check bot status
 
 *Features:*
@@ -44,6 +46,7 @@ Ready to analyze the markets! 📊
 
 *Commands:*
 /run_backtest - Run backtest analysis
+/scan - Rank every exchange/symbol pair from config
 /status - Check system status
 
 *Backtest:*
@@ -63,15 +66,16 @@ For support: Contact admin
     
     async def run_backtest_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /run_backtest command"""
-        await update.message.reply_text("🔄 Running backtest... This may take a few moments.")
+        message = await update.message.reply_text("🔄 Running backtest... This may take a few moments.")
+        progress = ProgressMessage(message, "🔄 Backtest BTC/USDT")
         
         try:
-            result = await asyncio.to_thread(
-                run_backtest,
+            result = await self.jobs.run(
                 symbol='BTC/USDT',
                 exchange='binance',
                 timeframes=['5m', '15m', '1h', '4h'],
-                limit=100
+                limit=100,
+                progress=progress
             )
             
             if result and 'metrics' in result:
@@ -98,23 +102,54 @@ For support: Contact admin
 • Final Equity: ${m.get('final_equity', 0):.2f}
                 """
                 
-                await update.message.reply_text(report, parse_mode=ParseMode.MARKDOWN)
+                await progress.finish(report, parse_mode=ParseMode.MARKDOWN)
             else:
-                await update.message.reply_text("❌ No signals generated in backtest")
-                
+                await progress.finish("❌ No signals generated in backtest")
+        
         except Exception as e:
             logger.error(f"Backtest error: {e}")
-            await update.message.reply_text(f"❌ Error running backtest: {str(e)}")
+            await progress.finish(f"❌ Error running backtest: {str(e)}")
+    
+    async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /scan command"""
+        scanner = MarketScanner(limit=100)
+        await update.message.reply_text(
+            f"🔎 Scanning {len(scanner.pairs())} pairs... This may take a few moments."
+        )
+        
+        try:
+            table = await scanner.scan()
+            ranked = table[table['error'].isna()].head(10)
+            
+            if ranked.empty:
+                await update.message.reply_text("❌ No pairs could be backtested")
+                return
+            
+            lines = [f"{'#':>2} {'Pair':<18} {'Trades':>6} {'Win%':>5} {'Ret%':>7} {'Sharpe':>6}"]
+            for row in ranked.itertuples(index=False):
+                lines.append(
+                    f"{row.rank:>2} {row.exchange + ':' + row.symbol:<18} {row.total_trades:>6.0f} "
+                    f"{row.win_rate*100:>5.1f} {row.return_pct:>7.2f} {row.sharpe_ratio:>6.2f}"
+                )
+            
+            report = "*🏆 Scan Ranking*\n\n```\n" + "\n".join(lines) + "\n```"
+            await update.message.reply_text(report, parse_mode=ParseMode.MARKDOWN)
+        
+        except Exception as e:
+            logger.error(f"Scan error: {e}")
+            await update.message.reply_text(f"❌ Error running scan: {str(e)}")
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        status = """
+        jobs = self.jobs.stats()
+        status = f"""
 *🟢 Bot Status*
 
 • System: Online
 • Database: Connected
 • Exchange API: Ready
 • Signal Engine: Active
+• Backtests: {jobs['running']} running, {jobs['cached']} cached
 
 All systems operational ✅
         """
@@ -126,11 +161,13 @@ All systems operational ✅
             logger.error("Cannot start bot: TELEGRAM_BOT_TOKEN not set")
             return
         
-        self.app = Application.builder().token(self.token).build()
+        # Concurrent updates keep commands responsive while backtests run
+        self.app = Application.builder().token(self.token).concurrent_updates(True).build()
         
         self.app.add_handler(CommandHandler("start", self.start))
         self.app.add_handler(CommandHandler("help", self.help_command))
         self.app.add_handler(CommandHandler("run_backtest", self.run_backtest_command))
+        self.app.add_handler(CommandHandler("scan", self.scan_command))
         self.app.add_handler(CommandHandler("status", self.status_command))
         
         logger.info("Telegram bot starting...")
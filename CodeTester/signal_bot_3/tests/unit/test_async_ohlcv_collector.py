@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+import unittest
+from signal_bot_3.data.async_ohlcv_collector import AsyncOHLCVCollector
+from signal_bot_3.data.fake_exchange import FakeExchange
+from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.data.timeframes import candle_open, timeframe_to_seconds
+
+class AsyncOHLCVCollectorTest(unittest.IsolatedAsyncioTestCase):
+    """Gap-aware sync against the offline FakeExchange"""
+    
+    timeframe = '1d'
+    limit = 200
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = MarketDatabase(os.path.join(self.tmp.name, 'market.db'))
+        self.step = timeframe_to_seconds(self.timeframe)
+        self.end = candle_open(int(time.time()), self.timeframe)
+        self.start = self.end - (self.limit - 1) * self.step
+    
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+    
+    def collector(self, exchange: FakeExchange, **kwargs) -> AsyncOHLCVCollector:
+        return AsyncOHLCVCollector('binance', rate_limit=60000, exchange=exchange, db=self.db, **kwargs)
+    
+    async def test_sync_fetches_only_what_is_missing(self):
+        # Candles the exchange never had: two before the pair "listed" and two inside the window
+        missing = {self.start, self.start + self.step, self.start + 50 * self.step, self.start + 120 * self.step}
+        exchange = FakeExchange(missing=missing)
+        
+        async with self.collector(exchange) as collector:
+            # Small pages keep the leading range from being merged into the tail request
+            collector.page_limit = 50
+            df = await collector.sync_ohlcv('BTC/USDT', self.timeframe, self.limit)
+            self.assertEqual(len(df), self.limit - len(missing))
+            self.assertFalse(set(df['timestamp'].tolist()) & missing)
+            self.assertEqual(int(df['timestamp'].iloc[-1]), self.end)
+            
+            expected = FakeExchange().candles('BTC/USDT', self.timeframe, self.start, self.limit)
+            expected = [row for row in expected if row[0] // 1000 not in missing]
+            self.assertEqual(df['close'].tolist(), [row[4] for row in expected])
+            
+            # Known holes are not requested again; only the forming candle is refreshed
+            exchange.calls = 0
+            again = await collector.sync_ohlcv('BTC/USDT', self.timeframe, self.limit)
+            self.assertEqual(exchange.calls, 1)
+            self.assertEqual(again['timestamp'].tolist(), df['timestamp'].tolist())
+    
+    async def test_fetch_many_bounds_concurrency(self):
+        exchange = FakeExchange(latency=0.02)
+        requests = [(symbol, self.timeframe) for symbol in ('BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT', 'ADA/USDT')]
+        
+        async with self.collector(exchange, max_concurrency=2) as collector:
+            frames = await collector.fetch_many(requests, limit=50)
+        
+        self.assertEqual(exchange.max_in_flight, 2)
+        self.assertTrue(exchange.closed)
+        for key, df in frames.items():
+            self.assertEqual(len(df), 50, key)
+            self.assertEqual(df.attrs['symbol'], key[0])
+    
+    async def test_injected_database_is_left_open(self):
+        async with self.collector(FakeExchange()) as collector:
+            self.assertIs(collector.db, self.db)
+        self.assertEqual(self.db.get_timestamp_bounds('binance', 'BTC/USDT', self.timeframe), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+from signal_bot_3.data.async_persistence import AsyncMarketDatabase
+from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.tests.unit.test_exchange_adapters import wait_for
+
+STREAM = ('binance', 'BTC/USDT', '1h')
+
+def make_candles(n: int, start: int = 1_700_000_000) -> pd.DataFrame:
+    """Hourly candles with a rising close"""
+    close = 100 + np.arange(n, dtype=np.float64)
+    return pd.DataFrame({
+        'timestamp': start + 3600 * np.arange(n), 'open': close, 'high': close + 1,
+        'low': close - 1, 'close': close, 'volume': np.ones(n)
+    })
+
+class GatedDatabase(MarketDatabase):
+    """MarketDatabase whose gated writes hold their transaction open until released"""
+    
+    def __init__(self, db_path: str):
+        self.gate = threading.Event()
+        super().__init__(db_path)
+    
+    def gated_insert(self, exchange: str, symbol: str, timeframe: str, data: pd.DataFrame):
+        self.upsert_ohlcv(self.conn, self.ohlcv_records(exchange, symbol, timeframe, data))
+        self.gate.wait(5)
+        self.conn.commit()
+
+class AsyncMarketDatabaseTest(unittest.IsolatedAsyncioTestCase):
+    """Reads stay available during writes and blocked writers are counted"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = GatedDatabase(os.path.join(self.tmp.name, 'market.db'))
+        self.store = AsyncMarketDatabase(self.db, max_pending=2)
+    
+    def tearDown(self):
+        self.db.gate.set()
+        self.store.close()
+        self.db.close()
+        self.tmp.cleanup()
+    
+    async def test_reads_during_write(self):
+        df = make_candles(100)
+        await self.store.insert_ohlcv(*STREAM, df.iloc[:50])
+        
+        write = asyncio.create_task(self.store.write('gated_insert', *STREAM, df.iloc[50:]))
+        await wait_for(lambda: self.store.admitted_writes == 1)
+        
+        # The readers see the last committed snapshot while the writer holds its transaction
+        reads = await asyncio.wait_for(
+            asyncio.gather(*(self.store.get_ohlcv(*STREAM, 1000) for _ in range(8))), timeout=2
+        )
+        self.assertTrue(all(len(frame) == 50 for frame in reads))
+        self.assertFalse(write.done())
+        
+        self.db.gate.set()
+        await write
+        self.assertEqual(len(await self.store.get_ohlcv(*STREAM, 1000)), 100)
+        self.assertEqual(self.store.stats()['read']['count'], 9)
+    
+    async def test_pending_writes_count_blocked_callers(self):
+        df = make_candles(10)
+        writes = [
+            asyncio.create_task(self.store.write('gated_insert', *STREAM, df.iloc[i:i + 1]))
+            for i in range(5)
+        ]
+        await wait_for(lambda: self.store.admitted_writes == 2)
+        await asyncio.sleep(0.05)
+        
+        stats = self.store.stats()
+        self.assertEqual(stats['queue_depth'], 5)
+        self.assertEqual(stats['admitted'], 2)
+        
+        self.db.gate.set()
+        await asyncio.gather(*writes)
+        self.assertEqual(self.store.stats()['queue_depth'], 0)
+        self.assertEqual(self.store.stats()['admitted'], 0)
+        self.assertEqual(len(await self.store.get_ohlcv(*STREAM, 1000)), 5)
+
+if __name__ == '__main__':
+    unittest.main()
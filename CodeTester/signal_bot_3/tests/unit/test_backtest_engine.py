@@ -0,0 +1,146 @@
+import unittest
+import numpy as np
+import pandas as pd
+from signal_bot_3.backtest.engine import BacktestEngine
+from signal_bot_3.data.timeframes import timeframe_to_seconds
+from signal_bot_3.risk_manager.portfolio_risk import PortfolioRiskManager
+
+# Loose entry rules so a few hundred bars give dozens of overlapping signals,
+# and tight portfolio limits so admission rejects and scales some of them
+CONFIG = {
+    'rsi_oversold': 60,
+    'rsi_overbought': 40,
+    'max_holding_bars': 20,
+    'max_open_positions': 2,
+    'max_portfolio_risk': 0.03,
+    'max_risk_per_trade': 0.02
+}
+
+def make_candles(n: int, timeframe: str, seed: int) -> pd.DataFrame:
+    """Random-walk candles of one timeframe"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': 1_700_000_000 + timeframe_to_seconds(timeframe) * np.arange(n),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.004, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.004, n)),
+        'close': close,
+        'volume': rng.uniform(1, 10, n)
+    })
+
+def loop_signals(engine: BacktestEngine, df: pd.DataFrame, timeframe: str) -> list:
+    """Signals of a per-bar scan that only sees the candles closed so far"""
+    signals = []
+    for i in range(len(df)):
+        signal = engine.simple_signal.generate_signal(df.iloc[:i + 1])
+        if signal and signal['confidence'] >= engine.min_confirmation_score:
+            signals.append({**signal, 'timeframe': timeframe, 'bar': i})
+    return signals
+
+def loop_simulate(engine: BacktestEngine, signals: list, frames: dict) -> tuple:
+    """Trades and risk manager of a walk over every bar close in time order: exits first, then entries"""
+    risk = PortfolioRiskManager.from_config(engine.config)
+    balance = engine.initial_capital
+    step = {tf: timeframe_to_seconds(tf) for tf in frames}
+    
+    closes = sorted({int(ts) + step[tf] for tf, df in frames.items() for ts in df['timestamp']})
+    entries = {}
+    for signal in signals:
+        entries.setdefault(signal['timestamp'] + step[signal['timeframe']], []).append(signal)
+    
+    trades, open_trades = [], []
+    
+    def exit_trade(trade, price, bar, reason, df):
+        nonlocal balance
+        result = engine.signal_metrics.calculate_trade_result(trade['signal'], price)
+        result.update(exit_timestamp=int(df['timestamp'].iloc[bar]), exit_reason=reason, bars_held=bar - trade['signal']['bar'])
+        trades[trade['index']] = result
+        balance += result['net_pnl']
+        risk.close(trade['position'].id)
+        open_trades.remove(trade)
+    
+    for now in closes:
+        for trade in list(open_trades):
+            tf, signal = trade['signal']['timeframe'], trade['signal']
+            df = frames[tf]
+            bar = int(np.searchsorted(df['timestamp'].to_numpy(), now - step[tf]))
+            if bar >= len(df) or int(df['timestamp'].iloc[bar]) + step[tf] != now:
+                continue
+            
+            high, low = df['high'].iloc[bar], df['low'].iloc[bar]
+            if signal['signal_type'] == 'LONG':
+                hit_target, hit_stop = high >= signal['target_price'], low <= signal['stop_loss']
+            else:
+                hit_target, hit_stop = low <= signal['target_price'], high >= signal['stop_loss']
+            
+            if hit_target:
+                exit_trade(trade, signal['target_price'], bar, 'target', df)
+            elif hit_stop:
+                exit_trade(trade, signal['stop_loss'], bar, 'stop', df)
+            elif bar == min(len(df) - 1, signal['bar'] + engine.max_holding_bars):
+                exit_trade(trade, float(df['close'].iloc[bar]), bar, 'timeout', df)
+        
+        for signal in entries.get(now, []):
+            if not engine.rr_calc.is_valid_signal(signal):
+                continue
+            
+            size = engine.pos_sizer.calculate_position_size(signal, balance)
+            size = risk.admit(signal, size, balance)
+            if not size:
+                continue
+            
+            signal['position_size'] = size
+            trade = {'signal': signal, 'index': len(trades), 'position': risk.open(signal, size)}
+            trades.append(None)
+            open_trades.append(trade)
+            
+            df = frames[signal['timeframe']]
+            if signal['bar'] == len(df) - 1:
+                # No later bar to exit on: closed flat at the entry
+                exit_trade(trade, signal['entry_price'], signal['bar'], 'timeout', df)
+    
+    return trades, risk
+
+class BacktestEngineTest(unittest.TestCase):
+    """Vectorized signals and simulation agree with a bar-by-bar loop"""
+    
+    def setUp(self):
+        self.frames = {'5m': make_candles(600, '5m', 1), '15m': make_candles(200, '15m', 2)}
+        self.engine = BacktestEngine(CONFIG)
+    
+    def test_find_signals_matches_loop(self):
+        for tf, df in self.frames.items():
+            with self.subTest(timeframe=tf):
+                actual = self.engine.find_signals(df, tf)
+                expected = loop_signals(self.engine, df, tf)
+                self.assertGreater(len(expected), 10)
+                self.assertEqual([s['bar'] for s in actual], [s['bar'] for s in expected])
+                
+                for a, e in zip(actual, expected):
+                    self.assertEqual((a['signal_type'], a['timestamp']), (e['signal_type'], e['timestamp']))
+                    for key in ('entry_price', 'stop_loss', 'target_price', 'confidence'):
+                        self.assertAlmostEqual(a[key], e[key], places=9, msg=key)
+    
+    def test_simulate_matches_loop(self):
+        signals = [s for tf, df in self.frames.items() for s in self.engine.find_signals(df, tf)]
+        actual = self.engine.simulate([dict(s) for s in signals], self.frames)
+        expected, risk = loop_simulate(self.engine, [dict(s) for s in signals], self.frames)
+        
+        # The portfolio limits must actually gate entries for the comparison to mean anything
+        self.assertGreater(risk.rejected, 0)
+        self.assertGreater(risk.scaled, 0)
+        self.assertGreater(len(expected), 10)
+        
+        self.assertEqual(len(actual), len(expected))
+        for a, e in zip(actual, expected):
+            self.assertEqual(
+                (a['timestamp'], a['exit_timestamp'], a['exit_reason'], a['bars_held']),
+                (e['timestamp'], e['exit_timestamp'], e['exit_reason'], e['bars_held'])
+            )
+            self.assertAlmostEqual(a['position_size'], e['position_size'], places=9)
+            self.assertAlmostEqual(a['net_pnl'], e['net_pnl'], places=9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import gc
+import threading
+import unittest
+from signal_bot_3.telegram.backtest_jobs import BacktestJobService, ProgressMessage
+from signal_bot_3.tests.unit.test_exchange_adapters import wait_for
+
+REQUEST = dict(symbol='BTC/USDT', exchange='binance', timeframes=['5m', '1h'], limit=100)
+
+class FakeRunner:
+    """run_backtest stand-in that blocks until released and counts its runs"""
+    
+    def __init__(self, error: str = None):
+        self.error = error
+        self.release = threading.Event()
+        self.calls = 0
+    
+    def __call__(self, symbol, exchange, timeframes, limit, progress, quiet):
+        self.calls += 1
+        progress('download', 1, 2)
+        self.release.wait(5)
+        if self.error:
+            raise RuntimeError(self.error)
+        return {'metrics': {'total_trades': 3}, 'symbol': symbol}
+
+class FakeMessage:
+    """Telegram message that records its edits"""
+    
+    def __init__(self):
+        self.edits = []
+    
+    async def edit_text(self, text, **kwargs):
+        self.edits.append(text)
+
+class BacktestJobServiceTest(unittest.IsolatedAsyncioTestCase):
+    """Identical requests share one run, and failures reach every requester"""
+    
+    async def asyncSetUp(self):
+        self.errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: self.errors.append(context))
+    
+    async def test_duplicate_requests_reuse_the_job(self):
+        runner = FakeRunner()
+        service = BacktestJobService(runner=runner)
+        
+        first = asyncio.create_task(service.run(**REQUEST))
+        second = asyncio.create_task(service.run(**REQUEST))
+        await wait_for(lambda: service.stats()['running'] == 1 and service.shared == 1)
+        
+        runner.release.set()
+        self.assertIs(await first, await second)
+        # Finished runs are served from the cache
+        self.assertIs(await service.run(**REQUEST), await first)
+        
+        self.assertEqual(runner.calls, 1)
+        self.assertEqual(service.stats(), {'running': 0, 'cached': 1, 'hits': 1, 'misses': 1, 'shared': 1})
+        service.close()
+    
+    async def test_failure_is_reported(self):
+        runner = FakeRunner("exchange down")
+        service = BacktestJobService(runner=runner)
+        message = FakeMessage()
+        progress = ProgressMessage(message, "Backtest", min_interval=0)
+        
+        request = asyncio.create_task(service.run(**REQUEST, progress=progress))
+        await wait_for(lambda: runner.calls == 1)
+        runner.release.set()
+        
+        with self.assertRaisesRegex(RuntimeError, "exchange down"):
+            await request
+        await asyncio.gather(*progress._tasks)
+        self.assertIn('Failed', message.edits[-1])
+        self.assertEqual(service.stats()['cached'], 0)
+        service.close()
+    
+    async def test_failure_without_waiters_is_not_logged_as_unretrieved(self):
+        runner = FakeRunner("exchange down")
+        service = BacktestJobService(runner=runner)
+        
+        request = asyncio.create_task(service.run(**REQUEST))
+        await wait_for(lambda: runner.calls == 1)
+        # The only requester gives up; the run carries on and fails with nobody awaiting it
+        request.cancel()
+        job = next(iter(service._jobs.values()))
+        runner.release.set()
+        await job.task
+        
+        del job, request
+        gc.collect()
+        await asyncio.sleep(0)
+        self.assertEqual(self.errors, [])
+        service.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import numpy as np
+import pandas as pd
+from signal_bot_3.data.bar_aggregator import SequencedBarBuilder, TradeAggregator
+from signal_bot_3.data.ws_decoder import TradeEvent
+
+START_MS = 1_700_000_000_000
+
+def make_trades(n: int = 5000, seed: int = 0) -> pd.DataFrame:
+    """Trades with bursts in one millisecond and quiet gaps longer than a bar"""
+    rng = np.random.default_rng(seed)
+    gaps = rng.choice([0, 1, 40, 900, 25_000], n, p=[0.3, 0.3, 0.25, 0.14, 0.01])
+    return pd.DataFrame({
+        'time_ms': START_MS + 7 + np.cumsum(gaps),
+        'price': 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, n))),
+        'qty': rng.uniform(0.01, 0.5, n)
+    })
+
+def reference_time_bars(trades: pd.DataFrame, step_ms: int) -> pd.DataFrame:
+    """Time bars by grouping trades on their interval with pandas"""
+    grouped = trades.groupby((trades['time_ms'] // step_ms) * step_ms // 1000)
+    return pd.DataFrame({
+        'open': grouped['price'].first(),
+        'high': grouped['price'].max(),
+        'low': grouped['price'].min(),
+        'close': grouped['price'].last(),
+        'volume': grouped['qty'].sum(),
+        'trades': grouped['price'].size()
+    })
+
+class TradeAggregatorTest(unittest.IsolatedAsyncioTestCase):
+    """Time, tick and volume bars built from one trade stream"""
+    
+    def setUp(self):
+        self.trades = make_trades()
+    
+    def feed(self, aggregator: TradeAggregator, trades: pd.DataFrame = None) -> list:
+        trades = self.trades if trades is None else trades
+        closed = []
+        for row in trades.itertuples(index=False):
+            closed.extend(aggregator.add_trade(int(row.time_ms), float(row.price), float(row.qty)))
+        return closed
+    
+    def test_time_bar_boundaries(self):
+        aggregator = TradeAggregator('binance', 'BTC/USDT', timeframes=['10s', '1m'])
+        closed = self.feed(aggregator)
+        
+        for label, step_ms in (('10s', 10_000), ('1m', 60_000)):
+            with self.subTest(label=label):
+                bars = [bar for bar_label, bar in closed if bar_label == label]
+                # The last interval is still forming and only closes on flush
+                expected = reference_time_bars(self.trades, step_ms).iloc[:-1]
+                
+                self.assertEqual([bar.timestamp for bar in bars], expected.index.tolist())
+                actual = pd.DataFrame([bar.to_candle() for bar in bars]).set_index('timestamp')
+                pd.testing.assert_frame_equal(actual, expected, check_names=False, check_dtype=False)
+                # Quiet intervals produce no bar
+                self.assertTrue(all(np.diff(expected.index) % (step_ms // 1000) == 0))
+    
+    def test_boundary_trade_opens_the_next_bar(self):
+        aggregator = TradeAggregator('binance', 'BTC/USDT', timeframes=['10s'])
+        self.assertEqual(aggregator.add_trade(START_MS + 9_999, 100.0, 1.0), [])
+        
+        closed = aggregator.add_trade(START_MS + 10_000, 101.0, 1.0)
+        self.assertEqual(len(closed), 1)
+        self.assertEqual(closed[0][1].timestamp, START_MS // 1000)
+        self.assertEqual(closed[0][1].close, 100.0)
+        self.assertEqual(aggregator.builders[0].bar.timestamp, START_MS // 1000 + 10)
+    
+    async def test_flush_then_late_trade(self):
+        bars = []
+        
+        async def on_bar(symbol, label, candle):
+            bars.append((symbol, label, candle))
+        
+        aggregator = TradeAggregator('binance', 'BTC/USDT', timeframes=['10s'], on_bar=on_bar)
+        aggregator.add_trade(START_MS + 1_000, 100.0, 1.0)
+        
+        # Not due yet: the interval ends at +10s
+        await aggregator.flush(START_MS + 9_999)
+        self.assertEqual(bars, [])
+        await aggregator.flush(START_MS + 10_500)
+        self.assertEqual(len(bars), 1)
+        self.assertEqual(bars[0][:2], ('BTC/USDT', '10s'))
+        self.assertEqual(bars[0][2]['timestamp'], START_MS // 1000)
+        
+        # A trade from the flushed interval arriving late is dropped, not a second bar for it
+        self.assertEqual(aggregator.add_trade(START_MS + 9_000, 99.0, 1.0), [])
+        self.assertIsNone(aggregator.builders[0].bar)
+        self.assertEqual(aggregator.stats()['late'], 1)
+        
+        aggregator.add_trade(START_MS + 12_000, 102.0, 1.0)
+        closed = aggregator.add_trade(START_MS + 20_000, 103.0, 1.0)
+        self.assertEqual(closed[0][1].timestamp, START_MS // 1000 + 10)
+        self.assertEqual(closed[0][1].open, 102.0)
+    
+    def test_tick_and_volume_thresholds(self):
+        aggregator = TradeAggregator('binance', 'BTC/USDT', tick_sizes=[50], volume_sizes=[10.0])
+        closed = self.feed(aggregator)
+        
+        ticks = [bar for label, bar in closed if label == '50t']
+        self.assertEqual(len(ticks), len(self.trades) // 50)
+        self.assertTrue(all(bar.trades == 50 for bar in ticks))
+        closes = self.trades['price'].to_numpy()[49::50]
+        np.testing.assert_array_equal([bar.close for bar in ticks], closes[:len(ticks)])
+        
+        volumes = [bar for label, bar in closed if label == '10v']
+        qty = self.trades['qty'].to_numpy()
+        self.assertTrue(all(bar.volume >= 10.0 for bar in volumes))
+        # The trade that crosses the threshold closes the bar without being split
+        self.assertTrue(all(bar.volume - 0.5 < 10.0 for bar in volumes))
+        forming = aggregator.builders[1].bar
+        self.assertAlmostEqual(sum(bar.volume for bar in volumes) + (forming.volume if forming else 0.0), qty.sum())
+        
+        for label, bars in (('50t', ticks), ('10v', volumes)):
+            with self.subTest(label=label):
+                keys = [bar.timestamp for bar in bars]
+                self.assertEqual(keys, sorted(set(keys)))
+                for bar in bars:
+                    self.assertGreaterEqual(bar.timestamp // SequencedBarBuilder.SEQUENCE, bar.last_ms)
+    
+    async def test_keys_of_bars_closing_in_one_millisecond(self):
+        aggregator = TradeAggregator('binance', 'BTC/USDT', tick_sizes=[1], volume_sizes=[0.1])
+        events = [TradeEvent('BTCUSDT', i, 100.0 + i, 0.2, START_MS, False) for i in range(5)]
+        events.append(TradeEvent('BTCUSDT', 5, 200.0, 0.2, START_MS + 1, False))
+        
+        bars = []
+        
+        async def on_bar(symbol, label, candle):
+            bars.append((label, candle['timestamp']))
+        
+        aggregator.on_bar = on_bar
+        await aggregator.on_trades(events)
+        
+        for label in ('1t', '0.1v'):
+            keys = [key for bar_label, key in bars if bar_label == label]
+            self.assertEqual(keys, [START_MS * 1000 + i for i in range(5)] + [(START_MS + 1) * 1000])
+        self.assertEqual(aggregator.stats()['bars'], {'1t': 6, '0.1v': 6})
+
+if __name__ == '__main__':
+    unittest.main()
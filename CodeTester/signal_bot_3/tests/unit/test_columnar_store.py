@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from signal_bot_3.data.columnar_store import COLUMN_DTYPES, ColumnarMarketDatabase
+
+STREAM = ('binance', 'BTC/USDT', '1h')
+
+def make_candles(n: int, start: int = 1_700_000_000, seed: int = 0) -> pd.DataFrame:
+    """Hourly random-walk candles"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'timestamp': start + 3600 * np.arange(n),
+        'open': close * (1 + rng.normal(0, 0.001, n)),
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': rng.uniform(1, 10, n)
+    })
+
+class ColumnarStoreTest(unittest.TestCase):
+    """Appends, last-candle revisions and gap refills of the column files"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = ColumnarMarketDatabase(os.path.join(self.tmp.name, 'market.db'), os.path.join(self.tmp.name, 'store'))
+        self.df = make_candles(300)
+    
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+    
+    def assertStored(self, expected: pd.DataFrame, db: ColumnarMarketDatabase = None):
+        db = db or self.db
+        expected = expected.sort_values('timestamp')
+        stored = db.get_ohlcv(*STREAM, limit=10_000)
+        for name in COLUMN_DTYPES:
+            np.testing.assert_array_equal(stored[name].to_numpy(), expected[name].to_numpy(), err_msg=name)
+        self.assertEqual(
+            db.get_timestamp_bounds(*STREAM),
+            (int(expected['timestamp'].iloc[0]), int(expected['timestamp'].iloc[-1]))
+        )
+    
+    def test_round_trip(self):
+        # Shuffled input with a duplicated timestamp: the last copy wins
+        shuffled = self.df.sample(frac=1, random_state=0)
+        duplicate = self.df.iloc[[10]].assign(close=1.0)
+        self.db.insert_ohlcv(*STREAM, pd.concat([shuffled, duplicate]))
+        
+        expected = self.df.copy()
+        expected.loc[10, 'close'] = 1.0
+        self.assertStored(expected)
+        
+        reopened = ColumnarMarketDatabase(self.db.db_path, self.db.store_path)
+        self.assertStored(expected, reopened)
+        reopened.close()
+    
+    def test_append(self):
+        self.db.insert_ohlcv(*STREAM, self.df.iloc[:200])
+        with mock.patch.object(self.db, '_rewrite', side_effect=AssertionError("rewrite")):
+            # Overlapping, unchanged candles are skipped and only the newer ones appended
+            self.db.insert_ohlcv(*STREAM, self.df.iloc[150:])
+        self.assertStored(self.df)
+    
+    def test_revise_last_candle(self):
+        self.db.insert_ohlcv(*STREAM, self.df.iloc[:200])
+        frame = self.db.get_ohlcv(*STREAM, limit=10_000)
+        
+        # A sync refetches the forming candle: revised last row plus new candles
+        update = self.df.iloc[199:].copy()
+        update.loc[199, ['close', 'volume']] = [123.0, 42.0]
+        with mock.patch.object(self.db, '_rewrite', side_effect=AssertionError("rewrite")):
+            self.db.insert_ohlcv(*STREAM, update.iloc[:1])
+            self.db.insert_ohlcv(*STREAM, update)
+        
+        expected = self.df.copy()
+        expected.loc[199, ['close', 'volume']] = [123.0, 42.0]
+        self.assertStored(expected)
+        self.assertEqual(len(frame), 200)
+        self.assertEqual(frame['close'].iloc[-1], 123.0)
+    
+    def test_gap_refill(self):
+        gap = self.df.index[100:120]
+        self.db.insert_ohlcv(*STREAM, self.df.drop(gap))
+        frame = self.db.get_ohlcv(*STREAM, limit=10_000)
+        
+        self.db.insert_ohlcv(*STREAM, self.df.loc[gap])
+        self.assertStored(self.df)
+        # Frames handed out before the rewrite keep their rows
+        self.assertEqual(len(frame), len(self.df) - len(gap))
+        self.assertNotIn(int(self.df['timestamp'].iloc[110]), frame['timestamp'].tolist())
+    
+    def test_revise_older_candle(self):
+        self.db.insert_ohlcv(*STREAM, self.df)
+        revised = self.df.iloc[[50]].assign(close=7.0)
+        self.db.insert_ohlcv(*STREAM, revised)
+        
+        expected = self.df.copy()
+        expected.loc[50, 'close'] = 7.0
+        self.assertStored(expected)
+
+if __name__ == '__main__':
+    unittest.main()
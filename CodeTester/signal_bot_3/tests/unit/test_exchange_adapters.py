@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+from signal_bot_3.data.exchange_adapters import get_adapter
+from signal_bot_3.data.fake_exchange import FakeExchange, FakeStreamServer
+from signal_bot_3.data.ws_collector import WebSocketPool
+
+async def wait_for(condition, timeout: float = 5.0):
+    """Poll until condition() is true"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise TimeoutError("condition not met")
+        await asyncio.sleep(0.01)
+
+class ExchangeAdapterRoundTripTest(unittest.IsolatedAsyncioTestCase):
+    """Frames published by the fake server come out of the pool as the same normalized events"""
+    
+    async def round_trip(self, exchange: str):
+        server = await FakeStreamServer(exchange).start()
+        adapter = get_adapter(exchange, server.url)
+        if adapter.ping_interval:
+            adapter.ping_interval = 0.05
+        pool = WebSocketPool(exchange, adapter=adapter)
+        
+        klines, trades = [], []
+        
+        async def on_klines(events):
+            klines.extend(events)
+        
+        async def on_trades(events):
+            trades.extend(events)
+        
+        kline_stream = adapter.kline_stream('BTC/USDT', '4h')
+        trade_stream = adapter.trade_stream('ETH/USDT')
+        await pool.subscribe({kline_stream: on_klines, trade_stream: on_trades})
+        task = asyncio.create_task(pool.run())
+        
+        try:
+            await wait_for(lambda: any(
+                {kline_stream, trade_stream} <= streams for streams in server.subscriptions.values()
+            ))
+            
+            rows = FakeExchange().candles('BTC/USDT', '4h', 1_699_999_200, 5)
+            for i, row in enumerate(rows):
+                await server.publish_kline('BTC/USDT', '4h', row, closed=i % 2 == 0)
+            for i in range(200):
+                await server.publish_trade(
+                    'ETH/USDT', 2000 + i * 0.5, 0.25, 1_700_000_000_000 + i, buyer_maker=i % 3 == 0, trade_id=i
+                )
+            
+            await wait_for(lambda: len(klines) == len(rows) and len(trades) == 200)
+            if adapter.ping_interval:
+                await wait_for(lambda: server.pings > 0)
+        finally:
+            await pool.close()
+            await task
+            await server.close()
+        
+        for i, (event, row) in enumerate(zip(klines, rows)):
+            self.assertEqual(event.symbol, 'BTCUSDT')
+            self.assertEqual(event.interval, '4h')
+            self.assertEqual(event.closed, i % 2 == 0)
+            self.assertEqual(event.to_candle(), {
+                'timestamp': row[0] // 1000, 'open': row[1], 'high': row[2],
+                'low': row[3], 'close': row[4], 'volume': row[5]
+            })
+        
+        for i, event in enumerate(trades):
+            self.assertEqual(event.symbol, 'ETHUSDT')
+            self.assertEqual(event.price, 2000 + i * 0.5)
+            self.assertEqual(event.qty, 0.25)
+            self.assertEqual(event.time_ms, 1_700_000_000_000 + i)
+            self.assertEqual(event.buyer_maker, i % 3 == 0)
+        
+        stats = pool.collectors[0].decoder.stats()
+        self.assertEqual(stats['errors'], 0)
+        # Subscription acks and pongs are skipped without being parsed
+        self.assertGreaterEqual(stats['dropped'], 1)
+        return server
+    
+    async def test_binance(self):
+        server = await self.round_trip('binance')
+        self.assertTrue(all(request.get('method') == 'SUBSCRIBE' for request in server.requests))
+    
+    async def test_bybit(self):
+        server = await self.round_trip('bybit')
+        subscribes = [request for request in server.requests if request.get('op') == 'subscribe']
+        self.assertTrue(all(len(request['args']) <= 10 for request in subscribes))
+        self.assertGreater(server.pings, 0)
+
+class ExchangeAdapterNamingTest(unittest.TestCase):
+    """Stream names follow each exchange's conventions"""
+    
+    def test_stream_names(self):
+        binance = get_adapter('binance')
+        self.assertEqual(binance.kline_stream('BTC/USDT', '1h'), 'btcusdt@kline_1h')
+        self.assertEqual(binance.trade_stream('BTC/USDT:USDT'), 'btcusdt@trade')
+        
+        bybit = get_adapter('bybit')
+        self.assertEqual(bybit.kline_stream('BTC/USDT', '4h'), 'kline.240.BTCUSDT')
+        self.assertEqual(bybit.kline_stream('BTC/USDT', '1d'), 'kline.D.BTCUSDT')
+        self.assertEqual(bybit.trade_stream('ETH/USDT'), 'publicTrade.ETHUSDT')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from signal_bot_3.core.live_pipeline import LivePipeline
+from signal_bot_3.data.candle_window import CandleWindow
+from signal_bot_3.data.persistence import MarketDatabase
+from signal_bot_3.indicators.streaming import StreamingIndicators
+
+KEY = ('binance', 'BTC/USDT', '5m')
+
+def make_candles(n: int = 2500, seed: int = 3) -> pd.DataFrame:
+    """Random-walk 5m candles"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': 1_600_000_000 + 300 * np.arange(n),
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.002,
+        'low': np.minimum(open_, close) * 0.998,
+        'close': close,
+        'volume': rng.uniform(1, 10, n)
+    })
+
+class LivePipelineStateTest(unittest.TestCase):
+    """Signals from incremental state match a full recompute over the window"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = MarketDatabase(os.path.join(self.tmp.name, 'market.db'))
+        # Loose thresholds so the random walk produces a few dozen signals
+        config = {
+            'timeframes': {'primary': '5m'},
+            'signal_engine': {'min_confirmation_score': 0.0, 'rsi_oversold': 60, 'rsi_overbought': 40}
+        }
+        self.pipeline = LivePipeline(config, self.db)
+        self.df = make_candles()
+        
+        window = CandleWindow(self.pipeline.window_size, *KEY)
+        window.extend(self.df.iloc[:500])
+        self.pipeline.windows[KEY] = window
+        self.pipeline.indicators[KEY] = StreamingIndicators.from_frame(window.to_frame(), self.pipeline.engine_config)
+    
+    def tearDown(self):
+        self.pipeline.store.close()
+        self.db.close()
+        self.tmp.cleanup()
+    
+    def test_matches_full_recompute(self):
+        fired = 0
+        for candle in self.df.iloc[500:].to_dict('records'):
+            self.pipeline.apply_candle(*KEY, candle)
+            self.pipeline.refresh_signal(*KEY)
+            
+            actual = self.pipeline._signals[KEY[:2]].get('5m')
+            expected = self.pipeline.signal_engine.generate_signals(self.pipeline.frames(*KEY[:2]))
+            self.assertEqual(actual is None, not expected, candle['timestamp'])
+            if actual:
+                fired += 1
+                self.assertEqual(actual['signal_type'], expected[0]['signal_type'])
+                self.assertEqual(actual['timestamp'], expected[0]['timestamp'])
+                self.assertAlmostEqual(actual['stop_loss'], expected[0]['stop_loss'], places=6)
+                self.assertAlmostEqual(actual['target_price'], expected[0]['target_price'], places=6)
+        
+        self.assertGreater(fired, 10)
+    
+    def test_revised_candle_reseeds_state(self):
+        candles = self.df.iloc[500:600].to_dict('records')
+        for candle in candles:
+            self.pipeline.apply_candle(*KEY, candle)
+        
+        revised = dict(candles[-1], close=candles[-1]['close'] * 1.01)
+        self.pipeline.apply_candle(*KEY, revised)
+        
+        expected = StreamingIndicators.from_frame(self.pipeline.windows[KEY].to_frame())
+        state = self.pipeline.indicators[KEY]
+        self.assertEqual(state.close, revised['close'])
+        self.assertAlmostEqual(state.rsi.value, expected.rsi.value, places=9)
+        self.assertAlmostEqual(state.ema_fast.value, expected.ema_fast.value, places=9)
+        
+        # Candles older than the window's newest are ignored
+        self.pipeline.apply_candle(*KEY, candles[0])
+        self.assertIs(self.pipeline.indicators[KEY], state)
+    
+    def test_correlation_follows_one_exchange(self):
+        self.pipeline.correlation_exchange = 'binance'
+        self.pipeline.correlation_timeframe = '5m'
+        for candle in self.df.iloc[500:520].to_dict('records'):
+            self.pipeline.apply_candle('bybit', 'BTC/USDT', '5m', dict(candle, close=candle['close'] * 1.5))
+            self.pipeline.apply_candle('binance', 'BTC/USDT', '5m', candle)
+        
+        self.assertEqual(self.pipeline.correlation.symbols, ['BTC/USDT'])
+        self.assertEqual(self.pipeline.correlation._last_close[0], self.df['close'].iloc[519])
+
+if __name__ == '__main__':
+    unittest.main()
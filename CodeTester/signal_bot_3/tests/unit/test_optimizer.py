@@ -0,0 +1,90 @@
+import unittest
+import numpy as np
+from signal_bot_3.backtest.optimizer import (
+    DEFAULT_SPACE, combination_table, grid_combinations, random_combinations, select_per_fold, walk_forward_splits
+)
+
+class WalkForwardSplitsTest(unittest.TestCase):
+    """Train windows roll forward and each test window follows its own train window"""
+    
+    def test_windows(self):
+        for start, end, n_splits, train_ratio in [(0, 1000, 3, 0.7), (1_600_000_000, 1_700_000_001, 5, 0.6), (10, 97, 4, 0.5)]:
+            with self.subTest(start=start, end=end, n_splits=n_splits):
+                splits = walk_forward_splits(start, end, n_splits, train_ratio)
+                self.assertEqual(len(splits), n_splits)
+                self.assertEqual(splits[0][0][0], start)
+                self.assertEqual(splits[-1][1][1], end)
+                
+                for (train_start, train_end), (test_start, test_end) in splits:
+                    self.assertLessEqual(start, train_start)
+                    self.assertLess(train_start, train_end)
+                    # Half-open windows: the test window starts where its train window ends
+                    self.assertEqual(test_start, train_end)
+                    self.assertLess(test_start, test_end)
+                    self.assertLessEqual(test_end, end)
+                
+                tests = [test for _, test in splits]
+                for previous, following in zip(tests, tests[1:]):
+                    self.assertLessEqual(previous[1], following[0])
+                    self.assertGreater(following[0], previous[0])
+
+class RandomCombinationsTest(unittest.TestCase):
+    """Random search draws distinct grid points reproducibly"""
+    
+    def test_distinct_and_deterministic(self):
+        grid = grid_combinations(DEFAULT_SPACE)
+        combos = random_combinations(DEFAULT_SPACE, 500, seed=7)
+        
+        self.assertEqual(len(combos), 500)
+        self.assertEqual(len({tuple(combo.values()) for combo in combos}), 500)
+        self.assertTrue(all(combo in grid for combo in combos[:50]))
+        self.assertTrue(all(list(combo) == list(DEFAULT_SPACE) for combo in combos))
+        
+        self.assertEqual(random_combinations(DEFAULT_SPACE, 500, seed=7), combos)
+        self.assertNotEqual(random_combinations(DEFAULT_SPACE, 500, seed=8), combos)
+    
+    def test_capped_at_grid_size(self):
+        space = {'a': [1, 2], 'b': [3, 4, 5]}
+        combos = random_combinations(space, 100)
+        self.assertEqual(sorted(tuple(combo.values()) for combo in combos), sorted(tuple(c.values()) for c in grid_combinations(space)))
+
+class CombinationTableTest(unittest.TestCase):
+    """Fold-averaged table and the per-fold selection drawn from it"""
+    
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.rows = []
+        for i in range(20):
+            folds = []
+            for _ in range(3):
+                fold = {}
+                for prefix in ('train', 'test'):
+                    fold[f'{prefix}_sharpe'] = float(rng.normal())
+                    fold[f'{prefix}_return_pct'] = float(rng.normal(0, 5))
+                    fold[f'{prefix}_trades'] = int(rng.integers(0, 30))
+                folds.append(fold)
+            self.rows.append({'params': {'rsi_period': 7 + i, 'ema_fast': 9}, 'folds': folds})
+    
+    def test_aggregates_and_sorts(self):
+        table = combination_table(self.rows)
+        self.assertEqual(len(table), len(self.rows))
+        self.assertTrue(table['train_sharpe'].is_monotonic_decreasing)
+        
+        for _, row in table.iterrows():
+            source = next(r for r in self.rows if r['params']['rsi_period'] == row['rsi_period'])
+            self.assertAlmostEqual(row['test_sharpe'], np.mean([fold['test_sharpe'] for fold in source['folds']]))
+            self.assertEqual(row['test_trades'], sum(fold['test_trades'] for fold in source['folds']))
+    
+    def test_selection_is_best_train_score_per_fold(self):
+        selection = select_per_fold(combination_table(self.rows))
+        self.assertEqual(selection['fold'].tolist(), [1, 2, 3])
+        
+        for fold, row in zip(range(3), selection.to_dict('records')):
+            best = max(self.rows, key=lambda r: r['folds'][fold]['train_sharpe'])
+            self.assertEqual(row['rsi_period'], best['params']['rsi_period'])
+            self.assertEqual(row['test_sharpe'], best['folds'][fold]['test_sharpe'])
+        
+        self.assertTrue(select_per_fold(combination_table([])).empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import math
+import unittest
+import numpy as np
+import pandas as pd
+from signal_bot_3.metrics.performance import PerformanceAccumulator, PerformanceMetrics
+
+def reference_metrics(pnls: np.ndarray, initial_capital: float = 10000) -> dict:
+    """Batch metrics computed with pandas over the equity curve"""
+    df = pd.DataFrame({'pnl': pnls})
+    wins = df[df['pnl'] > 0]['pnl']
+    losses = df[df['pnl'] < 0]['pnl']
+    
+    equity = initial_capital + df['pnl'].cumsum()
+    peak = equity.expanding().max()
+    returns = equity.pct_change().dropna()
+    downside = returns[returns < 0]
+    
+    return {
+        'total_trades': len(df),
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'win_rate': len(wins) / len(df),
+        'total_pnl': df['pnl'].sum(),
+        'avg_win': wins.mean() if len(wins) else 0,
+        'avg_loss': losses.mean() if len(losses) else 0,
+        'profit_factor': abs(wins.sum() / losses.sum()) if len(losses) and losses.sum() != 0 else 0,
+        'max_drawdown': ((equity - peak) / peak).min(),
+        'sharpe_ratio': np.sqrt(252) * returns.mean() / returns.std() if len(returns) and returns.std() > 0 else 0,
+        'sortino_ratio': np.sqrt(252) * returns.mean() / downside.std() if len(downside) and downside.std() > 0 else 0,
+        'final_equity': equity.iloc[-1],
+        'return_pct': (equity.iloc[-1] / initial_capital - 1) * 100
+    }
+
+class PerformanceAccumulatorTest(unittest.TestCase):
+    """Online statistics agree with the batch pandas calculation"""
+    
+    def assertMetricsEqual(self, actual: dict, expected: dict):
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, value in expected.items():
+            with self.subTest(metric=key):
+                if isinstance(value, float) and math.isnan(value):
+                    self.assertTrue(math.isnan(actual[key]))
+                else:
+                    self.assertAlmostEqual(actual[key], value, delta=1e-9 * max(1.0, abs(value)))
+    
+    def test_matches_pandas(self):
+        rng = np.random.default_rng(0)
+        for trial in range(200):
+            n = int(rng.integers(1, 80))
+            pnls = rng.normal(5, 100, n)
+            if trial % 7 == 0:
+                pnls = np.abs(pnls)
+            elif trial % 11 == 0:
+                pnls = -np.abs(pnls)
+            
+            accumulator = PerformanceAccumulator()
+            for pnl in pnls:
+                accumulator.add_pnl(float(pnl))
+            self.assertMetricsEqual(accumulator.snapshot(), reference_metrics(pnls))
+    
+    def test_snapshot_after_every_trade(self):
+        pnls = np.random.default_rng(1).normal(0, 50, 60)
+        accumulator = PerformanceAccumulator()
+        for i, pnl in enumerate(pnls):
+            accumulator.add_pnl(float(pnl))
+            self.assertMetricsEqual(accumulator.snapshot(), reference_metrics(pnls[:i + 1]))
+    
+    def test_trade_dicts(self):
+        pnls = np.random.default_rng(2).normal(0, 50, 30)
+        trades = [{'net_pnl': float(pnl)} for pnl in pnls]
+        self.assertMetricsEqual(PerformanceMetrics().calculate_metrics(trades), reference_metrics(pnls))
+        self.assertEqual(PerformanceMetrics().calculate_metrics([]), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from signal_bot_3.correlation_analyzer.rolling_correlation import RollingCorrelation
+from signal_bot_3.risk_manager.portfolio_risk import PortfolioRiskManager
+
+def signal(
+    symbol: str = 'BTC/USDT',
+    signal_type: str = 'LONG',
+    timeframe: str = '5m',
+    timestamp: int = 1_700_000_000,
+    entry: float = 100.0,
+    stop: float = 98.0,
+    target: float = 103.0,
+    exchange: str = 'binance'
+) -> dict:
+    """A signal dict as LivePipeline.evaluate hands it to the risk manager"""
+    return {
+        'exchange': exchange, 'symbol': symbol, 'timeframe': timeframe, 'timestamp': timestamp,
+        'signal_type': signal_type, 'entry_price': entry, 'stop_loss': stop, 'target_price': target
+    }
+
+class AdmitTest(unittest.TestCase):
+    """Admission against position count, portfolio risk, symbol risk and correlation"""
+    
+    def test_scales_then_rejects_on_portfolio_risk(self):
+        risk = PortfolioRiskManager(max_open_positions=10, max_portfolio_risk=0.05, max_symbol_risk=1.0)
+        # $2 risk per unit: 150 units risk $300 of a $10,000 account
+        self.assertEqual(risk.admit(signal(), 150, 10_000), 150)
+        risk.open(signal(), 150)
+        self.assertAlmostEqual(risk.open_risk, 300)
+        
+        # $200 of room left scales 150 units down to 100
+        self.assertAlmostEqual(risk.admit(signal('ETH/USDT'), 150, 10_000), 100)
+        risk.open(signal('ETH/USDT'), 100)
+        self.assertEqual(risk.scaled, 1)
+        
+        self.assertEqual(risk.admit(signal('SOL/USDT'), 150, 10_000), 0.0)
+        self.assertEqual(risk.rejected, 1)
+    
+    def test_position_count_and_symbol_risk(self):
+        risk = PortfolioRiskManager(max_open_positions=2, max_portfolio_risk=1.0, max_symbol_risk=0.03)
+        risk.open(signal(), 100)
+        # $200 of $300 symbol room used: a second $200 BTC position is scaled to half
+        self.assertAlmostEqual(risk.admit(signal(), 100, 10_000), 50)
+        risk.open(signal('ETH/USDT'), 10)
+        self.assertEqual(risk.admit(signal('SOL/USDT'), 10, 10_000), 0.0)
+    
+    def test_rejects_no_risk_to_stop(self):
+        risk = PortfolioRiskManager()
+        self.assertEqual(risk.admit(signal(stop=101.0), 10, 10_000), 0.0)
+    
+    def test_rejects_correlated_book(self):
+        rng = np.random.default_rng(0)
+        correlation = RollingCorrelation(window=50)
+        base = np.cumsum(rng.normal(0, 0.01, 60))
+        for i, x in enumerate(base):
+            correlation.update('BTC/USDT', i, float(np.exp(x)))
+            correlation.update('ETH/USDT', i, float(np.exp(x * 1.2)))
+        
+        risk = PortfolioRiskManager(max_portfolio_risk=1.0, correlation=correlation)
+        risk.open(signal(), 10)
+        self.assertEqual(risk.admit(signal('ETH/USDT'), 10, 10_000), 0.0)
+        # The opposite side hedges the open position
+        self.assertGreater(risk.admit(signal('ETH/USDT', 'SHORT', stop=102.0, target=97.0), 10, 10_000), 0)
+
+class ExitTest(unittest.TestCase):
+    """Positions resolve on their own stream's candles and expire by time"""
+    
+    def setUp(self):
+        self.risk = PortfolioRiskManager(max_open_positions=10, max_portfolio_risk=1.0)
+        self.ts = 1_700_000_000
+        self.long = self.risk.open(signal(timestamp=self.ts), 10, exit_time=self.ts + 3600)
+        self.short = self.risk.open(signal(signal_type='SHORT', timestamp=self.ts, stop=102.0, target=97.0), 10)
+    
+    def test_ignores_other_timeframes_and_the_entry_candle(self):
+        # A 4h candle that began before the 5m entry spans both stops
+        self.assertEqual(self.risk.check_exits('BTC/USDT', 105.0, 95.0, '4h', self.ts - 3600, 'binance'), [])
+        # The signal candle itself closed before the entry
+        self.assertEqual(self.risk.check_exits('BTC/USDT', 105.0, 95.0, '5m', self.ts, 'binance'), [])
+        self.assertEqual(self.risk.check_exits('BTC/USDT', 105.0, 95.0, '5m', self.ts + 300, 'bybit'), [])
+        self.assertEqual(len(self.risk.positions), 2)
+    
+    def test_stop_and_target(self):
+        hit = self.risk.check_exits('BTC/USDT', 101.0, 97.5, '5m', self.ts + 300, 'binance')
+        self.assertEqual([position.id for position in hit], [self.long.id])
+        
+        hit = self.risk.check_exits('BTC/USDT', 101.0, 96.5, '5m', self.ts + 600, 'binance')
+        self.assertEqual([position.id for position in hit], [self.short.id])
+        self.assertEqual(self.risk.open_risk, 0.0)
+        self.assertEqual(self.risk.stats()['symbols'], 0)
+    
+    def test_release_until(self):
+        self.assertEqual(self.risk.release_until(self.ts + 3599), [])
+        released = self.risk.release_until(self.ts + 3600)
+        self.assertEqual([position.id for position in released], [self.long.id])
+        self.assertAlmostEqual(self.risk.open_risk, self.short.risk)
+        
+        # A position closed by its stop is skipped when its expiry comes up
+        position = self.risk.open(signal(timestamp=self.ts), 10, exit_time=self.ts + 7200)
+        self.risk.close(position.id)
+        self.assertEqual(self.risk.release_until(self.ts + 7200), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from signal_bot_3.metrics.per_signal import PerSignalMetrics
+
+def brute_force_exit(i, entry_bars, entry_prices, targets, stops, directions, open_, high, low, close, max_bars, tie_break):
+    """First-touch exit of one trade by walking its bars one at a time"""
+    first = entry_bars[i] + 1
+    last = len(close) - 1 if max_bars is None else min(len(close) - 1, entry_bars[i] + max_bars)
+    if first > last:
+        return entry_prices[i], entry_bars[i], 'timeout'
+    
+    for bar in range(first, last + 1):
+        if directions[i] > 0:
+            hit_target, hit_stop = high[bar] >= targets[i], low[bar] <= stops[i]
+        else:
+            hit_target, hit_stop = low[bar] <= targets[i], high[bar] >= stops[i]
+        
+        if hit_target and hit_stop:
+            if tie_break == 'open':
+                tie_break = 'target' if abs(open_[bar] - targets[i]) <= abs(open_[bar] - stops[i]) else 'stop'
+            return (targets[i], bar, 'target') if tie_break == 'target' else (stops[i], bar, 'stop')
+        if hit_target:
+            return targets[i], bar, 'target'
+        if hit_stop:
+            return stops[i], bar, 'stop'
+    
+    return close[last], last, 'timeout'
+
+class ResolveExitsTest(unittest.TestCase):
+    """Vectorized first-touch resolution agrees with a bar-by-bar loop"""
+    
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n = 3000
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+        self.open = np.r_[self.close[0], self.close[:-1]]
+        self.high = np.maximum(self.open, self.close) * (1 + rng.uniform(0, 0.003, n))
+        self.low = np.minimum(self.open, self.close) * (1 - rng.uniform(0, 0.003, n))
+        
+        trades = 1000
+        # Entries near the end exercise the timeout at the last bar
+        self.entry_bars = np.r_[rng.integers(0, n - 1, trades - 3), [n - 3, n - 2, n - 1]]
+        self.entry_prices = self.close[self.entry_bars]
+        self.directions = rng.choice([1, -1], len(self.entry_bars))
+        atr = rng.uniform(0.05, 2, len(self.entry_bars))
+        self.targets = self.entry_prices + self.directions * 3 * atr
+        self.stops = self.entry_prices - self.directions * 2 * atr
+    
+    def test_matches_brute_force(self):
+        metrics = PerSignalMetrics()
+        for max_bars in (None, 100, 7, 1):
+            for tie_break in ('target', 'stop', 'open'):
+                with self.subTest(max_bars=max_bars, tie_break=tie_break):
+                    prices, bars, reasons = metrics.resolve_exits(
+                        self.entry_bars, self.entry_prices, self.targets, self.stops, self.directions,
+                        self.high, self.low, self.close, open_=self.open, max_bars=max_bars, tie_break=tie_break
+                    )
+                    for i in range(len(self.entry_bars)):
+                        expected = brute_force_exit(
+                            i, self.entry_bars, self.entry_prices, self.targets, self.stops, self.directions,
+                            self.open, self.high, self.low, self.close, max_bars, tie_break
+                        )
+                        self.assertEqual((prices[i], bars[i], reasons[i]), expected, f"trade {i}")
+    
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            PerSignalMetrics().resolve_exits(
+                self.entry_bars, self.entry_prices, self.targets, self.stops, self.directions,
+                self.high, self.low, self.close, tie_break='random'
+            )
+
+if __name__ == '__main__':
+    unittest.main()
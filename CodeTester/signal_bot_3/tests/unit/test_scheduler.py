@@ -0,0 +1,157 @@
+import asyncio
+import random
+import unittest
+from signal_bot_3.core.scheduler import ScheduledTask, Scheduler
+
+class FakeClock:
+    """Wall clock the test moves by hand"""
+    
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+class ScheduledTaskTest(unittest.TestCase):
+    """Deadline arithmetic of one task"""
+    
+    def test_aligned_deadline(self):
+        task = ScheduledTask('sync', None, 300, align=True, offset=2)
+        self.assertEqual(task.schedule(1000.0, random.Random(0)), 1202.0)
+        self.assertEqual(task.schedule(1202.0, random.Random(0)), 1502.0)
+        self.assertEqual(task.schedule(1201.9, random.Random(0)), 1202.0)
+    
+    def test_fixed_rate_and_late_catch_up(self):
+        task = ScheduledTask('scan', None, 60)
+        self.assertEqual(task.schedule(1000.0, random.Random(0)), 1060.0)
+        # A run that fires a little late keeps the original cadence
+        self.assertEqual(task.schedule(1061.5, random.Random(0)), 1120.0)
+        # After a stall of several intervals the missed runs are not replayed
+        self.assertEqual(task.schedule(1400.0, random.Random(0)), 1460.0)
+    
+    def test_jitter_is_bounded_and_seeded(self):
+        deadlines = []
+        for seed in (1, 1, 2):
+            task = ScheduledTask('sync', None, 300, align=True, jitter=5)
+            deadlines.append(task.schedule(1000.0, random.Random(seed)))
+        
+        self.assertTrue(all(1200.0 <= deadline <= 1205.0 for deadline in deadlines))
+        self.assertEqual(deadlines[0], deadlines[1])
+        self.assertNotEqual(deadlines[0], deadlines[2])
+
+class SchedulerTest(unittest.IsolatedAsyncioTestCase):
+    """The run loop against a fake clock"""
+    
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.scheduler = Scheduler(clock=self.clock, seed=0)
+        self.runs = []
+        self.loop_task = None
+    
+    async def asyncTearDown(self):
+        await self.scheduler.shutdown(timeout=0.1)
+        if self.loop_task is not None:
+            await self.loop_task
+    
+    def recorder(self, name: str):
+        async def run():
+            self.runs.append((self.clock(), name))
+        return run
+    
+    async def start(self):
+        self.loop_task = asyncio.create_task(self.scheduler.run())
+        await self.settle()
+    
+    async def settle(self):
+        """Let the loop and the runs it started take their turns"""
+        for _ in range(10):
+            await asyncio.sleep(0)
+    
+    async def advance(self, seconds: float, step: float = 1.0):
+        """Move the clock forward one step at a time, waking the loop after each"""
+        end = self.clock.now + seconds
+        while self.clock.now < end:
+            self.clock.now = min(end, self.clock.now + step)
+            self.scheduler._wake.set()
+            await self.settle()
+    
+    async def test_runs_in_deadline_order(self):
+        for interval in (10, 3, 7):
+            self.scheduler.add_task(self.recorder(f"every-{interval}"), interval)
+        await self.start()
+        await self.advance(21)
+        
+        times = [time for time, _ in self.runs]
+        self.assertEqual(times, sorted(times))
+        for interval in (10, 3, 7):
+            expected = [1000.0 + k * interval for k in range(1, 21 // interval + 1)]
+            self.assertEqual([time for time, name in self.runs if name == f"every-{interval}"], expected)
+    
+    async def test_immediate_and_rescheduled(self):
+        task = self.scheduler.add_task(self.recorder('scan'), 60, name='scan', immediate=True)
+        await self.start()
+        self.assertEqual(self.runs, [(1000.0, 'scan')])
+        
+        await self.advance(180, step=30)
+        self.assertEqual([time for time, _ in self.runs], [1000.0, 1060.0, 1120.0, 1180.0])
+        self.assertEqual(task.next_run, 1240.0)
+        self.assertEqual(self.scheduler.stats()['scan']['runs'], 4)
+    
+    async def test_failing_task_does_not_stop_the_loop(self):
+        async def broken():
+            raise RuntimeError("exchange down")
+        
+        failing = self.scheduler.add_task(broken, 5)
+        self.scheduler.add_task(self.recorder('healthy'), 5)
+        await self.start()
+        await self.advance(20)
+        
+        self.assertFalse(self.loop_task.done())
+        self.assertEqual(failing.failures, 4)
+        self.assertEqual(failing.runs, 4)
+        self.assertEqual(len(self.runs), 4)
+    
+    async def test_overlapping_runs_are_skipped(self):
+        release = asyncio.Event()
+        
+        async def slow():
+            await release.wait()
+        
+        task = self.scheduler.add_task(slow, 10)
+        await self.start()
+        await self.advance(30)
+        
+        self.assertEqual(len(task.active), 1)
+        self.assertEqual(task.skipped, 2)
+        release.set()
+        await self.settle()
+        self.assertEqual(task.runs, 1)
+    
+    async def test_stop_and_cancel_overrunning_runs(self):
+        cancelled = asyncio.Event()
+        
+        async def stuck():
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        task = self.scheduler.add_task(stuck, 10)
+        self.scheduler.add_task(self.recorder('other'), 10)
+        await self.start()
+        await self.advance(10)
+        self.assertEqual(len(task.active), 1)
+        
+        await self.scheduler.shutdown(timeout=0.05)
+        await asyncio.wait_for(self.loop_task, timeout=1)
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(len(task.active), 0)
+        
+        # Nothing runs once stopped, however far the clock moves
+        self.clock.now += 100
+        await self.settle()
+        self.assertEqual(len(self.runs), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+from signal_bot_3.indicators.streaming import (
+    StreamingATR, StreamingEMA, StreamingIndicators, StreamingRSI, StreamingSMA
+)
+
+def make_candles(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Random-walk OHLCV candles"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': 1_600_000_000 + 300 * np.arange(n),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, n)),
+        'close': close,
+        'volume': rng.uniform(1, 10, n)
+    })
+
+def stream(update, *columns) -> np.ndarray:
+    """Feed columns row by row, NaN where the indicator is not ready yet"""
+    values = [update(*row) for row in zip(*columns)]
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+class StreamingIndicatorTest(unittest.TestCase):
+    """Streaming indicators match pandas_ta on the same candles"""
+    
+    def setUp(self):
+        self.df = make_candles()
+        self.close = self.df['close'].to_numpy()
+        self.high = self.df['high'].to_numpy()
+        self.low = self.df['low'].to_numpy()
+        self.volume = self.df['volume'].to_numpy()
+    
+    def assertMatches(self, actual: np.ndarray, expected: pd.Series, warmup: int = 0):
+        """Same values everywhere past the warm-up; pandas_ta starts RSI before it has a full period"""
+        expected = expected.to_numpy(dtype=np.float64)
+        np.testing.assert_array_equal(np.isnan(actual[warmup:]), np.isnan(expected[warmup:]))
+        np.testing.assert_allclose(actual[warmup:], expected[warmup:], rtol=1e-9, atol=1e-9, equal_nan=True)
+    
+    def test_ema(self):
+        for length in (9, 21, 200):
+            with self.subTest(length=length):
+                actual = stream(StreamingEMA(length).update, self.close)
+                self.assertMatches(actual, ta.ema(self.df['close'], length=length))
+    
+    def test_rsi(self):
+        for length in (7, 14):
+            with self.subTest(length=length):
+                actual = stream(StreamingRSI(length).update, self.close)
+                self.assertMatches(actual, ta.rsi(self.df['close'], length=length), warmup=length)
+    
+    def test_atr(self):
+        actual = stream(StreamingATR(14).update, self.high, self.low, self.close)
+        self.assertMatches(actual, ta.atr(self.df['high'], self.df['low'], self.df['close'], length=14))
+    
+    def test_sma(self):
+        actual = stream(StreamingSMA(20).update, self.volume)
+        self.assertMatches(actual, self.df['volume'].rolling(20).mean())
+    
+    def test_seed_then_stream(self):
+        split = 1500
+        state = StreamingIndicators.from_frame(self.df.iloc[:split])
+        for i in range(split, len(self.df)):
+            state.update(int(self.df['timestamp'].iloc[i]), self.high[i], self.low[i], self.close[i], self.volume[i])
+        
+        self.assertAlmostEqual(state.rsi.value, ta.rsi(self.df['close'], length=14).iloc[-1], places=9)
+        self.assertAlmostEqual(state.ema_fast.value, ta.ema(self.df['close'], length=9).iloc[-1], places=9)
+        self.assertAlmostEqual(state.ema_slow.value, ta.ema(self.df['close'], length=21).iloc[-1], places=9)
+        self.assertAlmostEqual(
+            state.atr.value, ta.atr(self.df['high'], self.df['low'], self.df['close'], length=14).iloc[-1], places=9
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+from signal_bot_3.data.exchange_adapters import get_adapter
+from signal_bot_3.data.fake_exchange import FakeExchange, FakeStreamServer
+from signal_bot_3.data.ws_collector import WebSocketPool
+from signal_bot_3.tests.unit.test_exchange_adapters import wait_for
+
+CONFIG = {'reconnect_delay': 0.05, 'max_reconnect_delay': 0.1, 'max_reconnect_attempts': 10}
+
+async def unused_port() -> int:
+    """A local port nothing listens on"""
+    server = await FakeStreamServer().start()
+    port = server.port
+    await server.close()
+    return port
+
+class FirstConnectTest(unittest.IsolatedAsyncioTestCase):
+    """A failed first connect backs off and retries instead of ending the pool"""
+    
+    async def test_retries_until_server_is_up(self):
+        port = await unused_port()
+        adapter = get_adapter('binance', f"ws://127.0.0.1:{port}")
+        pool = WebSocketPool('binance', adapter=adapter, config=CONFIG)
+        
+        klines = []
+        
+        async def on_klines(events):
+            klines.extend(events)
+        
+        stream = adapter.kline_stream('BTC/USDT', '1h')
+        await pool.subscribe({stream: on_klines})
+        task = asyncio.create_task(pool.run())
+        
+        await asyncio.sleep(0.1)
+        self.assertFalse(task.done())
+        server = await FakeStreamServer('binance', port=port).start()
+        
+        try:
+            await wait_for(lambda: any(stream in streams for streams in server.subscriptions.values()))
+            row = FakeExchange().candles('BTC/USDT', '1h', 1_700_000_000, 1)[0]
+            await server.publish_kline('BTC/USDT', '1h', row)
+            await wait_for(lambda: len(klines) == 1)
+        finally:
+            await pool.close()
+            await task
+            await server.close()
+        
+        self.assertEqual(klines[0].to_candle()['timestamp'], row[0] // 1000)
+        self.assertEqual(pool.collectors[0].reconnects, 1)
+    
+    async def test_gives_up_without_raising(self):
+        adapter = get_adapter('binance', f"ws://127.0.0.1:{await unused_port()}")
+        pool = WebSocketPool('binance', adapter=adapter, config={**CONFIG, 'max_reconnect_attempts': 2})
+        
+        async def on_klines(events):
+            pass
+        
+        await pool.subscribe({adapter.kline_stream('BTC/USDT', '1h'): on_klines})
+        # gather() in the pool and the pipeline would propagate an exception from here
+        await asyncio.wait_for(pool.run(), timeout=5)
+        self.assertEqual(pool.collectors[0].reconnects, 0)
+
+if __name__ == '__main__':
+    unittest.main()
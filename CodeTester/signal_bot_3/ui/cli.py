@@ -1,13 +1,16 @@
 import asyncio
-from typing import List, Dict
+from typing import Callable, Dict, List, Optional
 from tqdm import tqdm
-from signal_bot_3.data.ohlcv_collector import OHLCVCollector
-from signal_bot_3.signals.signal_engine import SignalEngine
-from signal_bot_3.multi_timeframe.timeframe_sync import TimeframeSync
-from signal_bot_3.risk_manager.reward_calculator import RewardCalculator
-from signal_bot_3.risk_manager.position_sizer import PositionSizer
+from signal_bot_3.data.async_ohlcv_collector import AsyncOHLCVCollector
+from signal_bot_3.backtest.engine import BacktestEngine
+from signal_bot_3.backtest.scanner import MarketScanner, engine_config
+from signal_bot_3.backtest.optimizer import ParameterOptimizer, select_per_fold
+from signal_bot_3.config.loader import load_config, enabled_pairs
+from signal_bot_3.adaptive_engine.trainer import ModelTrainer
+from signal_bot_3.adaptive_engine.model import default_model_path
+from signal_bot_3.core.live_pipeline import LivePipeline
 from signal_bot_3.metrics.performance import PerformanceMetrics
-from signal_bot_3.metrics.per_signal import PerSignalMetrics
+from signal_bot_3.indicators.cache import log_cache_stats
 from signal_bot_3.core.logger import logger
 import json
 
@@ -15,79 +18,198 @@ def run_backtest(
     symbol: str = 'BTC/USDT',
     exchange: str = 'binance',
     timeframes: List[str] = None,
-    limit: int = 100
+    limit: int = 100,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+    quiet: bool = False
 ) -> Dict:
-    """Run backtest with progress bar"""
+    """Run backtest with progress bar; progress(stage, done, total) reports each step"""
     
     if timeframes is None:
         timeframes = ['5m', '15m', '1h', '4h']
     
+    say = (lambda *args: None) if quiet else print
+    report = progress or (lambda stage, done, total: None)
+    
     logger.info(f"Starting backtest for {symbol} on {exchange}")
     
-    collector = OHLCVCollector(exchange)
-    signal_engine = SignalEngine({'min_confirmation_score': 0.6})
-    tf_sync = TimeframeSync(timeframes)
-    rr_calc = RewardCalculator(min_risk_reward=1.5)
-    pos_sizer = PositionSizer(max_risk_per_trade=0.02)
+    engine = BacktestEngine({'min_confirmation_score': 0.6})
     perf_metrics = PerformanceMetrics(initial_capital=10000)
-    signal_metrics = PerSignalMetrics()
-    
-    multi_tf_data = {}
     
-    print(f"\n📊 Fetching data for {symbol}...")
-    with tqdm(total=len(timeframes), desc="Downloading OHLCV") as pbar:
-        for tf in timeframes:
-            df = asyncio.run(collector.fetch_ohlcv(symbol, tf, limit))
-            multi_tf_data[tf] = df
+    async def download(pbar) -> Dict:
+        def fetched(_symbol: str, _tf: str):
             pbar.update(1)
+            report('download', pbar.n, len(timeframes))
+        
+        async with AsyncOHLCVCollector(exchange) as collector:
+            return await collector.fetch_many(
+                [(symbol, tf) for tf in timeframes],
+                limit,
+                progress=fetched
+            )
+    
+    say(f"\n📊 Fetching data for {symbol}...")
+    report('download', 0, len(timeframes))
+    with tqdm(total=len(timeframes), desc="Downloading OHLCV", disable=quiet) as pbar:
+        frames = asyncio.run(download(pbar))
     
-    print("\n🔍 Generating signals...")
-    signals = signal_engine.generate_signals(multi_tf_data)
+    multi_tf_data = {tf: frames[(symbol, tf)] for tf in timeframes}
+    
+    say("\n🔍 Generating signals...")
+    signals = []
+    with tqdm(total=len(timeframes), desc="Scanning bars", disable=quiet) as pbar:
+        for i, tf in enumerate(timeframes):
+            report('signals', i, len(timeframes))
+            signals.extend(engine.find_signals(multi_tf_data[tf], tf, multi_tf_data))
+            pbar.update(1)
     
     if not signals:
         logger.warning("No signals generated")
         return {'signals': [], 'metrics': {}}
     
-    print(f"\n✅ Generated {len(signals)} signals")
-    
-    trades = []
-    account_balance = 10000
-    
-    print("\n💹 Simulating trades...")
-    with tqdm(total=len(signals), desc="Backtesting") as pbar:
-        for signal in signals:
-            if rr_calc.is_valid_signal(signal):
-                signal['position_size'] = pos_sizer.calculate_position_size(signal, account_balance)
-                
-                tf = signal.get('timeframe', timeframes[0])
-                exit_df = multi_tf_data[tf].iloc[-10:]
-                
-                exit_price = signal_metrics.simulate_exit(signal, exit_df)
-                trade_result = signal_metrics.calculate_trade_result(signal, exit_price)
-                
-                trades.append(trade_result)
-                account_balance += trade_result['net_pnl']
-            
-            pbar.update(1)
+    say(f"\n✅ Generated {len(signals)} signals")
+    
+    say("\n💹 Simulating trades...")
+    report('simulate', 0, 1)
+    trades = engine.simulate(signals, multi_tf_data)
     
     metrics = perf_metrics.calculate_metrics(trades)
+    portfolio = engine.portfolio.evaluate(trades, multi_tf_data)
+    log_cache_stats()
     
-    print("\n" + "="*50)
-    print("📈 BACKTEST RESULTS")
-    print("="*50)
-    print(f"Total Trades: {metrics.get('total_trades', 0)}")
-    print(f"Win Rate: {metrics.get('win_rate', 0)*100:.1f}%")
-    print(f"Total PnL: ${metrics.get('total_pnl', 0):.2f}")
-    print(f"Sharpe Ratio: {metrics.get('sharpe_ratio', 0):.2f}")
-    print(f"Max Drawdown: {metrics.get('max_drawdown', 0)*100:.1f}%")
-    print("="*50 + "\n")
+    say("\n" + "="*50)
+    say("📈 BACKTEST RESULTS")
+    say("="*50)
+    say(f"Total Trades: {metrics.get('total_trades', 0)}")
+    say(f"Win Rate: {metrics.get('win_rate', 0)*100:.1f}%")
+    say(f"Total PnL: ${metrics.get('total_pnl', 0):.2f}")
+    say(f"Sharpe Ratio: {metrics.get('sharpe_ratio', 0):.2f}")
+    say(f"Max Drawdown: {metrics.get('max_drawdown', 0)*100:.1f}%")
+    say(f"Sharpe (mark-to-market, annualized): {portfolio.get('sharpe_ratio', 0):.2f}")
+    say(f"Max Drawdown (mark-to-market): {portfolio.get('max_drawdown', 0)*100:.1f}%")
+    say("="*50 + "\n")
     
     return {
         'signals': signals,
         'trades': trades,
-        'metrics': metrics
+        'metrics': metrics,
+        'portfolio': portfolio
     }
 
+def run_scan(timeframes: List[str] = None, limit: int = 500) -> List[Dict]:
+    """Backtest every enabled pair from config.json and print the ranking"""
+    scanner = MarketScanner(timeframes=timeframes, limit=limit)
+    pairs_total = len(scanner.pairs())
+    
+    print(f"\n🔎 Scanning {pairs_total} pairs on {', '.join(scanner.timeframes)}...")
+    with tqdm(total=pairs_total, desc="Scanning pairs") as pbar:
+        table = asyncio.run(scanner.scan(progress=lambda _row: pbar.update(1)))
+    
+    print("\n" + "="*50)
+    print("🏆 SCAN RANKING")
+    print("="*50)
+    print(table.drop(columns=['error']).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print("="*50 + "\n")
+    
+    return table.to_dict('records')
+
+def run_optimize(
+    symbol: str = 'BTC/USDT',
+    exchange: str = 'binance',
+    timeframes: List[str] = None,
+    limit: int = 1000,
+    samples: int = None
+) -> Dict:
+    """Search signal and risk parameters with walk-forward validation"""
+    if timeframes is None:
+        timeframes = ['5m', '15m', '1h', '4h']
+    
+    async def download() -> Dict:
+        async with AsyncOHLCVCollector(exchange) as collector:
+            return await collector.fetch_many([(symbol, tf) for tf in timeframes], limit)
+    
+    print(f"\n📊 Fetching data for {symbol}...")
+    frames = asyncio.run(download())
+    multi_tf_data = {tf: frames[(symbol, tf)] for tf in timeframes}
+    
+    optimizer = ParameterOptimizer(base_config=engine_config(load_config()))
+    
+    print("\n🧪 Optimizing parameters...")
+    with tqdm(desc="Parameter sets") as pbar:
+        table = optimizer.optimize(multi_tf_data, n_random=samples, progress=pbar.update)
+    
+    if table.empty:
+        logger.warning("No parameter sets evaluated")
+        return {}
+    
+    selection = select_per_fold(table)
+    
+    print("\n" + "="*50)
+    print(f"📋 TOP PARAMETER SETS (of {len(table)}, by mean train Sharpe across folds)")
+    print("="*50)
+    print(table.drop(columns='folds').head(10).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    
+    print("\n" + "="*50)
+    print("🏆 WALK-FORWARD SELECTION (best train Sharpe per fold, scored on the next window)")
+    print("="*50)
+    print(selection.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\nOut-of-sample Sharpe: {selection['test_sharpe'].mean():.2f}")
+    print(f"Out-of-sample return: {selection['test_return_pct'].mean():.2f}%")
+    print("Latest fold's parameters are the ones to trade")
+    print("="*50 + "\n")
+    
+    return {'combinations': table.to_dict('records'), 'selection': selection.to_dict('records')}
+
+def run_train(timeframes: List[str] = None, limit: int = 5000) -> Dict:
+    """Sync history of every enabled pair and train the adaptive signal model"""
+    if timeframes is None:
+        timeframes = ['5m', '15m', '1h', '4h']
+    
+    config = load_config()
+    pairs = enabled_pairs(config)
+    
+    async def sync(pbar):
+        exchanges = {}
+        for exchange, symbol in pairs:
+            exchanges.setdefault(exchange, []).extend((symbol, tf) for tf in timeframes)
+        
+        for exchange, requests in exchanges.items():
+            async with AsyncOHLCVCollector(exchange) as collector:
+                await collector.fetch_many(requests, limit, progress=lambda _symbol, _tf: pbar.update(1))
+    
+    print(f"\n📊 Syncing history of {len(pairs)} pairs...")
+    with tqdm(total=len(pairs) * len(timeframes), desc="Syncing OHLCV") as pbar:
+        asyncio.run(sync(pbar))
+    
+    print("\n🧠 Training signal model...")
+    trainer = ModelTrainer(engine_config(config))
+    model = trainer.train(trainer.load_history(pairs, timeframes, limit))
+    model.save(default_model_path())
+    
+    print("\n" + "="*50)
+    print("🧠 SIGNAL MODEL")
+    print("="*50)
+    for key, value in model.info.items():
+        print(f"{key}: {value}")
+    print("="*50 + "\n")
+    
+    return model.info
+
+def run_live():
+    """Run the live kline pipeline until interrupted"""
+    pipeline = LivePipeline()
+    
+    async def _run():
+        try:
+            await pipeline.run()
+        finally:
+            await pipeline.stop()
+    
+    print("\n📡 Live mode: waiting for closed candles... (Ctrl+C to stop)")
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        logger.info("Live mode stopped by user")
+
 def main():
     """CLI entry point"""
     import argparse
@@ -97,9 +219,43 @@ def main():
     parser.add_argument('--exchange', default='binance', help='Exchange name')
     parser.add_argument('--timeframes', nargs='+', default=['5m', '15m', '1h', '4h'], help='Timeframes')
     parser.add_argument('--limit', type=int, default=100, help='Number of candles')
+    parser.add_argument('--live', action='store_true', help='Run live signals on WebSocket klines')
+    parser.add_argument('--scan', action='store_true', help='Backtest and rank every enabled pair')
+    parser.add_argument('--optimize', action='store_true', help='Walk-forward parameter search')
+    parser.add_argument('--samples', type=int, default=None, help='Random parameter sets to try (default: full grid)')
+    parser.add_argument('--train', action='store_true', help='Train the adaptive signal model on stored history')
     
     args = parser.parse_args()
     
+    if args.live:
+        run_live()
+        return
+    
+    if args.scan:
+        result = run_scan(timeframes=args.timeframes, limit=args.limit)
+        with open('scan_result.json', 'w') as f:
+            json.dump(result, f, indent=2, default=str)
+        print("📁 Results saved to scan_result.json")
+        return
+    
+    if args.train:
+        run_train(timeframes=args.timeframes, limit=args.limit)
+        print(f"📁 Model saved to {default_model_path()}")
+        return
+    
+    if args.optimize:
+        result = run_optimize(
+            symbol=args.symbol,
+            exchange=args.exchange,
+            timeframes=args.timeframes,
+            limit=args.limit,
+            samples=args.samples
+        )
+        with open('optimize_result.json', 'w') as f:
+            json.dump(result, f, indent=2, default=str)
+        print("📁 Results saved to optimize_result.json")
+        return
+    
     result = run_backtest(
         symbol=args.symbol,
         exchange=args.exchange,